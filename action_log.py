@@ -0,0 +1,72 @@
+import json
+import os
+from collections import deque
+from typing import IO, List, Optional
+from engine import ActionLog
+
+# Per-farm action log for long games: a ring buffer of the most recent entries, so a game's log
+# takes the same memory on day 10 as on day 10,000. With spill_path, every entry is also
+# streamed to a JSON-lines file as it leaves the buffer (and the rest on close), so the full log
+# is kept on disk instead of in memory.
+#
+#   ACTION_LOG_CAPACITY=256 ACTION_LOG_DIR=recordings/logs python main.py
+
+ACTION_LOG_CAPACITY = int(os.getenv("ACTION_LOG_CAPACITY", "256"))
+ACTION_LOG_DIR = os.getenv("ACTION_LOG_DIR")
+
+class ActionLogBuffer:
+    def __init__(self, capacity: int = ACTION_LOG_CAPACITY, spill_path: Optional[str] = None):
+        self._entries = deque(maxlen=capacity)
+        self.total = 0  # entries ever appended
+        self.spill_path = spill_path
+        self._spill: Optional[IO] = None
+        if spill_path:
+            directory = os.path.dirname(spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._spill = open(spill_path, "a", buffering=1 << 16)
+
+    def __getstate__(self):
+        # Pickled for checkpoints with the spill file's length, so a resumed log drops anything
+        # spilled after the checkpoint was taken
+        state = {"entries": self._entries, "total": self.total, "spill_path": self.spill_path, "spilled": 0}
+        if self._spill is not None:
+            self._spill.flush()
+            state["spilled"] = self._spill.tell()
+        return state
+
+    def __setstate__(self, state):
+        self._entries = state["entries"]
+        self.total = state["total"]
+        self.spill_path = state["spill_path"]
+        self._spill = None
+        if self.spill_path:
+            self._spill = open(self.spill_path, "a", buffering=1 << 16)
+            self._spill.truncate(state["spilled"])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def append(self, entry: ActionLog):
+        if self._spill is not None and len(self._entries) == self._entries.maxlen:
+            self._write(self._entries[0])
+        self._entries.append(entry)
+        self.total += 1
+
+    def since(self, mark: int) -> List[ActionLog]:
+        # Entries appended after total was mark, as far as the buffer still holds them
+        count = min(self.total - mark, len(self._entries))
+        return [self._entries[i] for i in range(len(self._entries) - count, len(self._entries))]
+
+    def _write(self, entry: ActionLog):
+        self._spill.write(json.dumps(entry.to_dict(), separators=(",", ":")) + "\n")
+
+    def close(self):
+        if self._spill is not None:
+            for entry in self._entries:
+                self._write(entry)
+            self._spill.close()
+            self._spill = None
@@ -0,0 +1,185 @@
+import numpy as np
+from typing import List
+from constants import GAME_RULES, ACTION_PENALTIES, TRADING_RULES
+
+# Vectorized counterpart of plant_crop / harvest_crop / perform_maintenance / sell_crops /
+# buy_crops / attempt_sabotage / update_state for many independent single-farm games advancing in
+# lockstep. Crops are stored as counts per (game, crop type, planted day) instead of lists of dicts.
+
+CROP_TYPES = list(GAME_RULES["crops"])
+CROP_INDEX = {crop_type: i for i, crop_type in enumerate(CROP_TYPES)}
+CROP_COST = np.array([GAME_RULES["crops"][crop_type]["cost"] for crop_type in CROP_TYPES], dtype=np.float64)
+CROP_GROWTH = np.array([GAME_RULES["crops"][crop_type]["growth_time"] for crop_type in CROP_TYPES], dtype=np.int64)
+CROP_PRICE = np.array([GAME_RULES["crops"][crop_type]["sell_price"] for crop_type in CROP_TYPES], dtype=np.float64)
+HARVEST_PRICE = CROP_PRICE * GAME_RULES["harvest_sell_discount"]
+
+# Action codes match the leading number of a decision string
+PLANT, HARVEST, MAINTENANCE, SELL, BUY, SABOTAGE = 1, 2, 3, 4, 5, 6
+
+class BatchGames:
+    def __init__(self, n_games: int, total_days: int = GAME_RULES["total_days"]):
+        self.n_games = n_games
+        self.total_days = total_days
+        self.day = 1
+        self.money = np.full(n_games, GAME_RULES["starting_money"], dtype=np.float64)
+        self.energy = np.full(n_games, GAME_RULES["max_energy"], dtype=np.int64)
+        # crops[game, crop type, planted day]
+        self.crops = np.zeros((n_games, len(CROP_TYPES), total_days + 2), dtype=np.int64)
+        self.harvested = np.zeros((n_games, len(CROP_TYPES)), dtype=np.int64)
+        # Running count of crops ready to harvest per (game, crop type), kept in sync with crops
+        self.ready = np.zeros((n_games, len(CROP_TYPES)), dtype=np.int64)
+        # Order book: crops escrowed in open sell orders per (game, crop type, expiration day).
+        # With no counterparty a sell order always rests until it expires.
+        self.pending_sell = np.zeros((n_games, len(CROP_TYPES), total_days + TRADING_RULES["order_expiration_days"] + 2), dtype=np.int64)
+        # Money reserved by open buy orders per (game, expiration day); like sells, they rest until they expire
+        self.pending_buy = np.zeros((n_games, total_days + TRADING_RULES["order_expiration_days"] + 2), dtype=np.float64)
+        self.reserved = np.zeros(n_games, dtype=np.float64)
+
+    def harvestable_counts(self) -> np.ndarray:
+        return self.ready.copy()
+
+    def ready_slots(self, games: np.ndarray) -> np.ndarray:
+        # Per planted-day slot counts of crops ready today, for a subset of games
+        ready = np.arange(self.crops.shape[2])[None, :] <= self.day - CROP_GROWTH[:, None]
+        return self.crops[games] * ready[None, :, :]
+
+    def step(self, actions: np.ndarray, crop_types: np.ndarray = None, amounts: np.ndarray = None):
+        actions = np.asarray(actions)
+        crop_types = np.zeros(self.n_games, dtype=np.int64) if crop_types is None else np.asarray(crop_types)
+        amounts = np.zeros(self.n_games, dtype=np.int64) if amounts is None else np.asarray(amounts)
+        unsupported = ~np.isin(actions, (PLANT, HARVEST, MAINTENANCE, SELL, BUY, SABOTAGE))
+        if unsupported.any():
+            raise ValueError(f"Unsupported batch actions: {sorted(set(actions[unsupported].tolist()))}")
+
+        # Each game takes one action per day, so the subsets below are disjoint
+        self._plant(np.nonzero(actions == PLANT)[0], crop_types)
+        self._harvest(np.nonzero(actions == HARVEST)[0])
+        self._maintain(np.nonzero(actions == MAINTENANCE)[0])
+        self._sell(np.nonzero(actions == SELL)[0], crop_types, amounts)
+        self._buy(np.nonzero(actions == BUY)[0], crop_types, amounts)
+        # Sabotage has no target in a single-farm game, so it fails without costing anything
+
+        # Expired sell orders return their crops to harvested crops, expired buy orders their money
+        self.harvested += self.pending_sell[:, :, self.day]
+        self.pending_sell[:, :, self.day] = 0
+        self.reserved -= self.pending_buy[:, self.day]
+        self.pending_buy[:, self.day] = 0
+
+        self.day += 1
+        self.energy = np.minimum(self.energy + GAME_RULES["energy_regen_per_day"], GAME_RULES["max_energy"])
+
+        # Crops planted exactly growth_time days ago mature today; nothing touches a slot before then
+        for i, growth_time in enumerate(CROP_GROWTH):
+            if self.day - growth_time >= 1:
+                self.ready[:, i] += self.crops[:, i, self.day - growth_time]
+
+    def _plant(self, games: np.ndarray, crop_types: np.ndarray):
+        crop = crop_types[games]
+        ok = (self.money[games] >= CROP_COST[crop]) & (self.energy[games] >= GAME_RULES["energy_cost"]["plant"])
+        planted, crop = games[ok], crop[ok]
+        self.crops[planted, crop, self.day] += 1
+        self.money[planted] -= CROP_COST[crop]
+        self.energy[planted] -= GAME_RULES["energy_cost"]["plant"]
+        failed = games[~ok]
+        self.energy[failed] = np.maximum(0, self.energy[failed] - ACTION_PENALTIES["plant"])
+
+    def _harvest(self, games: np.ndarray):
+        ok = (self.ready[games].sum(axis=1) > 0) & (self.energy[games] >= GAME_RULES["energy_cost"]["harvest"])
+        harvested = games[ok]
+        self.energy[harvested] -= GAME_RULES["energy_cost"]["harvest"]
+
+        for i, growth_time in enumerate(CROP_GROWTH):
+            self.crops[harvested, i, :max(0, self.day - growth_time + 1)] = 0
+        self.money[harvested] += self.ready[harvested] @ HARVEST_PRICE
+        self.ready[harvested] = 0
+
+        failed = games[~ok]
+        self.energy[failed] = np.maximum(0, self.energy[failed] - ACTION_PENALTIES["harvest"])
+
+    def _maintain(self, games: np.ndarray):
+        ok = self.energy[games] >= GAME_RULES["energy_cost"]["maintenance"]
+        self.energy[games[ok]] -= GAME_RULES["energy_cost"]["maintenance"]
+        failed = games[~ok]
+        self.energy[failed] = np.maximum(0, self.energy[failed] - ACTION_PENALTIES["maintenance"])
+
+    def _sell(self, games: np.ndarray, crop_types: np.ndarray, amounts: np.ndarray):
+        games = games[self.energy[games] >= TRADING_RULES["trade_energy_cost"]]
+        self.energy[games] -= TRADING_RULES["trade_energy_cost"]
+        crop, amount = crop_types[games], amounts[games]
+        ok = (amount > 0) & (amount <= TRADING_RULES["max_trade_amount"]) & (self.harvested[games, crop] + self.ready[games, crop] >= amount)
+
+        failed = games[~ok]
+        self.energy[failed] = np.maximum(0, self.energy[failed] - TRADING_RULES["trade_penalty"])
+
+        games, crop, amount = games[ok], crop[ok], amount[ok]
+        from_harvested = np.minimum(amount, self.harvested[games, crop])
+        to_harvest = amount - from_harvested
+        self.harvested[games, crop] -= from_harvested
+        # Sold crops come out of the field oldest first
+        ready = self.ready_slots(games)[np.arange(len(games)), crop]
+        taken = np.diff(np.minimum(np.cumsum(ready, axis=1), to_harvest[:, None]), axis=1, prepend=0)
+        self.crops[games, crop] -= taken
+        self.ready[games, crop] -= to_harvest
+        self.pending_sell[games, crop, self.day + TRADING_RULES["order_expiration_days"]] += amount
+
+    def _buy(self, games: np.ndarray, crop_types: np.ndarray, amounts: np.ndarray):
+        games = games[self.energy[games] >= TRADING_RULES["trade_energy_cost"]]
+        self.energy[games] -= TRADING_RULES["trade_energy_cost"]
+        crop, amount = crop_types[games], amounts[games]
+        value = CROP_PRICE[crop] * amount
+        ok = (amount > 0) & (amount <= TRADING_RULES["max_trade_amount"]) & (self.money[games] - self.reserved[games] >= value)
+
+        failed = games[~ok]
+        self.energy[failed] = np.maximum(0, self.energy[failed] - TRADING_RULES["trade_penalty"])
+
+        games, value = games[ok], value[ok]
+        self.reserved[games] += value
+        self.pending_buy[games, self.day + TRADING_RULES["order_expiration_days"]] += value
+
+    def finish(self):
+        # Equivalent of clear_order_book: escrowed sells go back to harvested crops, reserved money is released
+        self.harvested += self.pending_sell.sum(axis=2)
+        self.pending_sell[:] = 0
+        self.reserved -= self.pending_buy.sum(axis=1)
+        self.pending_buy[:] = 0
+
+def encode_decisions(decisions: List[str]):
+    actions = np.zeros(len(decisions), dtype=np.int64)
+    crop_types = np.zeros(len(decisions), dtype=np.int64)
+    amounts = np.zeros(len(decisions), dtype=np.int64)
+    for i, decision in enumerate(decisions):
+        decision_parts = decision.split()
+        actions[i] = int(decision_parts[0])
+        if actions[i] in (PLANT, SELL, BUY):
+            crop_types[i] = CROP_INDEX[decision_parts[2]]
+        if actions[i] in (SELL, BUY):
+            amounts[i] = int(decision_parts[3])
+    return actions, crop_types, amounts
+
+def scripted_actions(games: BatchGames):
+    # Vectorized ScriptedPolicy: harvest if possible, else plant the best crop that can still mature, else maintain
+    days_left = games.total_days - games.day + 1
+    actions = np.full(games.n_games, MAINTENANCE, dtype=np.int64)
+    crop_types = np.zeros(games.n_games, dtype=np.int64)
+
+    profit = HARVEST_PRICE - CROP_COST
+    preference = sorted(range(len(CROP_TYPES)), key=lambda i: (profit[i], CROP_TYPES[i]), reverse=True)
+    can_plant = games.energy >= GAME_RULES["energy_cost"]["plant"]
+    chosen = np.zeros(games.n_games, dtype=bool)
+    for i in preference:
+        pick = can_plant & ~chosen & (CROP_GROWTH[i] < days_left) & (CROP_COST[i] <= games.money)
+        actions[pick] = PLANT
+        crop_types[pick] = i
+        chosen |= pick
+
+    can_harvest = (games.harvestable_counts().sum(axis=1) > 0) & (games.energy >= GAME_RULES["energy_cost"]["harvest"])
+    actions[can_harvest] = HARVEST
+    return actions, crop_types
+
+def run_scripted(n_games: int, total_days: int = GAME_RULES["total_days"]) -> BatchGames:
+    games = BatchGames(n_games, total_days)
+    for _ in range(total_days):
+        actions, crop_types = scripted_actions(games)
+        games.step(actions, crop_types)
+    games.finish()
+    return games
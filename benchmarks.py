@@ -0,0 +1,304 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+# Offline benchmarks for regression tracking. Model calls are answered by the in-process MockLLM,
+# so no API key or network access is needed.
+#
+#   python benchmarks.py all
+#   python benchmarks.py decisions --latency lognormal:-2,0.5 --concurrency 32
+#   python benchmarks.py startup
+#   python benchmarks.py crops
+#   python benchmarks.py long_game
+#   python benchmarks.py checkpoint
+#   python benchmarks.py decisions --stream --token-delay 0.002 --trailer-rate 0.5
+
+os.environ.setdefault("OPENAI_API_KEY", "mock")
+os.environ.setdefault("LLM_BACKEND", "mock")
+os.environ.setdefault("GAME_RECORDINGS_PATH", "")
+
+def percentiles(values: List[float]) -> Dict:
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50": value, "p99": value}
+    cuts = statistics.quantiles(values, n=100)
+    return {"p50": cuts[49], "p99": cuts[98]}
+
+def bench_engine(games: int = 200, batch_games: int = 10000) -> Dict:
+    from constants import GAME_RULES
+    from policies import RandomPolicy, ScriptedPolicy
+    from tournament import play_game
+    from batch_engine import run_scripted
+
+    async def play_all():
+        for seed in range(games):
+            await play_game(ScriptedPolicy(), RandomPolicy(seed), random.Random(seed))
+
+    start = time.perf_counter()
+    asyncio.run(play_all())
+    elapsed = time.perf_counter() - start
+
+    batch_start = time.perf_counter()
+    run_scripted(batch_games)
+    batch_elapsed = time.perf_counter() - batch_start
+
+    days = GAME_RULES["total_days"]
+    return {
+        "games": games,
+        "days_per_sec": games * days / elapsed,
+        "batch_games": batch_games,
+        "batch_days_per_sec": batch_games * days / batch_elapsed
+    }
+
+def bench_decisions(decisions: int = 500, concurrency: int = 16, latency: str = "fixed:0.01", stream: bool = False, token_delay: float = 0.0, trailer_rate: float = 0.0) -> Dict:
+    import main
+    from mock_llm import MockLLM
+    from order_book import OrderBook
+
+    main.llm_backend = MockLLM(latency=latency, seed=0, token_delay=token_delay, trailer_rate=trailer_rate)
+    main.LLM_STREAMING = stream
+    assistant = main.get_assistant("gpt4")
+    latencies = []
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        market = OrderBook()
+
+        async def one(i):
+            state = main.GameState(day=1 + i % 50)
+            async with semaphore:
+                start = time.perf_counter()
+                await main.make_decision(assistant, state, market, 50 - i % 50)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(i) for i in range(decisions)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    return {
+        "decisions": decisions,
+        "concurrency": concurrency,
+        "mock_latency": latency,
+        "streaming": stream,
+        "decisions_per_sec": decisions / elapsed,
+        "words_per_decision": main.llm_backend.tokens / decisions,
+        **{f"latency_{name}_ms": value * 1000 for name, value in percentiles(latencies).items()}
+    }
+
+async def stream_asgi(app, path: str, query: str = "", headers: Dict[str, str] = None) -> Dict:
+    # Drive one SSE request through the ASGI app in-process and count frames as they arrive
+    request_sent = False
+    disconnected = asyncio.Event()
+    stats = {"frames": 0, "bytes": 0, "first_frame_s": None}
+    start = time.perf_counter()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            stats["bytes"] += len(body)
+            frames = body.count(b"\n\n")
+            if frames and stats["first_frame_s"] is None:
+                stats["first_frame_s"] = time.perf_counter() - start
+            stats["frames"] += frames
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 50000),
+        "server": ("127.0.0.1", 8000)
+    }
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    stats["elapsed_s"] = time.perf_counter() - start
+    return stats
+
+def bench_server(streams: int = 8, latency: str = "fixed:0.01") -> Dict:
+    import main
+    from mock_llm import MockLLM
+
+    main.llm_backend = MockLLM(latency=latency, seed=0)
+
+    async def run():
+        return await asyncio.gather(*(stream_asgi(main.app, "/stream-competition", f"session_id=bench-{i}") for i in range(streams)))
+
+    start = time.perf_counter()
+    results = asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    frames = sum(result["frames"] for result in results)
+    return {
+        "streams": streams,
+        "mock_latency": latency,
+        "frames_per_sec": frames / elapsed,
+        "bytes_per_frame": sum(result["bytes"] for result in results) / max(frames, 1),
+        "first_frame_ms_p50": percentiles([result["first_frame_s"] or 0.0 for result in results])["p50"] * 1000,
+        "stream_seconds_max": max(result["elapsed_s"] for result in results)
+    }
+
+def bench_crops(sizes=(100, 1000, 10000, 50000), repeats: int = 20) -> Dict:
+    # Per-action cost on a farm holding n crops, planted over the past 40 days so most are ready
+    from constants import GAME_RULES
+    from engine import GameState, attempt_sabotage, harvest_crop, plant_crop, sell_crops
+    from order_book import OrderBook
+    from policies import scripted_decision
+    from prompts import crop_groups
+
+    crop_types = sorted(GAME_RULES["crops"])
+    actions = {
+        "plant": lambda state: plant_crop(state, "Corn", []),
+        "harvest": lambda state: harvest_crop(state, []),
+        "sell": lambda state: sell_crops(state, OrderBook(), "Corn", 3, []),
+        "sabotage": lambda state: attempt_sabotage(GameState(money=1000), state, [], random.Random(0)),
+        "scripted_decision": lambda state: scripted_decision(state, 10),
+        "prompt_groups": lambda state: crop_groups(state)
+    }
+    results = {}
+    for n in sizes:
+        crops = [{"type": crop_types[i % len(crop_types)], "planted_at": 1 + i % 40} for i in range(n)]
+        for name, action in actions.items():
+            elapsed = 0.0
+            for _ in range(repeats):
+                state = GameState(day=41, money=10**6, crops=crops)
+                start = time.perf_counter()
+                action(state)
+                elapsed += time.perf_counter() - start
+            results[f"{name}_{n}_us"] = elapsed / repeats * 1e6
+    return results
+
+# The longest game's peak may be at most this many times the shortest's
+LONG_GAME_MAX_GROWTH = 2.0
+
+def bench_long_game(lengths=(1000, 10000)) -> Dict:
+    # Peak traced memory and time per day of one random-vs-random game of each length. Random
+    # farms trade, expire orders and harvest often, so their own state stays small and the peak
+    # measures what the game keeps per day (logs, order book, ledger history); it must not grow
+    # with the number of days. A scripted farm is not used: with 20 energy a day it plants every
+    # day and rarely harvests, so its field really does grow over a long game.
+    from policies import RandomPolicy
+    from tournament import play_game
+
+    results = {}
+    for days in lengths:
+        start = time.perf_counter()
+        asyncio.run(play_game(RandomPolicy(1), RandomPolicy(0), random.Random(0), total_days=days))
+        results[f"us_per_day_{days}"] = (time.perf_counter() - start) / days * 1e6
+        tracemalloc.start()
+        asyncio.run(play_game(RandomPolicy(1), RandomPolicy(0), random.Random(0), total_days=days))
+        results[f"peak_kb_{days}"] = tracemalloc.get_traced_memory()[1] / 1024
+        tracemalloc.stop()
+    results["peak_growth"] = results[f"peak_kb_{lengths[-1]}"] / results[f"peak_kb_{lengths[0]}"]
+    if results["peak_growth"] > LONG_GAME_MAX_GROWTH:
+        raise AssertionError(f"Peak memory grew {results['peak_growth']:.1f}x from {lengths[0]} to {lengths[-1]} days")
+    return results
+
+def bench_checkpoint(days: int = 25, repeats: int = 200) -> Dict:
+    # Time to write and read back a checkpoint of a scripted-vs-random game after the given days
+    import tempfile
+    from action_log import ActionLogBuffer
+    from checkpoints import RecordedDays, days_path, load_checkpoint, save_checkpoint
+    from engine import GameState, update_state
+    from order_book import OrderBook
+    from policies import RandomPolicy, scripted_decision
+
+    rng = random.Random(0)
+    policy = RandomPolicy(0)
+    states = {"a": GameState(), "b": GameState()}
+    logs = {name: ActionLogBuffer() for name in states}
+    market = OrderBook()
+    for day in range(1, days + 1):
+        update_state(states["a"], states, scripted_decision(states["a"], 50 - day), logs["a"], market, rng)
+        update_state(states["b"], states, asyncio.run(policy.decide(states["b"], market, 50 - day)), logs["b"], market, rng)
+
+    with tempfile.TemporaryDirectory() as directory:
+        recorded_days = RecordedDays(days_path(directory, "bench"))
+        for _ in range(days):
+            recorded_days.append(["3 Maintenance"] * 2)
+        checkpoint = {"day": days + 1, "states": states, "market": market, "rng": rng.getstate(), "logs": logs, "policies": {"b": policy}, "recorded_days": recorded_days}
+        writes = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            size = save_checkpoint(directory, "bench", checkpoint)
+            writes.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            load_checkpoint(directory, "bench")["recorded_days"].close()
+        read_s = (time.perf_counter() - start) / repeats
+        recorded_days.close()
+    return {"bytes": size, **{f"write_{name}_ms": value * 1000 for name, value in percentiles(writes).items()}, "read_ms": read_s * 1000}
+
+def bench_startup(runs: int = 5) -> Dict:
+    # Median wall time of a fresh interpreter importing each entry point, as a worker process or
+    # a headless run would; "python" is the interpreter alone
+    modules = {"python": "pass", "engine": "import engine", "rollout": "import rollout", "tournament": "import tournament", "main": "import main", "server": "import server"}
+    results = {}
+    for name, code in modules.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+        results[f"{name}_ms"] = statistics.median(times) * 1000
+    return results
+
+BENCHMARKS = {
+    "engine": lambda args: bench_engine(args.games),
+    "decisions": lambda args: bench_decisions(args.decisions, args.concurrency, args.latency, args.stream, args.token_delay, args.trailer_rate),
+    "server": lambda args: bench_server(args.streams, args.latency),
+    "startup": lambda args: bench_startup(),
+    "crops": lambda args: bench_crops(),
+    "long_game": lambda args: bench_long_game(),
+    "checkpoint": lambda args: bench_checkpoint()
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run offline performance benchmarks")
+    parser.add_argument("benchmark", choices=list(BENCHMARKS) + ["all"])
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--decisions", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--streams", type=int, default=8)
+    parser.add_argument("--latency", default="fixed:0.01", help="Mock LLM latency distribution, e.g. lognormal:-2,0.5")
+    parser.add_argument("--stream", action="store_true", help="Stream decisions and stop at the Final Decision line")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Mock LLM seconds per generated word")
+    parser.add_argument("--trailer-rate", type=float, default=0.0, help="Fraction of mock answers with text after the decision")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    names = list(BENCHMARKS) if args.benchmark == "all" else [args.benchmark]
+    results = {name: BENCHMARKS[name](args) for name in names}
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for name, result in results.items():
+            print(f"{name}:")
+            for key, value in result.items():
+                print(f"  {key:<22} {value:.2f}" if isinstance(value, float) else f"  {key:<22} {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import json
+import os
+import pickle
+import zlib
+from typing import IO, Dict, List, Optional
+
+# Checkpoints of in-progress competitions, so a game survives a server restart or a stop and can
+# be resumed without repeating its model calls. A checkpoint is everything run_competition needs
+# to carry on at the next day (farm states and the order book pickled together so orders keep
+# pointing at their farms, the RNG state, logs, policies and the decisions played), pickled and
+# zlib-compressed behind a small header. It is written to a temporary file and renamed over the
+# previous one, so a crash mid-write leaves the last complete checkpoint in place. The decisions
+# played so far are appended to a .days file beside it as the game goes, and a checkpoint only
+# holds that file's length, so checkpoints do not grow with the length of the game. A running game
+# pickles its checkpoint with dump_checkpoint and leaves compressing, writing and syncing it to
+# write_checkpoint in a thread, so the disk never holds up other games on the event loop.
+#
+#   GAME_CHECKPOINT_DIR=recordings/checkpoints python main.py
+#   python main.py --resume <session_id>
+
+CHECKPOINT_VERSION = 2
+CHECKPOINT_MAGIC = b"FCKP"
+DEFAULT_CHECKPOINT_DIR = os.getenv("GAME_CHECKPOINT_DIR", "recordings/checkpoints")
+# Checkpoint every n simulated days
+CHECKPOINT_EVERY_DAYS = int(os.getenv("CHECKPOINT_EVERY_DAYS", "1"))
+
+def checkpoint_path(directory: str, session_id: str) -> str:
+    return os.path.join(directory, f"{session_id}.ckpt")
+
+def days_path(directory: str, session_id: str) -> str:
+    return os.path.join(directory, f"{session_id}.days")
+
+class RecordedDays:
+    # The decisions of every day played, one JSON line per day in path, or in memory without one.
+    # Pickled as the file's length, so a resumed game drops the days played after the checkpoint.
+    # Without a path (GAME_CHECKPOINT_DIR= turns checkpoints off) nothing bounds it: the whole
+    # decision log stays in memory until the game ends and is recorded.
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._count = 0
+        self._days: List[List[str]] = []
+        self._file: Optional[IO] = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, "w")
+
+    def __getstate__(self):
+        state = {"path": self.path, "count": self._count, "days": self._days, "size": 0}
+        if self._file is not None:
+            self._file.flush()
+            state["size"] = self._file.tell()
+        return state
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._count = state["count"]
+        self._days = state["days"]
+        self._file = None
+        if self.path:
+            self._file = open(self.path, "a")
+            self._file.truncate(state["size"])
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, decisions: List[str]):
+        if self._file is not None:
+            self._file.write(json.dumps(decisions, separators=(",", ":")) + "\n")
+        else:
+            self._days.append(list(decisions))
+        self._count += 1
+
+    def read(self) -> List[List[str]]:
+        if self._file is None:
+            return list(self._days)
+        self._file.flush()
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def sync(self):
+        # Called after pickling and before the checkpoint that points into the file is written
+        if self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def dump_checkpoint(checkpoint: Dict) -> bytes:
+    # The game must not change while it is pickled, so this part runs with the game
+    return pickle.dumps(checkpoint, protocol=pickle.HIGHEST_PROTOCOL)
+
+def save_checkpoint(directory: str, session_id: str, checkpoint: Dict) -> int:
+    return write_checkpoint(directory, session_id, dump_checkpoint(checkpoint))
+
+def write_checkpoint(directory: str, session_id: str, pickled: bytes) -> int:
+    # Returns the size written in bytes
+    os.makedirs(directory, exist_ok=True)
+    data = CHECKPOINT_MAGIC + bytes([CHECKPOINT_VERSION]) + zlib.compress(pickled, 1)
+    path = checkpoint_path(directory, session_id)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+        # On disk before the rename, so a crash cannot leave a truncated checkpoint in its place
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return len(data)
+
+def load_checkpoint(directory: str, session_id: str) -> Optional[Dict]:
+    try:
+        with open(checkpoint_path(directory, session_id), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    if data[:4] != CHECKPOINT_MAGIC or data[4] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint for session {session_id}")
+    return pickle.loads(zlib.decompress(data[5:]))
+
+def remove_checkpoint(directory: str, session_id: str):
+    for path in (checkpoint_path(directory, session_id), days_path(directory, session_id)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def list_checkpoints(directory: str) -> List[Dict]:
+    if not directory or not os.path.isdir(directory):
+        return []
+    checkpoints = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".ckpt"):
+            path = os.path.join(directory, name)
+            checkpoints.append({"session_id": name[:-len(".ckpt")], "bytes": os.path.getsize(path), "saved_at": os.path.getmtime(path)})
+    return checkpoints
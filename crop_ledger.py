@@ -0,0 +1,125 @@
+import heapq
+import random
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+from rules import DEFAULT_RULES, RuleTable
+
+# A farm's crops as counts per (crop_type, ready_day, damaged) bucket instead of one dict per crop,
+# so actions cost the same on a farm with ten crops or ten thousand. Crops that become ready are
+# tallied per type as the days pass, which makes harvestable counts O(1); harvest, sell and
+# sabotage work bucket by bucket, and a farm never has more buckets than crop types x days x 2.
+
+Bucket = Tuple[str, int, bool]
+
+class CropLedger:
+    def __init__(self, rules: RuleTable = DEFAULT_RULES):
+        self.rules = rules  # for growth times
+        self.buckets: Dict[Bucket, int] = {}
+        self.total = 0
+        self._types_by_day: Dict[int, Counter] = {}  # ready_day -> crop_type -> count
+        self._pending: List[int] = []  # heap of ready days not yet tallied as ready
+        self._ready = Counter()  # crop_type -> crops ready as of _as_of
+        self._as_of = 0
+
+    @classmethod
+    def from_crops(cls, crops: Iterable[Dict], rules: RuleTable = DEFAULT_RULES) -> "CropLedger":
+        # From a list of {"type", "planted_at", "damaged"} crop dicts
+        ledger = cls(rules)
+        for crop in crops:
+            ledger.add(crop["type"], crop["planted_at"] + rules.crops[crop["type"]].growth_time, damaged=crop.get("damaged", False))
+        return ledger
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _change(self, crop_type: str, ready_day: int, damaged: bool, delta: int):
+        key = (crop_type, ready_day, damaged)
+        count = self.buckets.get(key, 0) + delta
+        if count:
+            self.buckets[key] = count
+        else:
+            del self.buckets[key]
+        types = self._types_by_day.get(ready_day)
+        if types is None:
+            types = self._types_by_day[ready_day] = Counter()
+            if ready_day > self._as_of:
+                heapq.heappush(self._pending, ready_day)
+        types[crop_type] += delta
+        if ready_day <= self._as_of:
+            self._ready[crop_type] += delta
+            # Days already tallied are dropped once empty, so a long game keeps no per-day history;
+            # days still pending stay until the heap reaches them
+            if not types[crop_type]:
+                del types[crop_type]
+                if not types:
+                    del self._types_by_day[ready_day]
+        self.total += delta
+
+    def _advance(self, day: int):
+        if day < self._as_of:
+            # Days only move forward in a game; recount if a caller goes back anyway
+            self._ready = Counter()
+            self._pending = list(self._types_by_day)
+            heapq.heapify(self._pending)
+        while self._pending and self._pending[0] <= day:
+            self._ready.update(self._types_by_day[heapq.heappop(self._pending)])
+        self._as_of = day
+
+    def add(self, crop_type: str, ready_day: int, count: int = 1, damaged: bool = False):
+        self._change(crop_type, ready_day, damaged, count)
+
+    def ready_count(self, day: int, crop_type: str = None) -> int:
+        self._advance(day)
+        return self._ready[crop_type] if crop_type else sum(self._ready.values())
+
+    def counts_by_type(self) -> Counter:
+        counts = Counter()
+        for (crop_type, _, _), count in self.buckets.items():
+            counts[crop_type] += count
+        return counts
+
+    def planted(self) -> Iterator[Tuple[str, int, bool, int]]:
+        # (crop_type, planted_at, damaged, count) per bucket, in planting order
+        crops = self.rules.crops
+        entries = sorted((ready_day - crops[crop_type].growth_time, crop_type, damaged, count) for (crop_type, ready_day, damaged), count in self.buckets.items())
+        for planted_at, crop_type, damaged, count in entries:
+            yield crop_type, planted_at, damaged, count
+
+    def harvest(self, day: int) -> List[Tuple[str, bool, int]]:
+        # Removes every crop ready by day, as (crop_type, damaged, count) per bucket
+        harvested = [(key, count) for key, count in self.buckets.items() if key[1] <= day]
+        for (crop_type, ready_day, damaged), count in harvested:
+            self._change(crop_type, ready_day, damaged, -count)
+        return [(crop_type, damaged, count) for (crop_type, _, damaged), count in harvested]
+
+    def take_ready(self, day: int, crop_type: str, amount: int) -> int:
+        # Removes up to amount ready crops of one type: oldest first, undamaged before damaged
+        taken = 0
+        for ready_day, damaged in sorted((key[1], key[2]) for key in self.buckets if key[0] == crop_type and key[1] <= day):
+            take = min(amount - taken, self.buckets[(crop_type, ready_day, damaged)])
+            self._change(crop_type, ready_day, damaged, -take)
+            taken += take
+            if taken == amount:
+                break
+        return taken
+
+    def damage(self, rng: random.Random, k: int) -> int:
+        # Damages up to k distinct crops drawn uniformly, with the same draws as rng.sample over a
+        # list of every crop in planting order; crops already damaged stay as they are.
+        # Returns how many crops were newly damaged.
+        picks = sorted(rng.sample(range(self.total), min(k, self.total)))
+        hits = Counter()
+        position = 0
+        pick = 0
+        for crop_type, planted_at, damaged, count in self.planted():
+            while pick < len(picks) and picks[pick] < position + count:
+                hits[(crop_type, planted_at + self.rules.crops[crop_type].growth_time, damaged)] += 1
+                pick += 1
+            position += count
+        newly_damaged = 0
+        for (crop_type, ready_day, damaged), count in hits.items():
+            if not damaged:
+                self._change(crop_type, ready_day, False, -count)
+                self._change(crop_type, ready_day, True, count)
+                newly_damaged += count
+        return newly_damaged
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Opt-in cache of make_decision results, keyed on a hash of everything the model sees:
+# the model name, its system message and the rendered prompt (which already encodes the
+# farm state, order book and days_left). A bounded in-memory LRU sits in front of an
+# optional SQLite file that survives restarts and can be shared by worker processes.
+
+class DecisionCache:
+    def __init__(self, path: Optional[str] = None, max_memory_entries: int = 4096):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS decisions (key TEXT PRIMARY KEY, decision TEXT NOT NULL)")
+            self._db.commit()
+
+    @staticmethod
+    def make_key(model: str, system_message: str, prompt: str) -> str:
+        canonical = json.dumps({"model": model, "system_message": system_message, "prompt": prompt}, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            decision = self._memory.get(key)
+            if decision is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return decision
+
+            if self._db is not None:
+                row = self._db.execute("SELECT decision FROM decisions WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, decision: str):
+        with self._lock:
+            self._remember(key, decision)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO decisions (key, decision) VALUES (?, ?)", (key, decision))
+                self._db.commit()
+
+    def _remember(self, key: str, decision: str):
+        self._memory[key] = decision
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+_caches: Dict[str, DecisionCache] = {}
+
+def get_cache(setting: Optional[str]) -> Optional[DecisionCache]:
+    # setting is None (disabled), "memory" (in-memory only) or a path to the on-disk tier.
+    # One cache per setting per process, so worker processes keep their LRU across games.
+    if not setting:
+        return None
+    if setting not in _caches:
+        _caches[setting] = DecisionCache(None if setting == "memory" else os.path.expanduser(setting))
+    return _caches[setting]
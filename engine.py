@@ -0,0 +1,249 @@
+import copy
+import random
+from typing import Dict, List, Optional, Tuple
+from crop_ledger import CropLedger
+from rules import DEFAULT_RULES, RuleTable
+from order_book import OrderBook, Fill
+
+# The game rules: farm state and how a decision changes it. Pure and cheap to import, so rollout
+# and tournament workers, the solver and replays load it without the model and web stack in main.
+# Every rule is read from the farm's state.rules, the compiled RuleTable of its game.
+
+class GameState:
+    # Mutable farm state on the simulation hot path: a plain slotted object, so creating, copying
+    # and updating it skips pydantic validation.
+    __slots__ = ("day", "money", "reserved_money", "energy", "crops", "harvested_crops", "rules")
+
+    def __init__(self, day: int = 1, money: Optional[float] = None, reserved_money: int = 0, energy: Optional[int] = None, crops=None, harvested_crops: Optional[Dict[str, int]] = None, rules: RuleTable = DEFAULT_RULES):
+        # money and energy start at the rules' starting money and max energy
+        self.rules = rules
+        self.day = day
+        self.money = rules.starting_money if money is None else money
+        self.reserved_money = reserved_money  # Money reserved for open buy orders
+        self.energy = rules.max_energy if energy is None else energy
+        # Also accepts a list of {"type", "planted_at", "damaged"} crop dicts
+        self.crops = crops if isinstance(crops, CropLedger) else CropLedger.from_crops(crops or [], rules)
+        self.harvested_crops = dict(harvested_crops or {})
+
+    def __repr__(self):
+        return f"GameState(day={self.day}, money={self.money}, reserved_money={self.reserved_money}, energy={self.energy}, crops={len(self.crops)}, harvested_crops={self.harvested_crops})"
+
+    def copy(self) -> "GameState":
+        return GameState(self.day, self.money, self.reserved_money, self.energy, copy.deepcopy(self.crops), self.harvested_crops, self.rules)
+
+class ActionLog:
+    # One logged outcome. details is formatted from its template only when read: most entries are
+    # only counted or dropped from the ring buffer unread.
+    __slots__ = ("day", "action", "_template", "_args")
+
+    def __init__(self, day: int, action: str, template: str, *args):
+        self.day = day
+        self.action = action
+        self._template = template
+        self._args = args
+
+    @property
+    def details(self) -> str:
+        return self._template.format(*self._args) if self._args else self._template
+
+    def to_dict(self) -> Dict:
+        return {"day": self.day, "action": self.action, "details": self.details}
+
+def plant_crop(state: GameState, crop_type: str, action_log: List[ActionLog]):
+    rules = state.rules
+    crop = rules.crops.get(crop_type)
+    if crop is not None and state.money >= crop.cost and state.energy >= rules.energy_cost["plant"]:
+        state.crops.add(crop_type, state.day + crop.growth_time)
+        state.money -= crop.cost
+        state.energy -= rules.energy_cost["plant"]
+        action_log.append(ActionLog(state.day, "Plant", "Planted {}", crop_type))
+    else:
+        state.energy = max(0, state.energy - rules.penalties["plant"])
+        action_log.append(ActionLog(state.day, "Failed Plant", "Attempted to plant {} but lacked resources. Energy penalty applied.", crop_type))
+
+def harvest_crop(state: GameState, action_log: List[ActionLog]):
+    rules = state.rules
+    if state.crops.ready_count(state.day) and state.energy >= rules.energy_cost["harvest"]:
+        state.energy -= rules.energy_cost["harvest"]
+        
+        total_harvested = 0
+        total_money_earned = 0
+        
+        # One ledger bucket of identical crops at a time
+        for crop_type, damaged, count in state.crops.harvest(state.day):
+            # Apply yield multiplier for damaged crops
+            yield_multiplier = rules.damaged_crop_yield_factor if damaged else 1
+            harvest_amount = int(yield_multiplier * 1) * count  # Assuming 1 is the normal yield
+            
+            # Apply discount to sell price
+            discounted_price = rules.crops[crop_type].harvest_price
+            money_earned = harvest_amount * discounted_price
+            
+            total_harvested += harvest_amount
+            total_money_earned += money_earned
+            state.money += money_earned
+        
+        action_log.append(ActionLog(state.day, "Harvest", "Harvested {} crops, earned {:.2f} money", total_harvested, total_money_earned))
+    else:
+        state.energy = max(0, state.energy - rules.penalties["harvest"])
+        action_log.append(ActionLog(state.day, "Failed Harvest", "No harvestable crops or insufficient energy. Energy penalty applied."))
+
+def perform_maintenance(state: GameState, action_log: List[ActionLog]):
+    rules = state.rules
+    if state.energy >= rules.energy_cost["maintenance"]:
+        state.energy -= rules.energy_cost["maintenance"]
+        action_log.append(ActionLog(state.day, "Maintenance", "Performed farm maintenance"))
+    else:
+        state.energy = max(0, state.energy - rules.penalties["maintenance"])
+        action_log.append(ActionLog(state.day, "Failed Maintenance", "Insufficient energy for maintenance, rested instead. Small energy penalty applied."))
+
+def is_valid_trade(crop_type: str, amount: int, rules: RuleTable = DEFAULT_RULES) -> bool:
+    return crop_type in rules.crops and 0 < amount <= rules.max_trade_amount
+
+def sell_crops(state: GameState, market: OrderBook, crop_type: str, amount: int, action_log: List[ActionLog]):
+    rules = state.rules
+    if state.energy >= rules.trade_energy_cost:
+        state.energy -= rules.trade_energy_cost
+        
+        available_harvested = state.harvested_crops.get(crop_type, 0)
+        if is_valid_trade(crop_type, amount, rules) and available_harvested + state.crops.ready_count(state.day, crop_type) >= amount:
+            price = rules.crops[crop_type].sell_price
+            trade_value = price * amount
+            trade_fee = trade_value * rules.trade_fee_percentage
+            
+            # Escrow the crops in the order: harvested crops first, then the oldest ready crops in the field
+            from_harvested = min(amount, available_harvested)
+            to_harvest = amount - from_harvested
+            if from_harvested:
+                state.harvested_crops[crop_type] -= from_harvested
+                if state.harvested_crops[crop_type] == 0:
+                    del state.harvested_crops[crop_type]
+            if to_harvest:
+                state.crops.take_ready(state.day, crop_type, to_harvest)
+            
+            action_log.append(ActionLog(state.day, "Offer to Sell", "Offered to sell {} {} for {} money", amount, crop_type, trade_value - trade_fee))
+            
+            _, fills = market.place(state, "sell", crop_type, amount, price, state.day, state.day + rules.order_expiration_days)
+            for fill in fills:
+                complete_trade(fill, action_log)
+        else:
+            state.energy = max(0, state.energy - rules.trade_penalty)
+            action_log.append(ActionLog(state.day, "Failed Sell", "Insufficient crops to sell. Energy penalty of {} applied.", rules.trade_penalty))
+    else:
+        action_log.append(ActionLog(state.day, "Failed Sell", "Insufficient energy for selling"))
+
+def buy_crops(state: GameState, market: OrderBook, crop_type: str, amount: int, action_log: List[ActionLog]):
+    rules = state.rules
+    if state.energy >= rules.trade_energy_cost:
+        state.energy -= rules.trade_energy_cost
+        
+        if is_valid_trade(crop_type, amount, rules) and state.money - state.reserved_money >= rules.crops[crop_type].sell_price * amount:
+            price = rules.crops[crop_type].sell_price
+            trade_value = price * amount
+            
+            # Reserve money for the buy order; fills release it as they settle
+            state.reserved_money += trade_value
+            
+            action_log.append(ActionLog(state.day, "Offer to Buy", "Offered to buy {} {} for {} money", amount, crop_type, trade_value))
+            
+            _, fills = market.place(state, "buy", crop_type, amount, price, state.day, state.day + rules.order_expiration_days)
+            for fill in fills:
+                complete_trade(fill, action_log)
+        else:
+            state.energy = max(0, state.energy - rules.trade_penalty)
+            action_log.append(ActionLog(state.day, "Failed Buy", "Insufficient funds for buying. Energy penalty of {} applied.", rules.trade_penalty))
+    else:
+        action_log.append(ActionLog(state.day, "Failed Buy", "Insufficient energy for buying"))
+
+def complete_trade(fill: Fill, action_log: List[ActionLog]):
+    buyer_state, seller_state = fill.buyer, fill.seller
+    trade_value = fill.price * fill.amount
+    trade_fee = trade_value * seller_state.rules.trade_fee_percentage
+    
+    # The buyer reserved money at its own limit price and pays the resting price
+    buyer_state.reserved_money -= fill.buy_order.price * fill.amount
+    buyer_state.money -= trade_value
+    seller_state.money += trade_value - trade_fee
+    
+    # Transfer crops; the seller's crops were escrowed when the sell order was placed
+    buyer_state.crops.add(fill.crop_type, buyer_state.day + buyer_state.rules.crops[fill.crop_type].growth_time, fill.amount)
+    
+    action_log.append(ActionLog(buyer_state.day, "Complete Trade", "Completed trade of {} {} for {} money", fill.amount, fill.crop_type, trade_value))
+
+def return_order(state: GameState, order):
+    # Release what an unfilled order was holding back
+    if order.side == "buy":
+        state.reserved_money -= order.price * order.amount
+    else:
+        state.harvested_crops[order.crop_type] = state.harvested_crops.get(order.crop_type, 0) + order.amount
+
+def attempt_sabotage(state: GameState, target: Optional[GameState], action_log: List[ActionLog], rng: random.Random):
+    if target is None:
+        action_log.append(ActionLog(state.day, "Failed Sabotage", "No valid sabotage target"))
+    elif state.energy >= state.rules.sabotage_energy_cost and state.money >= state.rules.sabotage_money_cost:
+        state.energy -= state.rules.sabotage_energy_cost
+        state.money -= state.rules.sabotage_money_cost
+        
+        if rng.random() < state.rules.sabotage_success_rate:
+            # Successful sabotage
+            target.crops.damage(rng, state.rules.max_crops_damaged)
+            action_log.append(ActionLog(state.day, "Sabotage", "Successfully sabotaged the other farm"))
+        else:
+            action_log.append(ActionLog(state.day, "Failed Sabotage", "Sabotage attempt failed"))
+    else:
+        action_log.append(ActionLog(state.day, "Failed Sabotage", "Insufficient energy or money for sabotage attempt"))
+
+def sabotage_target(state: GameState, farms: Dict[str, GameState], decision_parts: List[str]) -> Optional[GameState]:
+    # Sabotage names its target; in a two-farm game a bare "6 Sabotage" means the other farm
+    target = farms.get(decision_parts[2]) if len(decision_parts) > 2 else None
+    if target is None and len(farms) == 2:
+        target = next(other for other in farms.values() if other is not state)
+    return target if target is not state else None
+
+def trade_args(decision_parts: List[str]) -> Tuple[str, int]:
+    # Crop type and amount of a Sell or Buy; a missing or non-integer amount is 0, which fails
+    # is_valid_trade like any other invalid trade instead of raising
+    crop_type = decision_parts[2] if len(decision_parts) > 2 else ""
+    try:
+        amount = int(decision_parts[3])
+    except (IndexError, ValueError):
+        amount = 0
+    return crop_type, amount
+
+def update_state(state: GameState, farms: Dict[str, GameState], decision: str, action_log: List[ActionLog], market: OrderBook, rng: random.Random):
+    # farms holds every farm in the game by name, including this one
+    decision_parts = decision.split()
+    action_number = decision_parts[0]
+    action = decision_parts[1]
+    
+    if action_number == "1":
+        crop_type = decision_parts[2] if len(decision_parts) > 2 else ""
+        plant_crop(state, crop_type, action_log)
+    elif action_number == "2":
+        harvest_crop(state, action_log)
+    elif action_number == "3":
+        perform_maintenance(state, action_log)
+    elif action_number == "4":
+        crop_type, amount = trade_args(decision_parts)
+        sell_crops(state, market, crop_type, amount, action_log)
+    elif action_number == "5":
+        crop_type, amount = trade_args(decision_parts)
+        buy_crops(state, market, crop_type, amount, action_log)
+    elif action_number == "6":
+        attempt_sabotage(state, sabotage_target(state, farms, decision_parts), action_log, rng)
+
+    # Handle order expiration
+    for expired_order in market.expire(state, state.day):
+        return_order(state, expired_order)
+        if expired_order.side == "buy":
+            action_log.append(ActionLog(state.day, "Buy Order Expired", "Buy order for {} {} expired. {} money returned.", expired_order.amount, expired_order.crop_type, expired_order.price * expired_order.amount))
+        else:
+            action_log.append(ActionLog(state.day, "Sell Order Expired", "Sell order for {} {} expired. Crops returned to harvested crops.", expired_order.amount, expired_order.crop_type))
+
+    state.day += 1
+    state.energy = min(state.energy + state.rules.energy_regen_per_day, state.rules.max_energy)
+
+def clear_order_book(state: GameState, market: OrderBook):
+    # Release reserved money and return escrowed crops for all of this farm's open orders
+    for order in market.cancel_all(state):
+        return_order(state, order)
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from collections import Counter, deque
+from itertools import islice
+from typing import AsyncIterator, Dict, Optional
+
+# SSE framing for competition streams. Each day's payload is diffed against the previous one and
+# sent as a delta carrying only changed fields plus crop additions/removals, keyed by
+# (type, planted_at) with counts; only snapshots list every crop. Frames carry sequence numbers
+# as SSE ids; a bounded log of recent frames lets a client resume from Last-Event-ID, falling
+# back to a full snapshot when the requested frame has already been dropped. Any number of
+# clients can follow one log.
+
+def crop_counts(crops) -> Counter:
+    # From a payload's [type, planted_at, count] crop groups
+    counts = Counter()
+    for crop_type, planted_at, count in crops:
+        counts[(crop_type, planted_at)] += count
+    return counts
+
+def format_event(data: Dict, seq: Optional[int] = None, event: Optional[str] = None) -> str:
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    if seq is not None:
+        lines.append(f"id: {seq}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+class DeltaEncoder:
+    def __init__(self):
+        self._fields: Dict[str, Dict] = {}
+        self._crops: Dict[str, Counter] = {}
+
+    def encode(self, payload: Dict) -> Dict:
+        farms = {}
+        for farm, data in payload.items():
+            fields = {key: value for key, value in data.items() if key != "crops"}
+            previous_fields = self._fields.get(farm, {})
+            delta = {key: value for key, value in fields.items() if previous_fields.get(key) != value}
+
+            crops = crop_counts(data.get("crops", []))
+            previous_crops = self._crops.get(farm, Counter())
+            added = crops - previous_crops
+            removed = previous_crops - crops
+            if added:
+                delta["crops_added"] = [[crop_type, planted_at, count] for (crop_type, planted_at), count in added.items()]
+            if removed:
+                delta["crops_removed"] = [[crop_type, planted_at, count] for (crop_type, planted_at), count in removed.items()]
+
+            self._fields[farm] = fields
+            self._crops[farm] = crops
+            farms[farm] = delta
+        return {"type": "delta", "farms": farms}
+
+    def snapshot(self) -> Dict:
+        farms = {}
+        for farm, fields in self._fields.items():
+            crops = sorted(self._crops[farm].elements(), key=lambda crop: crop[1])
+            farms[farm] = {**fields, "crops": [{"type": crop_type, "planted_at": planted_at} for crop_type, planted_at in crops]}
+        return {"type": "snapshot", "farms": farms}
+
+# Markers queued to a subscriber alongside encoded frames
+SNAPSHOT = object()
+END = object()
+
+class Subscriber:
+    # Bounded per-client queue. A client that falls a full queue behind has its backlog dropped
+    # and is sent one snapshot instead, then continues with live deltas.
+    def __init__(self, maxsize: int):
+        self.queue = asyncio.Queue(max(2, maxsize))
+        self.lagged = False
+        self.dropped = 0
+
+    def _drop_backlog(self):
+        while not self.queue.empty():
+            if self.queue.get_nowait() is not SNAPSHOT:
+                self.dropped += 1
+        self.queue.put_nowait(SNAPSHOT)
+        self.lagged = True
+
+    def push(self, item):
+        if item is END:
+            if self.queue.full():
+                self._drop_backlog()
+            self.queue.put_nowait(END)
+        elif self.lagged:
+            self.dropped += 1
+        elif self.queue.full():
+            self.dropped += 1
+            self._drop_backlog()
+        else:
+            self.queue.put_nowait(item)
+
+class FrameLog:
+    # One competition's frames: encoded once, kept in a bounded log for resume and fanned out
+    # to every subscriber's queue.
+    def __init__(self, capacity: int = 512, queue_size: int = 64):
+        self.seq = 0
+        self.closed = False
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self._frames = deque(maxlen=capacity)  # (seq, encoded SSE text)
+        self._encoder = DeltaEncoder()
+
+    def publish(self, payload: Dict):
+        frame = self._encoder.encode(payload)
+        self.seq += 1
+        text = format_event({**frame, "seq": self.seq}, self.seq)
+        self._frames.append((self.seq, text))
+        for subscriber in self.subscribers:
+            subscriber.push(text)
+
+    def close(self):
+        self.closed = True
+        for subscriber in self.subscribers:
+            subscriber.push(END)
+
+    def snapshot_event(self) -> str:
+        return format_event({**self._encoder.snapshot(), "seq": self.seq}, self.seq)
+
+    def _frames_after(self, seq: Optional[int]):
+        # Frames after seq, or a snapshot if seq is unknown or some frames were already dropped
+        if seq is None or seq > self.seq or (self._frames and seq < self._frames[0][0] - 1):
+            return [self.snapshot_event()] if self.seq else []
+        if not self._frames or seq == self.seq:
+            return []
+        start = seq - self._frames[0][0] + 1
+        return [text for _, text in islice(self._frames, start, None)]
+
+    def stats(self) -> Dict:
+        return {
+            "seq": self.seq,
+            "subscribers": len(self.subscribers),
+            "lagged": sum(subscriber.lagged for subscriber in self.subscribers),
+            "dropped_frames": sum(subscriber.dropped for subscriber in self.subscribers)
+        }
+
+    async def follow(self, last_seq: Optional[int] = None) -> AsyncIterator[str]:
+        # Catch-up frames are taken and the subscriber registered in one step, so live frames
+        # continue exactly where the backlog ends
+        backlog = self._frames_after(last_seq)
+        subscriber = Subscriber(self.queue_size)
+        if self.closed:
+            subscriber.push(END)
+        else:
+            self.subscribers.add(subscriber)
+        try:
+            for text in backlog:
+                yield text
+            while True:
+                item = await subscriber.queue.get()
+                if item is END:
+                    yield format_event({}, event="end")
+                    return
+                if item is SNAPSHOT:
+                    subscriber.lagged = False
+                    yield self.snapshot_event()
+                else:
+                    yield item
+        finally:
+            self.subscribers.discard(subscriber)
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+# Process-wide guard around model calls: a semaphore caps concurrent requests and an optional
+# token bucket caps the request rate, so many competitions in one server share the provider limits.
+
+class LLMLimiter:
+    def __init__(self, max_concurrency: int = 8, requests_per_minute: Optional[float] = None, burst: Optional[int] = None):
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self._loop = None
+        self._semaphore = None
+        self._rate = requests_per_minute / 60 if requests_per_minute else None
+        self._capacity = burst or max_concurrency
+        self._tokens = float(self._capacity)
+        self._updated = time.monotonic()
+        self._bucket_lock = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.total_requests = 0
+
+    def _bind(self):
+        # asyncio primitives belong to one event loop; headless runs start a new loop per game
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bucket_lock = asyncio.Lock()
+
+    async def _take_token(self):
+        if self._rate is None:
+            return
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    async def __aenter__(self):
+        self._bind()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._take_token()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.total_requests += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "requests_per_minute": self.requests_per_minute,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "total_requests": self.total_requests
+        }
+
+llm_limiter = LLMLimiter(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    requests_per_minute=float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0")) or None
+)
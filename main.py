@@ -1,552 +1,544 @@
+import logging
 import random
 import re
-from fastapi import FastAPI, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-import autogen
+import time
 import asyncio
-import uvicorn
-from typing import List, Dict, Optional
-from constants import GAME_RULES, ACTION_PENALTIES, TRADING_RULES, SABOTAGE_RULES
+import contextvars
+from typing import AsyncIterator, List, Dict, Optional, Sequence, Tuple
+from collections import Counter
+from constants import GAME_RULES
+from order_book import OrderBook
+from engine import GameState, ActionLog, update_state, clear_order_book
+from action_log import ACTION_LOG_DIR, ActionLogBuffer
+from decision_cache import DecisionCache, get_cache
+from prompts import SYSTEM_PREFIX, PromptBuilder, prompt_builder
+from llm_limiter import llm_limiter
+from sessions import CompetitionSession, check_session_id, sessions
+from mock_llm import MockLLM
+from replay import DEFAULT_RECORDINGS_PATH, append_records, make_record
+from results_store import DEFAULT_RESULTS_DB, day_row, get_store
+from checkpoints import CHECKPOINT_EVERY_DAYS, DEFAULT_CHECKPOINT_DIR, RecordedDays, days_path, dump_checkpoint, load_checkpoint, remove_checkpoint, write_checkpoint
+from policies import make_policy, scripted_decision
+from metrics import DECISION_TIMEOUTS, FAILED_ACTIONS, HEDGED_REQUESTS, MAINTENANCE_FALLBACKS, STREAMED_DECISIONS, TRACE_DIR, Trace, current_trace, record, span, span_labels
 from dotenv import load_dotenv
 import os
 import json
 
+# Competitions and the model decision path. The game rules live in engine.py and the web app in
+# server.py; autogen, openai, FastAPI and the solver are imported on first use, so headless runs
+# and worker processes start without them. main.app still resolves to the server's app.
+
 load_dotenv()
 
-app = FastAPI()
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
-@app.get("/", response_class=HTMLResponse)
-async def read_root():
-    with open("static/index.html", "r") as f:
-        return f.read()
-
-openai_api_key = os.getenv("OPENAI_API_KEY")
-config_list_gpt4 = [{"model": "gpt-4o-mini", "api_key": openai_api_key}]
-# config_list_gpt4 = [{"model": "gpt-3.5-turbo", "api_key": openai_api_key}]
-config_list_gpt35 = [{"model": "gpt-3.5-turbo", "api_key": openai_api_key}]
-
-competition_running = False
-simulation_task = None
-
-class GameState(BaseModel):
-    day: int = 1
-    money: int = GAME_RULES["starting_money"]
-    reserved_money: int = 0  # New field to track money reserved for buy orders
-    energy: int = GAME_RULES["max_energy"]
-    crops: List[Dict] = []
-    harvested_crops: Dict[str, int] = {}
-    pending_trades: List[Dict] = []
-    buy_offers: List[Dict] = []
-    sell_offers: List[Dict] = []
-
-class ActionLog(BaseModel):
-    day: int
-    action: str
-    details: str
+logger = logging.getLogger(__name__)
+
+# The mock backend never calls the provider, but autogen refuses to build an agent without a key
+openai_api_key = os.getenv("OPENAI_API_KEY") or ("mock" if os.getenv("LLM_BACKEND") == "mock" else None)
+# Point at any OpenAI-compatible server, e.g. the local mock in mock_llm.py
+openai_base_url = os.getenv("OPENAI_BASE_URL")
+
+def model_config(model: str) -> Dict:
+    config = {"model": model, "api_key": openai_api_key}
+    if openai_base_url:
+        config["base_url"] = openai_base_url
+    return config
+
+config_list_gpt4 = [model_config("gpt-4o-mini")]
+# config_list_gpt4 = [model_config("gpt-3.5-turbo")]
+config_list_gpt35 = [model_config("gpt-3.5-turbo")]
+
+# LLM_BACKEND=mock answers decisions from an in-process MockLLM instead of calling the provider
+llm_backend = None
+if os.getenv("LLM_BACKEND") == "mock":
+    llm_backend = MockLLM(
+        latency=os.getenv("MOCK_LLM_LATENCY", "fixed:0"),
+        error_rate=float(os.getenv("MOCK_LLM_ERROR_RATE", "0")),
+        malformed_rate=float(os.getenv("MOCK_LLM_MALFORMED_RATE", "0")),
+        token_delay=float(os.getenv("MOCK_LLM_TOKEN_DELAY", "0")),
+        trailer_rate=float(os.getenv("MOCK_LLM_TRAILER_RATE", "0"))
+    )
+
+# LLM_STREAMING=1 streams completions and stops reading as soon as the Final Decision line is complete
+LLM_STREAMING = os.getenv("LLM_STREAMING") == "1"
+
+# Opt-in: DECISION_CACHE=memory or DECISION_CACHE=/path/to/cache.sqlite
+decision_cache = get_cache(os.getenv("DECISION_CACHE"))
+# Opt-in: GAME_RESULTS_DB=/path/to/results.sqlite keeps every game's per-day results for analytics
+results_store = get_store(DEFAULT_RESULTS_DB)
+# Games in progress are checkpointed here so they can be resumed; GAME_CHECKPOINT_DIR= turns it off
+checkpoint_dir = DEFAULT_CHECKPOINT_DIR
 
 def create_assistant(name, config_list):
+    import autogen
     return autogen.AssistantAgent(
         name=name,
-        system_message=f"""You are an experienced farmer NPC in a farming simulation game. 
-        Make optimal choices based on the provided game rules and remaining time.
-        Game Rules: {GAME_RULES}""",
+        system_message=SYSTEM_PREFIX,
         llm_config={"config_list": config_list}
     )
 
-assistant_gpt4 = create_assistant("FarmerNPC_GPT4", config_list_gpt4)
-assistant_gpt35 = create_assistant("FarmerNPC_GPT35", config_list_gpt35)
-
-user_proxy = autogen.UserProxyAgent(
-    name="GameState",
-    human_input_mode="NEVER",
-    max_consecutive_auto_reply=10,
-    is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE")
-)
-
-def plant_crop(state: GameState, crop_type: str, action_log: List[ActionLog]):
-    if crop_type in GAME_RULES["crops"] and state.money >= GAME_RULES["crops"][crop_type]["cost"] and state.energy >= GAME_RULES["energy_cost"]["plant"]:
-        state.crops.append({"type": crop_type, "planted_at": state.day})
-        state.money -= GAME_RULES["crops"][crop_type]["cost"]
-        state.energy -= GAME_RULES["energy_cost"]["plant"]
-        action_log.append(ActionLog(day=state.day, action="Plant", details=f"Planted {crop_type}"))
-    else:
-        state.energy = max(0, state.energy - ACTION_PENALTIES["plant"])
-        action_log.append(ActionLog(day=state.day, action="Failed Plant", details=f"Attempted to plant {crop_type} but lacked resources. Energy penalty applied."))
-
-def harvest_crop(state: GameState, action_log: List[ActionLog]):
-    harvestable_crops = [crop for crop in state.crops if state.day - crop["planted_at"] >= GAME_RULES["crops"][crop["type"]]["growth_time"]]
-    
-    if harvestable_crops and state.energy >= GAME_RULES["energy_cost"]["harvest"]:
-        state.energy -= GAME_RULES["energy_cost"]["harvest"]
-        
-        # Get all pending sell orders
-        pending_sell_orders = {trade["crop_type"]: trade["amount"] for trade in state.pending_trades if trade["type"] == "sell"}
-        
-        total_harvested = 0
-        total_money_earned = 0
-        harvested_counts = {crop_type: 0 for crop_type in GAME_RULES["crops"]}
-        
-        for crop in harvestable_crops[:]:
-            crop_type = crop["type"]
-            # Skip this crop if we've harvested enough to fulfill pending sell orders
-            if harvested_counts[crop_type] < pending_sell_orders.get(crop_type, 0):
-                harvested_counts[crop_type] += 1
-                continue
-            
-            state.crops.remove(crop)
-            
-            # Apply yield multiplier for damaged crops
-            yield_multiplier = SABOTAGE_RULES["damaged_crop_yield_factor"] if crop.get("damaged", False) else 1
-            harvest_amount = int(yield_multiplier * 1)  # Assuming 1 is the normal yield
-            
-            # Apply discount to sell price
-            discounted_price = GAME_RULES["crops"][crop_type]["sell_price"] * GAME_RULES["harvest_sell_discount"]
-            money_earned = harvest_amount * discounted_price
-            
-            total_harvested += harvest_amount
-            total_money_earned += money_earned
-            state.money += money_earned
-        
-        action_log.append(ActionLog(day=state.day, action="Harvest", details=f"Harvested {total_harvested} crops, earned {total_money_earned:.2f} money"))
-    else:
-        state.energy = max(0, state.energy - ACTION_PENALTIES["harvest"])
-        action_log.append(ActionLog(day=state.day, action="Failed Harvest", details="No harvestable crops or insufficient energy. Energy penalty applied."))
-
-def perform_maintenance(state: GameState, action_log: List[ActionLog]):
-    if state.energy >= GAME_RULES["energy_cost"]["maintenance"]:
-        state.energy -= GAME_RULES["energy_cost"]["maintenance"]
-        action_log.append(ActionLog(day=state.day, action="Maintenance", details="Performed farm maintenance"))
-    else:
-        state.energy = max(0, state.energy - ACTION_PENALTIES["maintenance"])
-        action_log.append(ActionLog(day=state.day, action="Failed Maintenance", details="Insufficient energy for maintenance, rested instead. Small energy penalty applied."))
-
-def sell_crops(state: GameState, other_state: GameState, crop_type: str, amount: int, action_log: List[ActionLog]):
-    if state.energy >= TRADING_RULES["trade_energy_cost"]:
-        state.energy -= TRADING_RULES["trade_energy_cost"]
-        
-        # Initialize the crop_type in harvested_crops if it doesn't exist
-        if crop_type not in state.harvested_crops:
-            state.harvested_crops[crop_type] = 0
-        
-        available_harvested = state.harvested_crops.get(crop_type, 0)
-        harvestable_crops = [crop for crop in state.crops if state.day - crop["planted_at"] >= GAME_RULES["crops"][crop["type"]]["growth_time"] and crop["type"] == crop_type]
-        
-        if available_harvested + len(harvestable_crops) >= amount:
-            trade_value = GAME_RULES["crops"][crop_type]["sell_price"] * amount
-            trade_fee = trade_value * TRADING_RULES["trade_fee_percentage"]
-            
-            # Calculate how much to sell from harvested crops
-            from_harvested = min(amount, state.harvested_crops[crop_type])
-            to_harvest = amount - from_harvested
-            
-            # Update the state
-            state.harvested_crops[crop_type] -= from_harvested
-            if state.harvested_crops[crop_type] == 0:
-                del state.harvested_crops[crop_type]
-            
-            for _ in range(to_harvest):
-                crop = next(crop for crop in state.crops if crop["type"] == crop_type and state.day - crop["planted_at"] >= GAME_RULES["crops"][crop["type"]]["growth_time"])
-                state.crops.remove(crop)
-            
-            # Create a pending trade
-            pending_trade = {
-                "type": "sell",
-                "crop_type": crop_type,
-                "amount": amount,
-                "value": trade_value,
-                "fee": trade_fee,
-                "expiration": state.day + TRADING_RULES["order_expiration_days"]
-            }
-            state.pending_trades.append(pending_trade)
-            
-            action_log.append(ActionLog(day=state.day, action="Offer to Sell", details=f"Offered to sell {amount} {crop_type} for {trade_value - trade_fee} money"))
-            
-            # Check if there's a matching buy offer
-            matching_buy = next((trade for trade in other_state.pending_trades if trade["type"] == "buy" and trade["crop_type"] == crop_type and trade["amount"] >= amount), None)
-            if matching_buy:
-                complete_trade(other_state, state, pending_trade, action_log)
-            else:
-                # If no matching buy offer, create a sell offer
-                other_state.sell_offers.append(pending_trade)
-        else:
-            state.energy = max(0, state.energy - TRADING_RULES["trade_penalty"])
-            action_log.append(ActionLog(day=state.day, action="Failed Sell", details=f"Insufficient crops to sell. Energy penalty of {TRADING_RULES['trade_penalty']} applied."))
-    else:
-        action_log.append(ActionLog(day=state.day, action="Failed Sell", details="Insufficient energy for selling"))
-
-def buy_crops(state: GameState, other_state: GameState, crop_type: str, amount: int, action_log: List[ActionLog]):
-    # Initialize crop_type in relevant dictionaries if they don't exist
-    if crop_type not in state.crops:
-        state.crops[crop_type] = 0
-    if crop_type not in state.harvested_crops:
-        state.harvested_crops[crop_type] = 0
-    if crop_type not in other_state.harvested_crops:
-        other_state.harvested_crops[crop_type] = 0
-
-    if state.energy >= TRADING_RULES["trade_energy_cost"]:
-        state.energy -= TRADING_RULES["trade_energy_cost"]
-        
-        trade_value = GAME_RULES["crops"][crop_type]["sell_price"] * amount
-        
-        if state.money - state.reserved_money >= trade_value:
-            # Reserve money for the buy order
-            state.reserved_money += trade_value
-            
-            # Create a pending trade
-            pending_trade = {
-                "type": "buy",
-                "crop_type": crop_type,
-                "amount": amount,
-                "value": trade_value,
-                "expiration": state.day + TRADING_RULES["order_expiration_days"]
-            }
-            state.pending_trades.append(pending_trade)
-            
-            action_log.append(ActionLog(day=state.day, action="Offer to Buy", details=f"Offered to buy {amount} {crop_type} for {trade_value} money"))
-            
-            # Check if there's a matching sell offer
-            matching_sell = next((offer for offer in other_state.sell_offers if offer["crop_type"] == crop_type and offer["amount"] >= amount), None)
-            if matching_sell:
-                complete_trade(state, other_state, pending_trade, action_log)
-            else:
-                # If no matching sell offer, create a buy offer
-                other_state.buy_offers.append(pending_trade)
-        else:
-            state.energy = max(0, state.energy - TRADING_RULES["trade_penalty"])
-            action_log.append(ActionLog(day=state.day, action="Failed Buy", details=f"Insufficient funds for buying. Energy penalty of {TRADING_RULES['trade_penalty']} applied."))
-    else:
-        action_log.append(ActionLog(day=state.day, action="Failed Buy", details="Insufficient energy for buying"))
-
-def complete_trade(buyer_state: GameState, seller_state: GameState, trade: Dict, action_log: List[ActionLog]):
-    buyer_pending_trade = next((t for t in buyer_state.pending_trades if t["type"] == "buy" and t["crop_type"] == trade["crop_type"] and t["amount"] == trade["amount"]), None)
-    seller_pending_trade = next((t for t in seller_state.pending_trades if t["type"] == "sell" and t["crop_type"] == trade["crop_type"] and t["amount"] == trade["amount"]), None)
-    
-    if buyer_pending_trade and seller_pending_trade:
-        # Update money for both farms
-        buyer_state.reserved_money -= trade["value"]  # Release reserved money
-        buyer_state.money -= trade["value"]
-        seller_state.money += trade["value"] - seller_pending_trade["fee"]
-        
-        # Transfer crops
-        for _ in range(trade["amount"]):
-            buyer_state.crops.append({"type": trade["crop_type"], "planted_at": buyer_state.day})
-        
-        # Remove pending trades
-        buyer_state.pending_trades.remove(buyer_pending_trade)
-        seller_state.pending_trades.remove(seller_pending_trade)
-        
-        # Remove offers if they exist
-        if buyer_pending_trade in seller_state.buy_offers:
-            seller_state.buy_offers.remove(buyer_pending_trade)
-        if seller_pending_trade in buyer_state.sell_offers:
-            buyer_state.sell_offers.remove(seller_pending_trade)
-        
-        action_log.append(ActionLog(day=buyer_state.day, action="Complete Trade", details=f"Completed trade of {trade['amount']} {trade['crop_type']} for {trade['value']} money"))
-    else:
-        action_log.append(ActionLog(day=buyer_state.day, action="Failed Trade Completion", details="Matching pending trades not found"))
-
-def attempt_sabotage(state: GameState, other_state: GameState, action_log: List[ActionLog]):
-    if state.energy >= SABOTAGE_RULES["sabotage_energy_cost"] and state.money >= SABOTAGE_RULES["sabotage_money_cost"]:
-        state.energy -= SABOTAGE_RULES["sabotage_energy_cost"]
-        state.money -= SABOTAGE_RULES["sabotage_money_cost"]
-        
-        if random.random() < SABOTAGE_RULES["sabotage_success_rate"]:
-            # Successful sabotage
-            damaged_crops = random.sample(other_state.crops, k=min(len(other_state.crops), SABOTAGE_RULES["max_crops_damaged"]))
-            for crop in damaged_crops:
-                crop["damaged"] = True
-            action_log.append(ActionLog(day=state.day, action="Sabotage", details="Successfully sabotaged the other farm"))
-        else:
-            action_log.append(ActionLog(day=state.day, action="Failed Sabotage", details="Sabotage attempt failed"))
-    else:
-        action_log.append(ActionLog(day=state.day, action="Failed Sabotage", details="Insufficient energy or money for sabotage attempt"))
+# Models a farm can be played by, as (assistant name, config list); farms on the same model share its assistant
+FARM_ASSISTANTS = {"gpt35": ("FarmerNPC_GPT35", config_list_gpt35), "gpt4": ("FarmerNPC_GPT4", config_list_gpt4)}
+_assistants: Dict[str, object] = {}
+
+def get_assistant(model: str):
+    # Built on first use: creating an agent imports autogen
+    if model not in _assistants:
+        _assistants[model] = create_assistant(*FARM_ASSISTANTS[model])
+    return _assistants[model]
+# Offline players that need no model calls, created per farm with make_policy
+FARM_POLICIES = ("rollout", "scripted", "random")
+DEFAULT_FARMS = "gpt35,gpt4"
+MAX_FARMS = int(os.getenv("MAX_FARMS", "64"))
+# Per-game cap on decisions in flight; the process-wide llm_limiter still applies on top
+DECISION_CONCURRENCY = int(os.getenv("DECISION_CONCURRENCY", "16"))
+# Each farm's decision must arrive within the deadline or the fallback policy moves for it (0 waits forever)
+DECISION_DEADLINE_SECONDS = float(os.getenv("DECISION_DEADLINE_SECONDS", "30"))
+# Send a second, hedged request if the first has not answered by then (0 disables hedging)
+HEDGE_AFTER_SECONDS = float(os.getenv("HEDGE_AFTER_SECONDS", "0"))
+
+def parse_farms(spec: str) -> List[Tuple[str, str]]:
+    # "gpt4,gpt35,gpt4" -> [("gpt4_1", "gpt4"), ("gpt35", "gpt35"), ("gpt4_2", "gpt4")]
+    models = [model.strip() for model in spec.split(",") if model.strip()]
+    unknown = sorted(set(models) - set(FARM_ASSISTANTS) - set(FARM_POLICIES))
+    if unknown:
+        raise ValueError(f"Unknown farm models: {', '.join(unknown)}")
+    if not 2 <= len(models) <= MAX_FARMS:
+        raise ValueError(f"A competition needs between 2 and {MAX_FARMS} farms")
+    totals = Counter(models)
+    seen = Counter()
+    farms = []
+    for model in models:
+        seen[model] += 1
+        farms.append((model if totals[model] == 1 else f"{model}_{seen[model]}", model))
+    return farms
+
+def create_user_proxy():
+    import autogen
+    return autogen.UserProxyAgent(
+        name="GameState",
+        human_input_mode="NEVER",
+        max_consecutive_auto_reply=10,
+        is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE")
+    )
 
-def update_state(state: GameState, other_state: GameState, decision: str, action_log: List[ActionLog]):
-    decision_parts = decision.split()
-    action_number = decision_parts[0]
-    action = decision_parts[1]
-    
-    if action_number == "1":
-        crop_type = decision_parts[2]
-        plant_crop(state, crop_type, action_log)
-    elif action_number == "2":
-        harvest_crop(state, action_log)
-    elif action_number == "3":
-        perform_maintenance(state, action_log)
-    elif action_number == "4":
-        crop_type = decision_parts[2]
-        amount = int(decision_parts[3])
-        sell_crops(state, other_state, crop_type, amount, action_log)
-    elif action_number == "5":
-        crop_type = decision_parts[2]
-        amount = int(decision_parts[3])
-        buy_crops(state, other_state, crop_type, amount, action_log)
-    elif action_number == "6":
-        attempt_sabotage(state, other_state, action_log)
-
-    # Handle order expiration
-    expired_buy_orders = [trade for trade in state.pending_trades if trade["type"] == "buy" and trade["expiration"] <= state.day]
-    for expired_order in expired_buy_orders:
-        state.reserved_money -= expired_order["value"]
-        state.pending_trades.remove(expired_order)
-        if expired_order in other_state.buy_offers:
-            other_state.buy_offers.remove(expired_order)
-        action_log.append(ActionLog(day=state.day, action="Buy Order Expired", details=f"Buy order for {expired_order['amount']} {expired_order['crop_type']} expired. {expired_order['value']} money returned."))
-
-    state.sell_offers = [offer for offer in state.sell_offers if offer["expiration"] > state.day]
-
-    # Return expired sell offers to harvested crops
-    for expired_offer in [offer for offer in state.sell_offers if offer["expiration"] <= state.day]:
-        state.harvested_crops[expired_offer["crop_type"]] = state.harvested_crops.get(expired_offer["crop_type"], 0) + expired_offer["amount"]
-
-    state.day += 1
-    state.energy = min(state.energy + GAME_RULES["energy_regen_per_day"], GAME_RULES["max_energy"])
-
-async def make_decision(assistant, state: GameState, other_state: GameState, days_left: int):
-    # Calculate harvestable crops
-    harvestable_crops = [crop for crop in state.crops if state.day - crop["planted_at"] >= GAME_RULES["crops"][crop["type"]]["growth_time"]]
-    
-    # Calculate days until next harvest for each crop
-    crops_info = []
-    for crop in state.crops:
-        days_until_harvest = max(0, GAME_RULES["crops"][crop["type"]]["growth_time"] - (state.day - crop["planted_at"]))
-        crops_info.append(f"{crop['type']} (ready in {days_until_harvest} days)")
-
-    # Prepare order book information
-    buy_offers = [f"{offer['crop_type']}: {offer['amount']} @ {offer['value']/offer['amount']:.2f}" for offer in other_state.buy_offers]
-    sell_offers = [f"{offer['crop_type']}: {offer['amount']} @ {offer['value']/offer['amount']:.2f}" for offer in other_state.sell_offers]
-
-    message = f"""
-Current farm state on day {state.day}:
-- Money: {state.money}
-- Energy: {state.energy}
-- Crops: {crops_info}
-- Harvestable crops: {[crop['type'] for crop in harvestable_crops]}
-- Days left in the game: {days_left}
-
-Order Book:
-Buy Offers: {buy_offers if buy_offers else "None"}
-Sell Offers: {sell_offers if sell_offers else "None"}
-
-Game Rules:
-{GAME_RULES}
-
-Trading Rules:
-{TRADING_RULES}
-
-Sabotage Rules:
-{SABOTAGE_RULES}
-
-Instructions:
-1. Analyze the current situation based on the farm state, order book, and game rules.
-2. Consider the best course of action, thinking through your decision step by step.
-3. After your analysis, you MUST conclude with EXACTLY ONE of the following decisions:
-
-   1 Plant Wheat
-   1 Plant Corn
-   1 Plant Tomato
-   2 Harvest
-   3 Maintenance
-   5 Buy [crop_type] [amount]
-   6 Sabotage
-
-Your response MUST strictly adhere to this format:
-```
-[Your step-by-step analysis here]
-
-Final Decision:
-[ONLY ONE of the exact options listed above]
-```
-
-Critically important rules:
-- Your response MUST end with "Final Decision:" followed by ONLY ONE of the exact options listed above.
-- Do not include any other text, numbers, or explanations after the Final Decision line.
-- The final decision must be word-for-word one of the options provided, including the number.
-- Ensure there is an empty line before "Final Decision:".
-- Do not use any punctuation or additional formatting in the Final Decision line.
-- Only choose "2 Harvest" if there are harvestable crops available.
-- Choose "3 Maintenance" if you want to wait or perform maintenance (it serves as both).
-- For selling, specify the crop type and amount (e.g., "4 Sell Wheat 2"). Only harvestable crops can be sold.
-- For buying, specify the crop type and amount (e.g., "5 Buy Corn 3"). Crops can be bought only if there is sufficient money.
-- Attempting to violate these rules will result in a failed action and a penalty.
-- Sabotage is a risky action that can potentially damage the other farm's crops.
-
-Example of correct final parts of your response:
-
-Example 1:
-Step 5: Based on the analysis, planting Tomato seems to be the most profitable choice.
-
-Final Decision:
-1 Plant Tomato
-
-Example 2:
-Step 5: Selling some excess Wheat could be beneficial.
-
-Final Decision:
-4 Sell Wheat 2
-
-Example 3:
-Step 5: Buying some Corn might diversify our crop portfolio.
-
-Final Decision:
-5 Buy Corn 3
-
-Example 4:
-Step 5: Attempting sabotage might give us an edge, but it's risky.
-
-Final Decision:
-6 Sabotage
-
-Failure to follow this format exactly will result in a default "Maintenance" action being taken.
-"""
-    
-    response = await user_proxy.a_initiate_chat(assistant, message=message, max_turns=1)
-    
-    # Extract the content from the ChatResult object
-    response_content = response.summary if isinstance(response, autogen.ChatResult) else str(response)
-    
-    # Use regex to find a decision in the format: number followed by action and optional crop
-    pattern = r'(\d+)\.?\s+(Plant|Harvest|Wait|Maintenance|Sell|Buy|Sabotage)(?:\s+(\w+))?(?:\s+(\d+))?$'
-    decision_match = re.findall(pattern, response_content, re.MULTILINE | re.IGNORECASE)
+_user_proxy = None
+
+def get_user_proxy():
+    global _user_proxy
+    if _user_proxy is None:
+        _user_proxy = create_user_proxy()
+    return _user_proxy
+
+def __getattr__(name: str):
+    # Module-level names that used to be built at import time
+    if name == "app":
+        from server import app
+        return app
+    if name == "assistant_gpt4":
+        return get_assistant("gpt4")
+    if name == "assistant_gpt35":
+        return get_assistant("gpt35")
+    if name == "user_proxy":
+        return get_user_proxy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+async def make_decision(assistant, state: GameState, market: OrderBook, days_left: int, cache: Optional[DecisionCache] = None, builder: PromptBuilder = prompt_builder, proxy=None, rivals: Sequence[str] = (), hedge_proxy=None, events: Optional[List[Tuple[str, str]]] = None):
+    # The rules and answer format are in the assistant's system message; the turn prompt only carries state
+    with span("prompt"):
+        message, _ = builder.build(state, market, days_left, rivals)
+
+    if cache is not None:
+        cache_key = DecisionCache.make_key(assistant.llm_config["config_list"][0]["model"], assistant.system_message, message)
+        cached_decision = cache.get(cache_key)
+        if cached_decision is not None:
+            return cached_decision
+
+    decision, answered = await request_decision(assistant, message, proxy, hedge_proxy, events)
+    # Fallbacks are not cached, or one failed call would decide that state for the rest of the cache's life
+    if cache is not None and answered:
+        cache.put(cache_key, decision)
+    return decision
+
+# Set by a decision waiting on its deadline; a model call sets it once it is past the limiter, so
+# time spent queued for a decision slot or the limiter does not count against the deadline
+model_call_started: contextvars.ContextVar[Optional[asyncio.Event]] = contextvars.ContextVar("model_call_started", default=None)
+
+async def call_model(assistant, message: str, proxy) -> str:
+    # All model calls in the process share one concurrency / rate limiter
+    waiting_since = time.perf_counter()
+    async with llm_limiter:
+        record("limiter_wait", waiting_since, time.perf_counter() - waiting_since)
+        started = model_call_started.get()
+        if started is not None:
+            started.set()
+        with span("model"):
+            if LLM_STREAMING:
+                return await stream_model(assistant, message)
+            if llm_backend is not None:
+                return await llm_backend.complete(message)
+            import autogen
+            response = await (proxy or get_user_proxy()).a_initiate_chat(assistant, message=message, max_turns=1)
+            # Extract the content from the ChatResult object
+            return response.summary if isinstance(response, autogen.ChatResult) else str(response)
+
+_openai_clients: Dict[Tuple, object] = {}
+
+async def openai_stream(assistant, message: str) -> AsyncIterator[str]:
+    # Streamed chat completion with the same system message and prompt the assistant would send
+    config = assistant.llm_config["config_list"][0]
+    key = (config.get("api_key"), config.get("base_url"))
+    if key not in _openai_clients:
+        from openai import AsyncOpenAI
+        _openai_clients[key] = AsyncOpenAI(api_key=key[0], base_url=key[1])
+    stream = await _openai_clients[key].chat.completions.create(
+        model=config["model"],
+        messages=[{"role": "system", "content": assistant.system_message}, {"role": "user", "content": message}],
+        stream=True
+    )
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # Closing the response stops the generation server-side
+        await stream.close()
+
+async def stream_model(assistant, message: str) -> str:
+    # Response text up to the decision line, or the whole response if no decision line completed early
+    parser = DecisionStreamParser()
+    chunks = llm_backend.stream(message) if llm_backend is not None else openai_stream(assistant, message)
+    try:
+        async for chunk in chunks:
+            if parser.feed(chunk):
+                STREAMED_DECISIONS.inc(outcome="early")
+                return parser.text
+    finally:
+        await chunks.aclose()
+    STREAMED_DECISIONS.inc(outcome="complete")
+    return parser.text
+
+async def call_model_hedged(assistant, message: str, proxy, hedge_proxy, events: List[Tuple[str, str]]) -> str:
+    # If the first request has not answered after HEDGE_AFTER_SECONDS, send a second one on its own
+    # proxy and take whichever succeeds first
+    first = asyncio.ensure_future(call_model(assistant, message, proxy))
+    tasks = [first]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=HEDGE_AFTER_SECONDS)
+        if not done:
+            tasks.append(asyncio.ensure_future(call_model(assistant, message, hedge_proxy)))
+            events.append(("Hedged Request", f"No answer after {HEDGE_AFTER_SECONDS}s, sent a second request"))
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(tasks) > 1:
+                        winner = "first" if task is first else "hedge"
+                        HEDGED_REQUESTS.inc(winner=winner)
+                        events.append(("Hedge Result", f"The {winner} request answered first"))
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+# A decision in the format: number followed by action and optional crop, ending its line; markdown
+# emphasis or code markers and a CRLF line ending around it are allowed
+DECISION_PATTERN = re.compile(r'(\d+)\.?\s+(Plant|Harvest|Wait|Maintenance|Sell|Buy|Sabotage)(?:\s+(\w+))?(?:\s+(\d+))?[ \t*_`.]*\r?$', re.MULTILINE | re.IGNORECASE)
+# "Final Decision:" at the start of a line, allowing markdown emphasis or a heading around it
+FINAL_DECISION_MARKER = re.compile(r'[\s*#_]*final decision[\s*_]*:?', re.IGNORECASE)
+
+def match_decision(response_content: str) -> Optional[str]:
+    # The last decision in the response, or None if the model gave none
+    with span("parse"):
+        decision_match = DECISION_PATTERN.findall(response_content)
     
     if decision_match:
         last_match = decision_match[-1]
         action_number, action, crop, amount = last_match
+        # A plant needs its crop and a trade its crop and amount; without them the reply is unusable
+        if (action_number == "1" and not crop) or (action_number in ("4", "5") and not (crop and amount)):
+            return None
         crop = crop if crop else None
         amount = amount if amount else None
         return f"{action_number} {action} {crop} {amount}".strip()
-
-    # If no valid decision format is found, default to waiting
-    return "3 Maintenance"
-
-@app.get("/stream-competition")
-async def stream_competition(request: Request):
-    global competition_running
-    if competition_running:
-        return JSONResponse(content={"error": "Competition already running"}, status_code=400)
-    
-    competition_running = True
-
-    async def event_generator():
+    return None
+
+class DecisionStreamParser:
+    # Fed a streamed response chunk by chunk. Done once a complete line after "Final Decision:"
+    # matches the decision format; text then ends with that line, so match_decision reads the same
+    # decision from it as from the full response. Lines are only judged once their newline arrives
+    # (a "5 Buy Corn" may still become "5 Buy Corn 3"); a response ending without one is parsed whole.
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._line_start = 0
+        self._after_marker = False
+
+    def feed(self, chunk: str) -> bool:
+        if self.done:
+            return True
+        self.text += chunk
+        while True:
+            line_end = self.text.find("\n", self._line_start)
+            if line_end < 0:
+                return False
+            line = self.text[self._line_start:line_end]
+            self._line_start = line_end + 1
+            marker = FINAL_DECISION_MARKER.match(line)
+            if marker:
+                self._after_marker = True
+                line = line[marker.end():]
+            if self._after_marker and DECISION_PATTERN.search(line.strip()):
+                self.text = self.text[:line_end].rstrip()
+                self.done = True
+                return True
+
+async def request_decision(assistant, message: str, proxy, hedge_proxy=None, events: Optional[List[Tuple[str, str]]] = None) -> Tuple[str, bool]:
+    # The decision, and whether the model gave it (False for the Maintenance fallback)
+    try:
+        if HEDGE_AFTER_SECONDS and hedge_proxy is not None:
+            response_content = await call_model_hedged(assistant, message, proxy, hedge_proxy, events if events is not None else [])
+        else:
+            response_content = await call_model(assistant, message, proxy)
+    except Exception:
+        # A failed model call should not end the game; treat it like an unparseable answer
+        logger.warning("Model call for %s failed, defaulting to Maintenance", assistant.name, exc_info=True)
+        MAINTENANCE_FALLBACKS.inc(reason="model_error")
+        return "3 Maintenance", False
+    decision = match_decision(response_content)
+    if decision is None:
+        MAINTENANCE_FALLBACKS.inc(reason="unparsed")
+        return "3 Maintenance", False
+    return decision, True
+
+def farm_payload(state: GameState, day, decision: str) -> Dict:
+    # Crops as [type, planted_at, count] from the ledger's buckets, so building a frame costs the
+    # same however many crops a farm holds; only snapshot frames expand them (frames.py)
+    crops = Counter()
+    for crop_type, planted_at, _, count in state.crops.planted():
+        crops[(crop_type, planted_at)] += count
+    return {
+        "day": day,
+        "decision": decision,
+        "money": state.money,
+        "energy": state.energy,
+        "crops": [[crop_type, planted_at, count] for (crop_type, planted_at), count in crops.items()]
+    }
+
+def resume_session(session_id: str) -> Optional[Tuple[CompetitionSession, Dict]]:
+    # A new session for a checkpointed game, and the checkpoint to pass to run_competition
+    check_session_id(session_id)
+    checkpoint = load_checkpoint(checkpoint_dir, session_id) if checkpoint_dir else None
+    if checkpoint is None:
+        return None
+    sessions.remove(session_id)
+    session = sessions.create(session_id, checkpoint["seed"], checkpoint["farms"])
+    session.started_at = checkpoint["started_at"]
+    return session, checkpoint
+
+def persist_checkpoint(session_id: str, pickled: bytes, recorded_days: RecordedDays):
+    # Runs in a thread. The days and result rows up to the checkpoint are on disk before it is
+    recorded_days.sync()
+    if results_store is not None:
+        results_store.flush()
+    write_checkpoint(checkpoint_dir, session_id, pickled)
+
+_optimal_money: Optional[asyncio.Future] = None
+
+def optimal_money_future() -> asyncio.Future:
+    # One solve per process shared by every game: lru_cache on optimal_money does not merge calls
+    # that are still running, so concurrent games would each start their own
+    global _optimal_money
+    if _optimal_money is None or _optimal_money.get_loop() is not asyncio.get_running_loop():
+        from solver import optimal_money
+        _optimal_money = asyncio.ensure_future(asyncio.to_thread(optimal_money))
+    return _optimal_money
+
+async def run_competition(session: CompetitionSession, checkpoint: Optional[Dict] = None):
+    # With a checkpoint from resume_session, the game carries on from the day after it was taken
+    names = [name for name, _ in session.farms]
+    assistants = {name: get_assistant(model) for name, model in session.farms if model in FARM_ASSISTANTS}
+    farm_policies = {name: make_policy(model, session.seed + i) for i, (name, model) in enumerate(session.farms) if model in FARM_POLICIES}
+    # One proxy per model-played farm: farms sharing an assistant must not share a chat with it
+    for name in assistants:
+        if name not in session.user_proxies:
+            session.user_proxies[name] = create_user_proxy()
+    states = {name: GameState(money=GAME_RULES["starting_money"], energy=GAME_RULES["max_energy"], day=1) for name in names}
+    market = OrderBook()
+    rng = random.Random(session.seed)
+    models = dict(session.farms)
+    decision_slots = asyncio.Semaphore(DECISION_CONCURRENCY)
+    game_id = f"{session.session_id}-{int(session.started_at)}"
+    # Bounded per-farm logs; the full logs are streamed to ACTION_LOG_DIR when it is set
+    logs = {name: ActionLogBuffer(spill_path=os.path.join(ACTION_LOG_DIR, f"{game_id}-{name}.jsonl") if ACTION_LOG_DIR else None) for name in names}
+    first_day = 1
+    if checkpoint is not None:
+        game_id = checkpoint["game_id"]
+        states, market, logs, farm_policies, recorded_days = checkpoint["states"], checkpoint["market"], checkpoint["logs"], checkpoint["policies"], checkpoint["recorded_days"]
+        rng.setstate(checkpoint["rng"])
+        first_day = checkpoint["day"]
+        if results_store is not None:
+            # Rows another batch flushed after the checkpoint are played again
+            results_store.drop_days(game_id, first_day)
+    else:
+        # On disk beside the checkpoints, which then only hold how much of it to keep
+        recorded_days = RecordedDays(days_path(checkpoint_dir, session.session_id) if checkpoint_dir else None)
+    finished = False
+    # Score against the best single-farm result, solved in a thread while the game runs unless
+    # an earlier process already cached it on disk
+    optimal_future = optimal_money_future()
+    trace = Trace(game_id) if TRACE_DIR else None
+    current_trace.set(trace)
+
+    async def choose(name, days_left, events):
+        if name in farm_policies:
+            model_call_started.get().set()
+            return await farm_policies[name].decide(states[name], market, days_left)
+        async with decision_slots:
+            rivals = [other for other in names if other != name]
+            hedge_proxy = None
+            if HEDGE_AFTER_SECONDS:
+                hedge_proxy = session.user_proxies.get(f"{name}/hedge") or session.user_proxies.setdefault(f"{name}/hedge", create_user_proxy())
+            return await make_decision(assistants[name], states[name], market, days_left, decision_cache, proxy=session.user_proxies[name], rivals=rivals, hedge_proxy=hedge_proxy, events=events)
+
+    async def decide(name, day, days_left):
+        # Runs in its own task under gather, so the labels only apply to this farm's spans
+        span_labels.set({"farm": name, "day": day})
+        events = []
+        # The deadline starts once the decision is being made, not while it waits for a slot; a
+        # cached decision may finish before then
+        started = asyncio.Event()
+        model_call_started.set(started)
+        choosing = asyncio.ensure_future(choose(name, days_left, events))
+        waiting = asyncio.ensure_future(started.wait())
         try:
-            async for state in run_competition():
-                if await request.is_disconnected():
-                    break
-                yield f"data: {json.dumps(state)}\n\n"
-                await asyncio.sleep(0.1)  # Small delay to allow for interruption
+            await asyncio.wait((choosing, waiting), return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            choosing.cancel()
+            raise
         finally:
-            global competition_running
-            competition_running = False
-
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
-
-@app.post("/stop-competition")
-async def stop_competition():
-    global competition_running, simulation_task
-    if competition_running:
-        competition_running = False
-        if simulation_task:
-            await simulation_task
-            simulation_task = None
-    return JSONResponse(content={"message": "Competition stopped"})
-
-def clear_order_book(state: GameState):
-    # Return reserved money from buy orders
-    state.money += state.reserved_money
-    state.reserved_money = 0
-
-    # Return crops from sell orders to harvested_crops
-    for trade in state.pending_trades:
-        if trade["type"] == "sell":
-            state.harvested_crops[trade["crop_type"]] = state.harvested_crops.get(trade["crop_type"], 0) + trade["amount"]
-
-    # Clear pending trades and offers
-    state.pending_trades.clear()
-    state.buy_offers.clear()
-    state.sell_offers.clear()
-
-async def run_competition():
-    global simulation_task
-    simulation_task = asyncio.current_task()
-    gpt4_state = GameState(money=GAME_RULES["starting_money"], energy=GAME_RULES["max_energy"], crops=[], day=1)
-    gpt35_state = GameState(money=GAME_RULES["starting_money"], energy=GAME_RULES["max_energy"], crops=[], day=1)
-    gpt4_log = []
-    gpt35_log = []
-
-    for current_day in range(1, GAME_RULES["total_days"] + 1):
-        if not competition_running:
-            break
-        
-        days_left = GAME_RULES["total_days"] - current_day + 1
-        
-        # Run decisions for both models concurrently
-        gpt35_decision, gpt4_decision = await asyncio.gather(
-            make_decision(assistant_gpt35, gpt35_state, gpt4_state, days_left),
-            make_decision(assistant_gpt4, gpt4_state, gpt35_state, days_left)
-        )
-        update_state(gpt35_state, gpt4_state, gpt35_decision, gpt35_log)
-        update_state(gpt4_state, gpt35_state, gpt4_decision, gpt4_log)
-        
-        yield {
-            "gpt35": {
-                "day": current_day,
-                "decision": gpt35_decision,
-                "money": gpt35_state.money,
-                "energy": gpt35_state.energy,
-                "crops": [{"type": crop["type"], "planted_at": crop["planted_at"]} for crop in gpt35_state.crops]
-            },
-            "gpt4": {
-                "day": current_day,
-                "decision": gpt4_decision,
-                "money": gpt4_state.money,
-                "energy": gpt4_state.energy,
-                "crops": [{"type": crop["type"], "planted_at": crop["planted_at"]} for crop in gpt4_state.crops]
-            }
-        }
-
-        await asyncio.sleep(0.1)  # Small delay to prevent blocking
-
-    # Clear order books on final day
-    clear_order_book(gpt35_state)
-    clear_order_book(gpt4_state)
-
-    if competition_running:
+            waiting.cancel()
+        try:
+            decision = await asyncio.wait_for(choosing, DECISION_DEADLINE_SECONDS or None)
+        except asyncio.TimeoutError:
+            # A slow or hung call must not hold up the day; the fallback policy moves instead
+            decision = scripted_decision(states[name], days_left)
+            DECISION_TIMEOUTS.inc()
+            events.append(("Decision Timeout", f"No decision within {DECISION_DEADLINE_SECONDS}s, fallback policy chose {decision}"))
+        for action, details in events:
+            logs[name].append(ActionLog(day, action, details))
+        return decision
+
+    try:
+        for current_day in range(first_day, GAME_RULES["total_days"] + 1):
+            if not session.running:
+                break
+            session.day = current_day
+
+            days_left = GAME_RULES["total_days"] - current_day + 1
+
+            # Every farm decides against the same market state, then moves are applied in roster order
+            day_started = time.perf_counter()
+            with span("decide"):
+                decisions = await asyncio.gather(*(decide(name, current_day, days_left) for name in names))
+            for name, decision in zip(names, decisions):
+                logged = logs[name].total
+                labels = span_labels.set({"farm": name, "day": current_day})
+                with span("update_state"):
+                    update_state(states[name], states, decision, logs[name], market, rng)
+                span_labels.reset(labels)
+                entries = logs[name].since(logged)
+                for entry in entries:
+                    if entry.action.startswith("Failed"):
+                        FAILED_ACTIONS.inc(action=entry.action)
+                if results_store is not None:
+                    # The store buffers rows and writes them in batches, so a long game holds none itself
+                    results_store.add_days([day_row(game_id, name, models[name], current_day, decision, entries[0].action if entries else None, states[name])])
+            recorded_days.append(decisions)
+            record("day", day_started, time.perf_counter() - day_started)
+            if checkpoint_dir and current_day % CHECKPOINT_EVERY_DAYS == 0:
+                with span("checkpoint"):
+                    pickled = dump_checkpoint({
+                        "game_id": game_id,
+                        "seed": session.seed,
+                        "farms": session.farms,
+                        "started_at": session.started_at,
+                        "day": current_day + 1,
+                        # Pickled together, so orders in the market still point at these states
+                        "states": states,
+                        "market": market,
+                        "rng": rng.getstate(),
+                        "logs": logs,
+                        "policies": farm_policies,
+                        "recorded_days": recorded_days
+                    })
+                    await asyncio.to_thread(persist_checkpoint, session.session_id, pickled, recorded_days)
+
+            yield {name: farm_payload(states[name], current_day, decision) for name, decision in zip(names, decisions)}
+        finished = session.running
+    finally:
+        # Clear order books on final day
+        for state in states.values():
+            clear_order_book(state, market)
+
+        # Record the decisions played so far, even if the game was stopped or the client left. A
+        # stopped game that is resumed is recorded again when it ends, under the same game_id.
+        # Only finished games are ranked in the results store, next to other full-length games
+        final_money = {name: state.money for name, state in states.items()}
+        if len(recorded_days) and DEFAULT_RECORDINGS_PATH:
+            append_records(DEFAULT_RECORDINGS_PATH, [make_record(game_id, session.seed, names, recorded_days.read(), final_money)])
+        if results_store is not None:
+            if finished:
+                results_store.add_game(game_id, session.seed, len(recorded_days), final_money, models)
+            results_store.flush()
+        recorded_days.close()
+        if finished and checkpoint_dir:
+            remove_checkpoint(checkpoint_dir, session.session_id)
+        for log in logs.values():
+            log.close()
+        if trace is not None:
+            trace.dump(TRACE_DIR)
+
+    if session.running:
+        # Shielded: a cancelled game must not cancel the solve other games are waiting for
+        optimal = await asyncio.shield(optimal_future)
         yield {
-            "gpt35": {
-                "day": "Final",
-                "decision": "Competition finished",
-                "money": gpt35_state.money,
-                "energy": gpt35_state.energy,
-                "crops": [{"type": crop["type"], "planted_at": crop["planted_at"]} for crop in gpt35_state.crops],
-                "harvested_crops": gpt35_state.harvested_crops
-            },
-            "gpt4": {
-                "day": "Final",
-                "decision": "Competition finished",
-                "money": gpt4_state.money,
-                "energy": gpt4_state.energy,
-                "crops": [{"type": crop["type"], "planted_at": crop["planted_at"]} for crop in gpt4_state.crops],
-                "harvested_crops": gpt4_state.harvested_crops
-            }
+            name: {**farm_payload(state, "Final", "Competition finished"), "harvested_crops": state.harvested_crops, "fraction_of_optimal": state.money / optimal}
+            for name, state in states.items()
         }
 
 if __name__ == "__main__":
     import sys
 
     if len(sys.argv) > 1 and sys.argv[1] == "ui":
+        import uvicorn
+        from server import app
         uvicorn.run(app, host="0.0.0.0", port=8000)
+    elif len(sys.argv) > 1 and sys.argv[1] == "tournament":
+        from tournament import main as run_tournament_cli
+        run_tournament_cli(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "replay":
+        from replay import main as run_replay_cli
+        run_replay_cli(sys.argv[2:])
     else:
-        asyncio.run(run_competition())
+        # python main.py --resume <session_id> continues a checkpointed game
+        resume_id = sys.argv[2] if len(sys.argv) > 2 and sys.argv[1] == "--resume" else None
+
+        async def run_headless():
+            if resume_id:
+                try:
+                    resumed = resume_session(resume_id)
+                except ValueError as e:
+                    sys.exit(str(e))
+                if resumed is None:
+                    sys.exit(f"No checkpoint for session {resume_id} in {checkpoint_dir or '(checkpoints disabled)'}")
+                session, checkpoint = resumed
+            else:
+                session, checkpoint = sessions.create(farms=parse_farms(os.getenv("FARMS", DEFAULT_FARMS))), None
+            async for state in run_competition(session, checkpoint):
+                print(json.dumps(state))
+        asyncio.run(run_headless())
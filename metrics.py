@@ -0,0 +1,162 @@
+import bisect
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# In-process metrics rendered in the Prometheus text format by /metrics, plus optional per-game
+# traces. Spans time each phase of a simulated day (prompt, limiter wait, model call, parse,
+# update_state, serialization, SSE write); the farm and day of the surrounding decision are
+# picked up from context variables so helpers deep in the call stack need no extra arguments.
+# The histogram is labelled by phase and farm; farm names come from requests, so only the first
+# MAX_FARM_LABELS get their own series and the rest share "other". Per-day timings are only in
+# the trace files, since a day label would add a series per day of every game.
+#
+# GAME_TRACE_DIR=traces writes one Chrome trace-event JSON per game (open in Perfetto or
+# chrome://tracing).
+
+TRACE_DIR = os.getenv("GAME_TRACE_DIR")
+
+# Prometheus defaults extended downwards: simulator phases take microseconds
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_FARM_LABELS = int(os.getenv("METRICS_MAX_FARM_LABELS", "16"))
+
+def format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{format_labels(self.labels, key)} {value}" for key, value in sorted(self.values.items())]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[tuple(str(labels[name]) for name in self.labels)] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (non-cumulative, last one is +Inf), sum]
+        self.values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        series = self.values.get(key)
+        if series is None:
+            series = self.values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+PHASE_SECONDS = registry.register(Histogram("farm_phase_seconds", "Time spent in each phase of a simulated day", ["phase", "farm"]))
+MAINTENANCE_FALLBACKS = registry.register(Counter("farm_maintenance_fallbacks_total", "Decisions that defaulted to 3 Maintenance", ["reason"]))
+FAILED_ACTIONS = registry.register(Counter("farm_failed_actions_total", "Actions the game rules rejected", ["action"]))
+DECISION_TIMEOUTS = registry.register(Counter("farm_decision_timeouts_total", "Decisions the fallback policy made after the deadline passed"))
+HEDGED_REQUESTS = registry.register(Counter("llm_hedged_requests_total", "Hedged model requests by which request answered first", ["winner"]))
+STREAMED_DECISIONS = registry.register(Counter("llm_streamed_decisions_total", "Streamed model answers by whether reading stopped at the decision line", ["outcome"]))
+LLM_IN_FLIGHT = registry.register(Gauge("llm_requests_in_flight", "Model calls currently running"))
+LLM_WAITING = registry.register(Gauge("llm_requests_waiting", "Model calls waiting for the limiter"))
+RUNNING_COMPETITIONS = registry.register(Gauge("competitions_running", "Competitions currently being played"))
+
+class Trace:
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.started = time.perf_counter()
+        self.events = []
+
+    def add(self, phase: str, start: float, duration: float, farm: Optional[str] = None, day: Optional[int] = None):
+        self.events.append({
+            "name": phase,
+            "ph": "X",
+            "ts": round((start - self.started) * 1e6),
+            "dur": round(duration * 1e6),
+            "pid": self.game_id,
+            "tid": farm or "game",
+            "args": {"day": day}
+        })
+
+    def dump(self, directory: str) -> str:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.game_id}.json")
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events}, f, separators=(",", ":"))
+        return path
+
+current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("current_trace", default=None)
+# {"farm": ..., "day": ...} for the decision being made in this task
+span_labels: contextvars.ContextVar[Dict] = contextvars.ContextVar("span_labels", default={})
+
+_farm_labels = set()
+
+def farm_label(farm: Optional[str]) -> str:
+    # Phases outside a farm's decision (serialization, checkpoints) are the game's, as in traces
+    if farm is None:
+        return "game"
+    if farm not in _farm_labels and len(_farm_labels) < MAX_FARM_LABELS:
+        _farm_labels.add(farm)
+    return farm if farm in _farm_labels else "other"
+
+def record(phase: str, start: float, duration: float):
+    PHASE_SECONDS.observe(duration, phase=phase, farm=farm_label(span_labels.get().get("farm")))
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(phase, start, duration, **span_labels.get())
+
+@contextmanager
+def span(phase: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, start, time.perf_counter() - start)
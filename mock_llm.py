@@ -0,0 +1,159 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import AsyncIterator, List, Optional
+
+# Local stand-in for the model provider. MockLLM produces "Final Decision" responses in the format
+# make_decision expects, after a configurable latency and with configurable error / malformed-output
+# rates. Responses can also be streamed word by word (token_delay per word), and a fraction of them
+# carry chatter after the decision like real models sometimes add. It can be used in-process
+# (LLM_BACKEND=mock) or served as an OpenAI-compatible /v1/chat/completions endpoint
+# (python mock_llm.py, then OPENAI_BASE_URL=http://localhost:8001/v1) so the full autogen path is
+# exercised without an API key.
+
+DECISIONS = [
+    "1 Plant Wheat",
+    "1 Plant Corn",
+    "1 Plant Tomato",
+    "2 Harvest",
+    "3 Maintenance",
+    "4 Sell Corn 1",
+    "5 Buy Corn 1",
+    "6 Sabotage"
+]
+
+TRAILER = "\n\nThis keeps enough energy for tomorrow and leaves some money free for trading on the order book."
+
+class MockLLMError(Exception):
+    pass
+
+def parse_latency(spec: str):
+    # "fixed:0.2", "uniform:0.1,0.5", "exp:0.3" (mean) or "lognormal:-1.5,0.5" (mu, sigma), in seconds
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+    if kind == "fixed":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1 / values[0]) if values[0] > 0 else 0.0
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+class MockLLM:
+    def __init__(self, latency: str = "fixed:0", error_rate: float = 0.0, malformed_rate: float = 0.0, seed: Optional[int] = None, token_delay: float = 0.0, trailer_rate: float = 0.0):
+        self.latency = latency
+        self._sample_latency = parse_latency(latency)
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.token_delay = token_delay  # seconds per generated word, on top of latency
+        self.trailer_rate = trailer_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+        self.tokens = 0  # words generated, including streamed words nobody read
+
+    def choose_decision(self, message: str) -> str:
+        # Prefer harvesting when the prompt reports harvestable crops, otherwise pick at random
+        if re.search(r"Harvestable crops: (?!None)", message) and self.rng.random() < 0.5:
+            return "2 Harvest"
+        return self.rng.choice(DECISIONS)
+
+    def render(self, decision: str) -> str:
+        if self.rng.random() < self.malformed_rate:
+            return "Step 1: The farm looks fine.\nI think planting is a good idea, maybe."
+        content = f"Step 1: Reviewed the farm state and order book.\nStep 2: Chose the action with the best expected value.\n\nFinal Decision:\n{decision}"
+        if self.rng.random() < self.trailer_rate:
+            content += TRAILER
+        return content
+
+    async def _start(self, message: str) -> List[str]:
+        # Latency until the first word, then the response split into words (leading whitespace kept)
+        self.calls += 1
+        await asyncio.sleep(self._sample_latency(self.rng))
+        if self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise MockLLMError("Injected mock LLM error")
+        return re.findall(r"\s*\S+", self.render(self.choose_decision(message)))
+
+    async def complete(self, message: str) -> str:
+        words = await self._start(message)
+        self.tokens += len(words)
+        if self.token_delay:
+            await asyncio.sleep(self.token_delay * len(words))
+        return "".join(words)
+
+    async def _emit(self, words: List[str]) -> AsyncIterator[str]:
+        for word in words:
+            if self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            self.tokens += 1
+            yield word
+
+    async def stream(self, message: str) -> AsyncIterator[str]:
+        async for word in self._emit(await self._start(message)):
+            yield word
+
+def create_mock_app(llm: MockLLM):
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    mock_app = FastAPI()
+
+    def stream_chunks(completion_id: str, model: str, words: AsyncIterator[str]):
+        async def events():
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': ''}, 'finish_reason': None}]})}\n\n"
+            async for word in words:
+                yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {'content': word}, 'finish_reason': None}]})}\n\n"
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+            yield "data: [DONE]\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @mock_app.post("/v1/chat/completions")
+    async def chat_completions(body: dict):
+        message = body["messages"][-1]["content"] if body.get("messages") else ""
+        if body.get("stream"):
+            # Latency and injected errors happen before the first chunk, so errors still get a status code
+            try:
+                words = await llm._start(message)
+            except MockLLMError as error:
+                return JSONResponse(content={"error": {"message": str(error), "type": "server_error"}}, status_code=500)
+            return stream_chunks(f"chatcmpl-{uuid.uuid4().hex}", body.get("model", "mock"), llm._emit(words))
+        try:
+            content = await llm.complete(message)
+        except MockLLMError as error:
+            return JSONResponse(content={"error": {"message": str(error), "type": "server_error"}}, status_code=500)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(message) // 4, "completion_tokens": len(content) // 4, "total_tokens": (len(message) + len(content)) // 4}
+        }
+
+    return mock_app
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible chat completions endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds per generated word")
+    parser.add_argument("--trailer-rate", type=float, default=0.0, help="Fraction of answers with text after the decision")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+    uvicorn.run(create_mock_app(MockLLM(args.latency, args.error_rate, args.malformed_rate, args.seed, args.token_delay, args.trailer_rate)), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import heapq
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+# Shared market for all farms in a game. Orders are indexed per crop type in price/time
+# priority heaps and expire through a per-owner heap keyed on expiration day. Heap entries
+# are invalidated lazily: a filled, expired or cancelled order is dropped from _orders and
+# skipped when it surfaces. Expired and cancelled orders may never surface in a price heap, so
+# each heap counts its stale entries and is rebuilt from the live orders once they outnumber
+# the live ones; a heap never holds more than twice its open orders.
+
+@dataclass(eq=False)
+class Order:
+    order_id: int
+    side: str  # "buy" or "sell"
+    crop_type: str
+    amount: int  # remaining, unfilled amount
+    price: float  # per unit
+    owner: object
+    day: int
+    expiration: int
+
+@dataclass(eq=False)
+class Fill:
+    buyer: object
+    seller: object
+    crop_type: str
+    amount: int
+    price: float  # per unit, the resting order's price
+    buy_order: Order
+    sell_order: Order
+
+class OrderBook:
+    def __init__(self):
+        self._next_id = 1
+        self._orders: Dict[int, Order] = {}
+        # crop_type -> heap of (-price, order_id) for bids and (price, order_id) for asks;
+        # order ids increase monotonically so they double as time priority
+        self._bids: Dict[str, List[Tuple[float, int]]] = {}
+        self._asks: Dict[str, List[Tuple[float, int]]] = {}
+        # (side, crop_type) -> entries in that price heap whose order is gone
+        self._stale: Dict[Tuple[str, str], int] = {}
+        # id(owner) -> heap of (expiration, order_id)
+        self._expiry: Dict[int, List[Tuple[int, int]]] = {}
+        self._by_owner: Dict[int, Dict[int, Order]] = {}
+        # Bumped on every change so per-side price levels are aggregated once per market state
+        self._version = 0
+        self._depth: Dict[str, Tuple[int, Counter]] = {}
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __getstate__(self):
+        # Only the open orders: the heaps are rebuilt from them, so a checkpoint holds no stale
+        # entries, and the per-owner indexes are keyed on id(owner), which changes when the owners
+        # are unpickled
+        return {"next_id": self._next_id, "version": self._version, "orders": list(self._orders.values())}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self._next_id = state["next_id"]
+        self._version = state["version"]
+        for order in state["orders"]:
+            self._orders[order.order_id] = order
+            self._by_owner.setdefault(id(order.owner), {})[order.order_id] = order
+            self._expiry.setdefault(id(order.owner), []).append((order.expiration, order.order_id))
+            if order.side == "buy":
+                self._bids.setdefault(order.crop_type, []).append((-order.price, order.order_id))
+            else:
+                self._asks.setdefault(order.crop_type, []).append((order.price, order.order_id))
+        for heap in (*self._expiry.values(), *self._bids.values(), *self._asks.values()):
+            heapq.heapify(heap)
+
+    def place(self, owner, side: str, crop_type: str, amount: int, price: float, day: int, expiration: int) -> Tuple[Order, List[Fill]]:
+        order = Order(self._next_id, side, crop_type, amount, price, owner, day, expiration)
+        self._next_id += 1
+        self._version += 1
+        fills = self._match(order)
+        if order.amount > 0:
+            self._orders[order.order_id] = order
+            self._by_owner.setdefault(id(owner), {})[order.order_id] = order
+            if side == "buy":
+                heapq.heappush(self._bids.setdefault(crop_type, []), (-price, order.order_id))
+            else:
+                heapq.heappush(self._asks.setdefault(crop_type, []), (price, order.order_id))
+            heapq.heappush(self._expiry.setdefault(id(owner), []), (expiration, order.order_id))
+        return order, fills
+
+    def _match(self, order: Order) -> List[Fill]:
+        book = self._asks if order.side == "buy" else self._bids
+        resting_side = "sell" if order.side == "buy" else "buy"
+        heap = book.get(order.crop_type)
+        fills = []
+        own_orders = []  # the owner's resting orders, set aside so a farm never trades with itself
+        while heap and order.amount > 0:
+            key, resting_id = heap[0]
+            resting = self._orders.get(resting_id)
+            if resting is None:
+                heapq.heappop(heap)
+                self._stale[(resting_side, order.crop_type)] -= 1
+                continue
+            crosses = order.price >= resting.price if order.side == "buy" else order.price <= resting.price
+            if not crosses:
+                break
+            if resting.owner is order.owner:
+                own_orders.append(heapq.heappop(heap))
+                continue
+
+            amount = min(order.amount, resting.amount)
+            order.amount -= amount
+            resting.amount -= amount
+            buy_order, sell_order = (order, resting) if order.side == "buy" else (resting, order)
+            fills.append(Fill(buy_order.owner, sell_order.owner, order.crop_type, amount, resting.price, buy_order, sell_order))
+            if resting.amount == 0:
+                heapq.heappop(heap)
+                self._remove(resting, in_heap=False)
+
+        for entry in own_orders:
+            heapq.heappush(heap, entry)
+        return fills
+
+    def _remove(self, order: Order, in_heap: bool = True):
+        self._version += 1
+        del self._orders[order.order_id]
+        del self._by_owner[id(order.owner)][order.order_id]
+        if in_heap:
+            self._mark_stale(order.side, order.crop_type)
+
+    def _mark_stale(self, side: str, crop_type: str, count: int = 1):
+        key = (side, crop_type)
+        stale = self._stale.get(key, 0) + count
+        heap = (self._bids if side == "buy" else self._asks)[crop_type]
+        if 2 * stale > len(heap):
+            self._rebuild(side, crop_type)
+        else:
+            self._stale[key] = stale
+
+    def _rebuild(self, side: str, crop_type: str):
+        # The heap of one side and crop type, from its open orders only
+        book = self._bids if side == "buy" else self._asks
+        sign = -1 if side == "buy" else 1
+        heap = [(sign * order.price, order.order_id) for order in self._orders.values() if order.side == side and order.crop_type == crop_type]
+        heapq.heapify(heap)
+        book[crop_type] = heap
+        self._stale[(side, crop_type)] = 0
+
+    def expire(self, owner, day: int) -> List[Order]:
+        heap = self._expiry.get(id(owner))
+        expired = []
+        while heap and heap[0][0] <= day:
+            _, order_id = heapq.heappop(heap)
+            order = self._orders.get(order_id)
+            if order is not None:
+                self._remove(order)
+                expired.append(order)
+        return expired
+
+    def cancel_all(self, owner) -> List[Order]:
+        cancelled = list(self._by_owner.pop(id(owner), {}).values())
+        self._version += 1
+        for order in cancelled:
+            del self._orders[order.order_id]
+        # Counted per heap first, so a rebuild midway cannot count an order it already left out
+        for (side, crop_type), count in Counter((order.side, order.crop_type) for order in cancelled).items():
+            self._mark_stale(side, crop_type, count)
+        self._expiry.pop(id(owner), None)
+        return cancelled
+
+    def depth(self, side: str, exclude_owner=None) -> Counter:
+        # Open amount per (crop_type, price) level. The totals are shared by every farm reading the
+        # same market state; excluding an owner only subtracts that owner's own orders.
+        version, levels = self._depth.get(side, (None, None))
+        if version != self._version:
+            levels = Counter()
+            for order in self._orders.values():
+                if order.side == side:
+                    levels[(order.crop_type, order.price)] += order.amount
+            self._depth[side] = (self._version, levels)
+        if exclude_owner is None:
+            return levels
+        own = Counter()
+        for order in self._by_owner.get(id(exclude_owner), {}).values():
+            if order.side == side:
+                own[(order.crop_type, order.price)] += order.amount
+        return levels - own if own else levels
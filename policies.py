@@ -0,0 +1,81 @@
+import random
+from abc import ABC, abstractmethod
+from typing import Optional
+from constants import GAME_RULES
+
+# Decisions a baseline policy may emit, in the same format make_decision returns
+PLANT_DECISIONS = [f"1 Plant {crop_type}" for crop_type in GAME_RULES["crops"]]
+PLANT_DECISION = dict(zip(GAME_RULES["crops"], PLANT_DECISIONS))
+TRADE_DECISIONS = [f"{number} {action} {crop_type} {amount}" for number, action in (("4", "Sell"), ("5", "Buy")) for crop_type in GAME_RULES["crops"] for amount in (1, 2, 3)]
+BASELINE_DECISIONS = PLANT_DECISIONS + ["2 Harvest", "3 Maintenance", "6 Sabotage"] + TRADE_DECISIONS
+
+class Policy(ABC):
+    name = "policy"
+
+    @abstractmethod
+    async def decide(self, state, market, days_left: int) -> str:
+        ...
+
+class RandomPolicy(Policy):
+    name = "random"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    async def decide(self, state, market, days_left: int) -> str:
+        return self.rng.choice(BASELINE_DECISIONS)
+
+def scripted_decision(state, days_left: int) -> str:
+    # Greedy baseline: harvest whenever possible, otherwise plant the most profitable
+    # crop that can still mature before the game ends, otherwise maintain.
+    rules = state.rules
+    harvestable = state.crops.ready_count(state.day) > 0
+    if harvestable and state.energy >= rules.energy_cost["harvest"]:
+        return "2 Harvest"
+
+    if state.energy >= rules.energy_cost["plant"]:
+        for _, crop_type in rules.plants_by_profit:
+            crop = rules.crops[crop_type]
+            if crop.growth_time < days_left and crop.cost <= state.money:
+                return PLANT_DECISION[crop_type]
+
+    return "3 Maintenance"
+
+class ScriptedPolicy(Policy):
+    name = "scripted"
+
+    def __init__(self, seed: Optional[int] = None):
+        pass
+
+    async def decide(self, state, market, days_left: int) -> str:
+        return scripted_decision(state, days_left)
+
+class LLMPolicy(Policy):
+    name = "llm"
+
+    def __init__(self, assistant, cache=None):
+        self.assistant = assistant
+        self.cache = cache
+
+    async def decide(self, state, market, days_left: int) -> str:
+        from main import make_decision
+        return await make_decision(self.assistant, state, market, days_left, self.cache)
+
+def make_policy(spec: str, seed: Optional[int] = None, cache: Optional[str] = None, rollout_workers: Optional[int] = None) -> Policy:
+    # spec is "random", "scripted", "rollout[:<budget ms>]" or "llm:<model>"; kept as a string so it
+    # can be sent to worker processes. Policies made inside a worker process pass rollout_workers=0,
+    # so rollouts run in that worker instead of a pool of its own.
+    kind, _, model = spec.partition(":")
+    if kind == "random":
+        return RandomPolicy(seed)
+    if kind == "scripted":
+        return ScriptedPolicy(seed)
+    if kind == "rollout":
+        from rollout import ROLLOUT_WORKERS, RolloutPolicy
+        return RolloutPolicy(seed, budget=float(model) / 1000 if model else None, workers=ROLLOUT_WORKERS if rollout_workers is None else rollout_workers)
+    if kind == "llm":
+        from main import create_assistant, model_config
+        from decision_cache import get_cache
+        model = model or "gpt-4o-mini"
+        return LLMPolicy(create_assistant(f"FarmerNPC_{model}", [model_config(model)]), get_cache(cache))
+    raise ValueError(f"Unknown policy spec: {spec}")
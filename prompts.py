@@ -0,0 +1,191 @@
+import json
+import logging
+import math
+import os
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Deque, List, Sequence, Tuple
+from constants import GAME_RULES, TRADING_RULES, SABOTAGE_RULES
+
+# Prompt construction for make_decision. Everything that never changes during a game (rules and
+# answer format) lives in SYSTEM_PREFIX, which becomes the assistant's system message so providers
+# can cache it as a prompt prefix. The per-turn message only carries the farm state, with crops
+# aggregated by (type, days until ready) so its size does not grow with the number of crops.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "300"))
+
+def compact_json(value) -> str:
+    return json.dumps(value, separators=(",", ":"), sort_keys=True)
+
+INSTRUCTIONS = """Instructions:
+1. Analyze the current situation based on the farm state, order book, and game rules.
+2. Consider the best course of action, thinking through your decision step by step.
+3. After your analysis, you MUST conclude with EXACTLY ONE of the following decisions:
+
+   1 Plant Wheat
+   1 Plant Corn
+   1 Plant Tomato
+   2 Harvest
+   3 Maintenance
+   5 Buy [crop_type] [amount]
+   6 Sabotage
+
+Your response MUST strictly adhere to this format:
+```
+[Your step-by-step analysis here]
+
+Final Decision:
+[ONLY ONE of the exact options listed above]
+```
+
+Critically important rules:
+- Your response MUST end with "Final Decision:" followed by ONLY ONE of the exact options listed above.
+- Do not include any other text, numbers, or explanations after the Final Decision line.
+- The final decision must be word-for-word one of the options provided, including the number.
+- Ensure there is an empty line before "Final Decision:".
+- Do not use any punctuation or additional formatting in the Final Decision line.
+- Only choose "2 Harvest" if there are harvestable crops available.
+- Choose "3 Maintenance" if you want to wait or perform maintenance (it serves as both).
+- For selling, specify the crop type and amount (e.g., "4 Sell Wheat 2"). Only harvestable crops can be sold.
+- For buying, specify the crop type and amount (e.g., "5 Buy Corn 3"). Crops can be bought only if there is sufficient money.
+- Attempting to violate these rules will result in a failed action and a penalty.
+- Sabotage is a risky action that can potentially damage the other farm's crops.
+
+Example of correct final parts of your response:
+
+Example 1:
+Step 5: Based on the analysis, planting Tomato seems to be the most profitable choice.
+
+Final Decision:
+1 Plant Tomato
+
+Example 2:
+Step 5: Selling some excess Wheat could be beneficial.
+
+Final Decision:
+4 Sell Wheat 2
+
+Example 3:
+Step 5: Buying some Corn might diversify our crop portfolio.
+
+Final Decision:
+5 Buy Corn 3
+
+Example 4:
+Step 5: Attempting sabotage might give us an edge, but it's risky.
+
+Final Decision:
+6 Sabotage
+
+Failure to follow this format exactly will result in a default "Maintenance" action being taken.
+"""
+
+SYSTEM_PREFIX = f"""You are an experienced farmer NPC in a farming simulation game.
+Make optimal choices based on the provided game rules and remaining time.
+Each turn you receive the current farm state and order book; crops are listed as count x type (days until ready).
+
+Game Rules: {compact_json(GAME_RULES)}
+Trading Rules: {compact_json(TRADING_RULES)}
+Sabotage Rules: {compact_json(SABOTAGE_RULES)}
+
+{INSTRUCTIONS}"""
+
+TURN_SUFFIX = "Follow the instructions and response format from the system message, ending with the Final Decision line."
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text and JSON; good enough for budgeting
+    return math.ceil(len(text) / 4)
+
+@dataclass
+class PromptStats:
+    day: int
+    chars: int
+    tokens: int
+    detail: int  # 0 is the most detailed rendering, higher levels are more compact
+    over_budget: bool
+
+def crop_groups(state) -> Counter:
+    groups = Counter()
+    for (crop_type, ready_day, _), count in state.crops.buckets.items():
+        groups[(crop_type, max(0, ready_day - state.day))] += count
+    return groups
+
+def format_crops(groups: Counter, detail: int) -> str:
+    if not groups:
+        return "None"
+    if detail == 0:
+        return ", ".join(f"{count}x {crop_type} ({f'ready in {days} days' if days else 'ready'})" for (crop_type, days), count in sorted(groups.items()))
+    # Compact: per type, ready now vs still growing
+    ready, growing = Counter(), Counter()
+    for (crop_type, days), count in groups.items():
+        (growing if days else ready)[crop_type] += count
+    return ", ".join(f"{crop_type} {ready[crop_type]} ready/{growing[crop_type]} growing" for crop_type in sorted(set(ready) | set(growing)))
+
+def format_orders(levels: Counter, detail: int) -> str:
+    # levels maps (crop_type, price) to the open amount, as returned by OrderBook.depth
+    if not levels:
+        return "None"
+    if detail < 2:
+        return ", ".join(f"{crop_type}: {amount} @ {price:.2f}" for (crop_type, price), amount in sorted(levels.items()))
+    totals = Counter()
+    for (crop_type, _), amount in levels.items():
+        totals[crop_type] += amount
+    return ", ".join(f"{crop_type}: {amount}" for crop_type, amount in sorted(totals.items()))
+
+class PromptBuilder:
+    def __init__(self, token_budget: int = DEFAULT_TOKEN_BUDGET, history: int = 1000):
+        self.token_budget = token_budget
+        self.history: Deque[PromptStats] = deque(maxlen=history)
+
+    def render(self, state, market, days_left: int, detail: int, groups: Counter, rivals: Sequence[str] = ()) -> str:
+        harvestable = Counter()
+        for (crop_type, days), count in groups.items():
+            if days == 0:
+                harvestable[crop_type] += count
+        harvested = ", ".join(f"{count}x {crop_type}" for crop_type, count in sorted(state.harvested_crops.items()) if count) or "None"
+        # With more than one rival, sabotage has to name its target
+        targets = f"\n- Sabotage targets (answer 6 Sabotage <farm>): {', '.join(rivals)}" if len(rivals) > 1 else ""
+        return f"""Current farm state on day {state.day}:
+- Money: {state.money}
+- Energy: {state.energy}
+- Crops: {format_crops(groups, detail)}
+- Harvestable crops: {", ".join(f"{count}x {crop_type}" for crop_type, count in sorted(harvestable.items())) or "None"}
+- Harvested crops: {harvested}
+- Days left in the game: {days_left}{targets}
+
+Order Book:
+Buy Offers: {format_orders(market.depth("buy", exclude_owner=state), detail)}
+Sell Offers: {format_orders(market.depth("sell", exclude_owner=state), detail)}
+
+{TURN_SUFFIX}"""
+
+    def build(self, state, market, days_left: int, rivals: Sequence[str] = ()) -> Tuple[str, PromptStats]:
+        # Use the most detailed rendering that fits the token budget
+        groups = crop_groups(state)
+        for detail in range(3):
+            message = self.render(state, market, days_left, detail, groups, rivals)
+            tokens = estimate_tokens(message)
+            if tokens <= self.token_budget:
+                break
+
+        stats = PromptStats(state.day, len(message), tokens, detail, tokens > self.token_budget)
+        self.history.append(stats)
+        logger.info("Prompt for day %d: %d chars, ~%d tokens (detail %d%s)", stats.day, stats.chars, stats.tokens, stats.detail, ", over budget" if stats.over_budget else "")
+        return message, stats
+
+    def summary(self) -> dict:
+        if not self.history:
+            return {"turns": 0}
+        tokens: List[int] = [stats.tokens for stats in self.history]
+        return {
+            "turns": len(tokens),
+            "mean_tokens": sum(tokens) / len(tokens),
+            "max_tokens": max(tokens),
+            "over_budget": sum(1 for stats in self.history if stats.over_budget),
+            "token_budget": self.token_budget,
+            "system_prefix_tokens": estimate_tokens(SYSTEM_PREFIX)
+        }
+
+prompt_builder = PromptBuilder()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List
+from engine import GameState, update_state, clear_order_book
+from action_log import ActionLogBuffer
+from order_book import OrderBook
+
+# Every game is recorded as its RNG seed plus the decisions each farm made per day, in the order
+# update_state applied them. Replaying re-runs update_state from that log with a fresh
+# random.Random(seed) and no model calls, so a game can be reproduced bit-for-bit or re-scored
+# under changed rules at CPU speed.
+
+RECORD_VERSION = 1
+DEFAULT_RECORDINGS_PATH = os.getenv("GAME_RECORDINGS_PATH", "recordings/games.jsonl")
+
+def make_record(game_id: str, seed: int, farms: List[str], days: List[List[str]], final_money: Dict[str, float]) -> Dict:
+    return {
+        "version": RECORD_VERSION,
+        "game_id": game_id,
+        "seed": seed,
+        "farms": farms,  # update order within a day
+        "days": days,  # days[i][j] is the decision of farms[j] on day i + 1
+        "final_money": final_money
+    }
+
+def append_records(path: str, records: Iterable[Dict]):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a") as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+def load_records(path: str) -> Iterator[Dict]:
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def replay_game(record: Dict):
+    if record["version"] != RECORD_VERSION:
+        raise ValueError(f"Unsupported record version: {record['version']}")
+
+    farms = record["farms"]
+    states = {farm: GameState() for farm in farms}
+    logs = {farm: ActionLogBuffer() for farm in farms}
+    market = OrderBook()
+    rng = random.Random(record["seed"])
+
+    for decisions in record["days"]:
+        for farm, decision in zip(farms, decisions):
+            update_state(states[farm], states, decision, logs[farm], market, rng)
+
+    for farm in farms:
+        clear_order_book(states[farm], market)
+    return states, logs
+
+def rescore_record(record: Dict) -> Dict:
+    states, _ = replay_game(record)
+    return {
+        "game_id": record["game_id"],
+        "recorded": record.get("final_money"),
+        "replayed": {farm: state.money for farm, state in states.items()}
+    }
+
+def rescore(path: str, workers: int = None) -> List[Dict]:
+    # A stopped game that was resumed is recorded again when it ends; its last record is complete
+    records = list({record["game_id"]: record for record in load_records(path)}.values())
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        return list(pool.map(rescore_record, records, chunksize=max(1, len(records) // (4 * (workers or os.cpu_count())))))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded games without calling any model")
+    parser.add_argument("path", nargs="?", default=DEFAULT_RECORDINGS_PATH)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true", help="Print every game")
+    args = parser.parse_args(argv)
+
+    results = rescore(args.path, args.workers)
+    changed = [result for result in results if result["recorded"] is not None and result["recorded"] != result["replayed"]]
+    for result in (results if args.verbose else changed):
+        print(f"{result['game_id']}: recorded {result['recorded']} replayed {result['replayed']}")
+    print(f"Replayed {len(results)} games, {len(changed)} with a different outcome than recorded")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from engine import GameState, update_state, clear_order_book
+from action_log import ActionLogBuffer
+from order_book import OrderBook
+from policies import PLANT_DECISIONS, Policy, scripted_decision
+
+# Monte Carlo rollout policy: every candidate action is applied to a copy of the farm and played
+# out to the last day through update_state with a noisy scripted policy; the action with the best
+# mean final money wins. Rollouts are farmed out to a shared process pool in chunks and every
+# chunk stops at the decision's deadline, so a decision takes about ROLLOUT_BUDGET_MS.
+#
+# Rollouts simulate the farm on its own with an empty market: the opponent's state is not visible
+# to a policy, so trades and sabotage are not candidates.
+
+ROLLOUT_DECISIONS = PLANT_DECISIONS + ["2 Harvest", "3 Maintenance"]
+ROLLOUT_BUDGET = float(os.getenv("ROLLOUT_BUDGET_MS", "200")) / 1000
+ROLLOUT_COUNT = int(os.getenv("ROLLOUT_COUNT", "64"))  # per candidate, if the budget allows
+ROLLOUT_CHUNK = 8
+# 0 runs rollouts in the calling process; tournament and sweep workers always do (see make_policy)
+ROLLOUT_WORKERS = int(os.getenv("ROLLOUT_WORKERS", str(os.cpu_count())))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers)
+    return _pool
+
+def rollout_decision(state, days_left: int, rng: random.Random, epsilon: float) -> str:
+    if rng.random() < epsilon:
+        return rng.choice(ROLLOUT_DECISIONS)
+    return scripted_decision(state, days_left)
+
+def run_rollouts(start_state: GameState, decision: str, seeds: List[int], deadline: float, epsilon: float) -> Tuple[float, int]:
+    # Sum of final money over the rollouts that fit before the deadline (always at least one)
+    total_days = start_state.rules.total_days
+    total = 0.0
+    count = 0
+    for seed in seeds:
+        if count and time.time() > deadline:
+            break
+        rng = random.Random(seed)
+        state = start_state.copy()
+        farms = {"self": state}
+        market = OrderBook()
+        log = ActionLogBuffer(capacity=0)
+        update_state(state, farms, decision, log, market, rng)
+        while state.day <= total_days:
+            update_state(state, farms, rollout_decision(state, total_days - state.day + 1, rng, epsilon), log, market, rng)
+        clear_order_book(state, market)
+        total += state.money
+        count += 1
+    return total, count
+
+class RolloutPolicy(Policy):
+    name = "rollout"
+
+    def __init__(self, seed: Optional[int] = None, budget: Optional[float] = None, rollouts: int = ROLLOUT_COUNT, workers: int = ROLLOUT_WORKERS, epsilon: float = 0.2):
+        self.rng = random.Random(seed)
+        self.budget = budget if budget is not None else ROLLOUT_BUDGET
+        self.rollouts = rollouts
+        self.workers = workers
+        self.epsilon = epsilon
+
+    async def decide(self, state, market, days_left: int) -> str:
+        deadline = time.time() + self.budget
+        # The same seeds for every candidate, so they are compared on the same random futures
+        seeds = [self.rng.randrange(2**31) for _ in range(self.rollouts)]
+        chunks = [seeds[i:i + ROLLOUT_CHUNK] for i in range(0, len(seeds), ROLLOUT_CHUNK)]
+
+        # Chunk by chunk across candidates, so a tight budget still samples every candidate
+        work = [(decision, chunk) for chunk in chunks for decision in ROLLOUT_DECISIONS]
+        if self.workers:
+            loop = asyncio.get_running_loop()
+            pool = get_pool(self.workers)
+            sums = await asyncio.gather(*(loop.run_in_executor(pool, run_rollouts, state, decision, chunk, deadline, self.epsilon) for decision, chunk in work))
+        else:
+            sums = [run_rollouts(state, decision, chunk, deadline, self.epsilon) for decision, chunk in work]
+        results = {decision: [] for decision in ROLLOUT_DECISIONS}
+        for (decision, _), chunk_sum in zip(work, sums):
+            results[decision].append(chunk_sum)
+
+        means = {}
+        for decision, sums in results.items():
+            total = sum(chunk_total for chunk_total, _ in sums)
+            count = sum(chunk_count for _, chunk_count in sums)
+            means[decision] = total / count
+        return max(ROLLOUT_DECISIONS, key=lambda decision: means[decision])
@@ -0,0 +1,98 @@
+import copy
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Mapping, Tuple
+from constants import GAME_RULES, ACTION_PENALTIES, TRADING_RULES, SABOTAGE_RULES
+
+# The balance knobs of constants.py compiled into one immutable table per game. The engine reads
+# every rule through a farm's state.rules instead of the module-level dicts, so games under
+# different rule variants can run side by side, e.g. in sweep.py. Values derived from several
+# knobs (harvest prices, plant choices by profit) are computed once per table, not per action.
+#
+# Variants are described by overrides of dotted paths into the four rule dicts:
+#   {"game.crops.Corn.cost": 12, "trading.trade_fee_percentage": 0.2, "penalties.plant": 10}
+
+RULE_SECTIONS = {"game": GAME_RULES, "penalties": ACTION_PENALTIES, "trading": TRADING_RULES, "sabotage": SABOTAGE_RULES}
+
+@dataclass(frozen=True, eq=False)
+class CropRules:
+    cost: int
+    growth_time: int
+    sell_price: float
+    harvest_price: float  # what harvesting one crop earns
+
+@dataclass(frozen=True, eq=False)
+class RuleTable:
+    config: Mapping  # the rule dicts this table was compiled from, by section
+    total_days: int
+    starting_money: float
+    max_energy: int
+    energy_regen_per_day: int
+    energy_cost: Mapping[str, int]  # plant, harvest, maintenance
+    penalties: Mapping[str, int]  # energy lost by a failed plant, harvest or maintenance
+    crops: Mapping[str, CropRules]
+    # (profit of harvesting, crop_type) from the most to the least profitable crop
+    plants_by_profit: Tuple[Tuple[float, str], ...]
+    trade_energy_cost: int
+    max_trade_amount: int
+    trade_fee_percentage: float
+    trade_penalty: int
+    order_expiration_days: int
+    sabotage_energy_cost: int
+    sabotage_money_cost: float
+    sabotage_success_rate: float
+    max_crops_damaged: int
+    damaged_crop_yield_factor: float
+
+    def __deepcopy__(self, memo):
+        # Immutable, so copies of a game state share their table
+        return self
+
+    def __reduce__(self):
+        # Mapping proxies do not pickle; tables are rebuilt from their config instead
+        return compile_rules, (copy.deepcopy(dict(self.config)),)
+
+    def with_overrides(self, overrides: Dict[str, float]) -> "RuleTable":
+        config = copy.deepcopy({section: dict(rules) for section, rules in self.config.items()})
+        for path, value in overrides.items():
+            *parents, key = path.split(".")
+            node = config
+            for part in parents:
+                if not isinstance(node, dict) or part not in node:
+                    raise ValueError(f"Unknown rule: {path}")
+                node = node[part]
+            if not isinstance(node, dict) or key not in node or isinstance(node[key], dict):
+                raise ValueError(f"Unknown rule: {path}")
+            node[key] = value
+        return compile_rules(config)
+
+def compile_rules(config: Dict[str, Dict]) -> RuleTable:
+    game, penalties, trading, sabotage = (config[section] for section in RULE_SECTIONS)
+    crops = {
+        crop_type: CropRules(rules["cost"], rules["growth_time"], rules["sell_price"], rules["sell_price"] * game["harvest_sell_discount"])
+        for crop_type, rules in game["crops"].items()
+    }
+    return RuleTable(
+        config=MappingProxyType(copy.deepcopy(config)),
+        total_days=game["total_days"],
+        starting_money=game["starting_money"],
+        max_energy=game["max_energy"],
+        energy_regen_per_day=game["energy_regen_per_day"],
+        energy_cost=MappingProxyType(dict(game["energy_cost"])),
+        penalties=MappingProxyType(dict(penalties)),
+        crops=MappingProxyType(crops),
+        plants_by_profit=tuple(sorted(((crop.harvest_price - crop.cost, crop_type) for crop_type, crop in crops.items()), reverse=True)),
+        trade_energy_cost=trading["trade_energy_cost"],
+        max_trade_amount=trading["max_trade_amount"],
+        trade_fee_percentage=trading["trade_fee_percentage"],
+        trade_penalty=trading["trade_penalty"],
+        order_expiration_days=trading["order_expiration_days"],
+        sabotage_energy_cost=sabotage["sabotage_energy_cost"],
+        sabotage_money_cost=sabotage["sabotage_money_cost"],
+        sabotage_success_rate=sabotage["sabotage_success_rate"],
+        max_crops_damaged=sabotage["max_crops_damaged"],
+        damaged_crop_yield_factor=sabotage["damaged_crop_yield_factor"]
+    )
+
+# The rules in constants.py, used by every game that is not given a variant
+DEFAULT_RULES = compile_rules(RULE_SECTIONS)
@@ -0,0 +1,212 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, JSONResponse, HTMLResponse, PlainTextResponse, Response
+from fastapi.staticfiles import StaticFiles
+import uvicorn
+import os
+from main import DEFAULT_FARMS, FARM_ASSISTANTS, checkpoint_dir, decision_cache, get_assistant, parse_farms, resume_session, results_store, run_competition
+from checkpoints import checkpoint_path, list_checkpoints
+from llm_limiter import llm_limiter
+from sessions import CompetitionSession, check_session_id, sessions
+from prompts import prompt_builder
+from frames import format_event
+from metrics import LLM_IN_FLIGHT, LLM_WAITING, RUNNING_COMPETITIONS, record, registry, span
+
+# The web UI and competition streams. Run with python server.py (or python main.py ui).
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Model-played farms are the default here, so their agents are built when the server starts
+    # rather than on the first game's first day; importing this module builds nothing
+    for model in FARM_ASSISTANTS:
+        await asyncio.to_thread(get_assistant, model)
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+app.mount("/static", StaticFiles(directory="static"), name="static")
+
+@app.get("/", response_class=HTMLResponse)
+async def read_root():
+    with open("static/index.html", "r") as f:
+        return f.read()
+
+# How long a finished or abandoned competition stays around for clients to resume
+RESUME_GRACE_SECONDS = float(os.getenv("RESUME_GRACE_SECONDS", "30"))
+
+async def run_session(session: CompetitionSession, checkpoint: Optional[Dict] = None):
+    # The game runs independently of any one connection and publishes frames to the session log.
+    # session.task is done once the game has written its last checkpoint, recording and results
+    try:
+        async for payload in run_competition(session, checkpoint):
+            with span("serialize"):
+                session.frames.publish(payload)
+    finally:
+        session.stop()
+        session.frames.close()
+        asyncio.create_task(forget_session(session))
+
+async def forget_session(session: CompetitionSession):
+    await asyncio.sleep(RESUME_GRACE_SECONDS)
+    if sessions.get(session.session_id) is session:
+        sessions.remove(session.session_id)
+
+def busy_session(session_id: str) -> Optional[JSONResponse]:
+    # A stopped game still finishes the day it is playing; until then it owns its checkpoint and files
+    session = sessions.get(session_id)
+    if session is None or session.task is None or session.task.done():
+        return None
+    error = "Competition is still running" if session.running else "Competition is still stopping"
+    return JSONResponse(content={"error": error, "session_id": session_id}, status_code=409)
+
+def invalid_session_id(session_id: str) -> Optional[JSONResponse]:
+    # Ids name files on disk, so anything but a plain file name is refused before it is used
+    try:
+        check_session_id(session_id)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    return None
+
+async def stop_if_idle(session: CompetitionSession):
+    await asyncio.sleep(RESUME_GRACE_SECONDS)
+    if not session.frames.subscribers:
+        session.stop()
+
+@app.get("/stream-competition")
+async def stream_competition(request: Request, session_id: str = "default", seed: Optional[int] = None, farms: str = DEFAULT_FARMS):
+    invalid = invalid_session_id(session_id)
+    if invalid is not None:
+        return invalid
+    last_event_id = request.headers.get("last-event-id")
+    session = sessions.get(session_id)
+    if last_event_id is not None:
+        if session is None:
+            # Nothing left to resume; 204 tells EventSource to stop reconnecting
+            return Response(status_code=204)
+        try:
+            last_seq = int(last_event_id)
+        except ValueError:
+            last_seq = None
+    elif session and session.running:
+        # Spectators join the running game: a snapshot of the current state, then live deltas
+        last_seq = None
+    else:
+        try:
+            roster = parse_farms(farms)
+        except ValueError as e:
+            return JSONResponse(content={"error": str(e)}, status_code=400)
+        busy = busy_session(session_id)
+        if busy is not None:
+            return busy
+        if checkpoint_dir and os.path.exists(checkpoint_path(checkpoint_dir, session_id)):
+            # A new game would truncate the stopped game's days and overwrite its checkpoint
+            return JSONResponse(content={"error": "Competition has a checkpoint; resume it or use another session id", "session_id": session_id}, status_code=409)
+        sessions.remove(session_id)
+        session = sessions.create(session_id, seed, roster)
+        session.task = asyncio.create_task(run_session(session))
+        last_seq = 0
+
+    async def event_generator():
+        # Frames are encoded once per game and queued per client; a client that falls a full
+        # queue behind is caught up with a snapshot instead of buffering every delta
+        frames = session.frames.follow(last_seq)
+        try:
+            if last_event_id is None:
+                yield format_event({"session_id": session.session_id, "seed": session.seed, "farms": [name for name, _ in session.farms]}, event="session")
+            async for frame in frames:
+                # Time until the client is ready for the next frame, i.e. the write to the socket
+                write_started = time.perf_counter()
+                yield frame
+                record("sse_write", write_started, time.perf_counter() - write_started)
+        finally:
+            # Closed first, so this client is no longer among the subscribers counted below
+            await frames.aclose()
+            if not session.frames.subscribers and session.running:
+                asyncio.create_task(stop_if_idle(session))
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+@app.post("/stop-competition")
+async def stop_competition(session_id: str = "default"):
+    invalid = invalid_session_id(session_id)
+    if invalid is not None:
+        return invalid
+    session = sessions.get(session_id)
+    if session is None:
+        return JSONResponse(content={"error": "No such competition", "session_id": session_id}, status_code=404)
+    session.stop()
+    return JSONResponse(content={"message": "Competition stopped", "session_id": session_id})
+
+@app.post("/resume-competition")
+async def resume_competition(session_id: str = "default"):
+    # Continues a stopped or interrupted game from its last checkpoint; watch it on /stream-competition
+    invalid = invalid_session_id(session_id)
+    if invalid is not None:
+        return invalid
+    busy = busy_session(session_id)
+    if busy is not None:
+        return busy
+    resumed = await asyncio.to_thread(resume_session, session_id)
+    if resumed is None:
+        return JSONResponse(content={"error": "No checkpoint for this competition", "session_id": session_id}, status_code=404)
+    session, checkpoint = resumed
+    session.task = asyncio.create_task(run_session(session, checkpoint))
+    return JSONResponse(content={"message": "Competition resumed", "session_id": session_id, "day": checkpoint["day"]})
+
+@app.get("/checkpoints")
+async def checkpoints():
+    return JSONResponse(content={"checkpoints": list_checkpoints(checkpoint_dir)})
+
+@app.get("/competitions")
+async def list_competitions():
+    return JSONResponse(content={"competitions": sessions.list(), "llm_limiter": llm_limiter.stats()})
+
+@app.get("/metrics")
+async def metrics():
+    LLM_IN_FLIGHT.set(llm_limiter.in_flight)
+    LLM_WAITING.set(llm_limiter.waiting)
+    RUNNING_COMPETITIONS.set(sum(1 for session in sessions.list() if session["running"]))
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/prompt-stats")
+async def prompt_stats():
+    return JSONResponse(content=prompt_builder.summary())
+
+@app.get("/decision-cache/stats")
+async def decision_cache_stats():
+    if decision_cache is None:
+        return JSONResponse(content={"enabled": False})
+    return JSONResponse(content={"enabled": True, **decision_cache.stats()})
+
+async def results_query(query: str, *args) -> JSONResponse:
+    # Aggregates scan the whole store, so they run off the event loop
+    if results_store is None:
+        return JSONResponse(content={"enabled": False, "error": "Set GAME_RESULTS_DB to keep game results"}, status_code=404)
+    return JSONResponse(content={"rows": await asyncio.to_thread(getattr(results_store, query), *args)})
+
+@app.get("/results/leaderboard")
+async def results_leaderboard():
+    return await results_query("leaderboard")
+
+@app.get("/results/money-by-day")
+async def results_money_by_day(model: Optional[str] = None):
+    return await results_query("money_by_day", model)
+
+@app.get("/results/action-mix")
+async def results_action_mix(model: Optional[str] = None):
+    return await results_query("action_mix", model)
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,63 @@
+import os
+import random
+import re
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from frames import FrameLog
+
+# Each competition runs in its own session with its own state, stream and stop flag, so one
+# server process can host many games at once.
+
+# Session ids name checkpoint, recording and log files, so they are limited to a safe file name
+SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+def check_session_id(session_id: str) -> str:
+    if not SESSION_ID_PATTERN.fullmatch(session_id):
+        raise ValueError("A session id is 1 to 64 letters, digits, '_' or '-'")
+    return session_id
+
+class CompetitionSession:
+    def __init__(self, session_id: str, seed: Optional[int] = None, farms: Optional[List[Tuple[str, str]]] = None):
+        self.session_id = session_id
+        # (farm name, model) in the order moves are applied each day
+        self.farms = farms or [("gpt35", "gpt35"), ("gpt4", "gpt4")]
+        # Seeds the game's random.Random; recorded with the decisions so the game can be replayed
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2**31)
+        self.running = True
+        self.started_at = time.time()
+        self.day = 0
+        # Per-farm proxies so concurrent games and farms never share chat history with an assistant
+        self.user_proxies: Dict[str, object] = {}
+        # The game runs in its own task and publishes frames here; every viewer follows the log
+        self.frames = FrameLog(queue_size=int(os.getenv("STREAM_QUEUE_SIZE", "64")))
+        self.task = None
+
+    def stop(self):
+        self.running = False
+
+    def info(self) -> Dict:
+        return {"session_id": self.session_id, "seed": self.seed, "running": self.running, "farms": [name for name, _ in self.farms], "day": self.day, "started_at": self.started_at, "stream": self.frames.stats()}
+
+class SessionRegistry:
+    def __init__(self):
+        self._sessions: Dict[str, CompetitionSession] = {}
+
+    def create(self, session_id: Optional[str] = None, seed: Optional[int] = None, farms: Optional[List[Tuple[str, str]]] = None) -> CompetitionSession:
+        session_id = check_session_id(session_id or uuid.uuid4().hex)
+        if session_id in self._sessions:
+            raise KeyError(session_id)
+        session = CompetitionSession(session_id, seed, farms)
+        self._sessions[session_id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[CompetitionSession]:
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    def list(self) -> List[Dict]:
+        return [session.info() for session in self._sessions.values()]
+
+sessions = SessionRegistry()
@@ -0,0 +1,228 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from functools import lru_cache
+from typing import Dict, Tuple
+import numpy as np
+from constants import GAME_RULES
+from rules import RULE_SECTIONS
+from engine import GameState, update_state
+from order_book import OrderBook
+from policies import PLANT_DECISIONS
+
+# Optimal single-farm play under GAME_RULES, ignoring the opponent (so no trades or sabotage),
+# as a baseline for scoring agents. Forward dynamic programming over days where a state is
+# compressed to (energy, value of growing crops per ready day, whether anything is ready):
+# planting dates and crop types only matter through when a crop becomes harvestable and what it
+# is worth, and crops that cannot be ready by the last day are dropped. Money and ready crops
+# are not part of the key. Harvest takes every ready crop at once, so a path with at least as
+# much money and at least as much money plus ready crop value can do whatever another path can;
+# each key keeps only the front of such undominated paths. Each day's layer is processed as
+# NumPy arrays. Transitions are computed by update_state itself and memoized on what the rules
+# actually look at (energy, whether the money covers a crop, whether any crop is ready).
+#
+# A solve takes a few seconds but depends only on the rules, so optimal_money keeps its results
+# in a small JSON file keyed by a hash of constants.py's rules; SOLVER_CACHE_PATH= turns it off.
+
+SOLVER_DECISIONS = PLANT_DECISIONS + ["2 Harvest", "3 Maintenance"]
+CROP_TYPES = sorted(GAME_RULES["crops"])
+# Money at or above the highest crop cost can afford every action
+AFFORD_ALL = max(rules["cost"] for rules in GAME_RULES["crops"].values())
+# Bump when a change to the solver could change its result, so cached optima are solved again
+SOLVER_VERSION = 1
+SOLVER_CACHE_PATH = os.getenv("SOLVER_CACHE_PATH", "recordings/optimal_money.json")
+
+@lru_cache(maxsize=None)
+def transition(decision: str, energy: int, money: float, ready: Tuple[int, ...]) -> Tuple[int, float, str, bool]:
+    # (energy next day, money delta, crop type planted or None, whether ready crops were harvested)
+    day = GAME_RULES["total_days"]
+    state = GameState(day=day, money=money, energy=energy)
+    for crop_type, count in zip(CROP_TYPES, ready):
+        if count:
+            state.crops.add(crop_type, day, count)
+    update_state(state, {"solver": state}, decision, [], OrderBook(), random.Random(0))
+    planted = next((crop_type for crop_type, planted_at, _, _ in state.crops.planted() if planted_at == day), None)
+    return state.energy, state.money - money, planted, len(state.crops) < sum(ready)
+
+def unit(i: int) -> Tuple[int, ...]:
+    return tuple(1 if j == i else 0 for j in range(len(CROP_TYPES)))
+
+def ready_values() -> Tuple[float, ...]:
+    # What one ready crop of each type is worth when harvested
+    return tuple(transition("2 Harvest", GAME_RULES["max_energy"], AFFORD_ALL, unit(i))[1] for i in range(len(CROP_TYPES)))
+
+@lru_cache(maxsize=None)
+def options(energy: int, money: float, has_ready: bool) -> Tuple:
+    # Outcome of every decision as (decision, next energy, money delta, planted type index, harvested).
+    # Only whether something is ready matters to these rules; a successful harvest's earnings are
+    # the ready crops' value, which the caller tracks.
+    ready = unit(0) if has_ready else tuple(0 for _ in CROP_TYPES)
+    outcomes = {}
+    for decision in SOLVER_DECISIONS:
+        next_energy, money_delta, planted, harvested = transition(decision, energy, money, ready)
+        outcome = (next_energy, 0.0 if harvested else money_delta, None if planted is None else CROP_TYPES.index(planted), harvested)
+        # Decisions with the same effect (e.g. every failed plant) only need to be explored once
+        outcomes.setdefault(outcome, decision)
+    return tuple((decision, *outcome) for outcome, decision in outcomes.items())
+
+def pareto_keep(group: np.ndarray, money: np.ndarray, total: np.ndarray) -> np.ndarray:
+    # Indices of the points no other point in the same group beats on both money and
+    # money + ready crop value. Sorted by group, then money and total descending, a point
+    # survives if its total beats every total before it in its group.
+    order = np.lexsort((-total, -money, group))
+    group, total = group[order], total[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = group[1:] != group[:-1]
+    # Running max of total that restarts at each group, via a per-group offset above any total
+    scaled = np.round((total - total.min()) * 1e6).astype(np.int64)
+    offset = np.cumsum(first) * (int(scaled.max()) + 1)
+    running = np.maximum.accumulate(scaled + offset)
+    keep = first.copy()
+    keep[1:] |= scaled[1:] + offset[1:] > running[:-1]
+    return order[keep]
+
+def solve(total_days: int = GAME_RULES["total_days"]) -> Dict:
+    start = time.perf_counter()
+    values = ready_values()
+    growth = [GAME_RULES["crops"][crop_type]["growth_time"] for crop_type in CROP_TYPES]
+    slots = len(SOLVER_DECISIONS)
+
+    # Current layer, one entry per undominated point; growing crops are interned per day as
+    # sorted (ready_day, value maturing that day) tuples
+    energy = np.array([GAME_RULES["max_energy"]], dtype=np.int64)
+    growing = np.zeros(1, dtype=np.int64)
+    growing_states = [()]
+    money = np.array([float(GAME_RULES["starting_money"])])
+    ready = np.zeros(1)
+    history = []  # per day: (parent point, decision index)
+    states = 1
+    transitions = 0
+
+    for day in range(1, total_days + 1):
+        # Decision outcomes for each distinct (energy, money the rules see, anything ready)
+        energy_levels, energy_index = np.unique(energy, return_inverse=True)
+        money_levels, money_index = np.unique(np.minimum(money, AFFORD_ALL), return_inverse=True)
+        rule_keys, rule_index = np.unique((energy_index * len(money_levels) + money_index) * 2 + (ready > 0), return_inverse=True)
+        unique_inputs = [(energy_levels[key // 2 // len(money_levels)], money_levels[key // 2 % len(money_levels)], key % 2) for key in rule_keys]
+        next_energy_table = np.zeros((len(unique_inputs), slots), dtype=np.int64)
+        delta_table = np.zeros((len(unique_inputs), slots))
+        planted_table = np.full((len(unique_inputs), slots), -1, dtype=np.int64)
+        harvested_table = np.zeros((len(unique_inputs), slots), dtype=bool)
+        decision_table = np.full((len(unique_inputs), slots), -1, dtype=np.int64)
+        for row, (row_energy, row_money, row_ready) in enumerate(unique_inputs):
+            for slot, (decision, next_energy, money_delta, planted, harvested) in enumerate(options(int(row_energy), float(row_money), bool(row_ready))):
+                next_energy_table[row, slot] = next_energy
+                delta_table[row, slot] = money_delta
+                planted_table[row, slot] = -1 if planted is None else planted
+                harvested_table[row, slot] = harvested
+                decision_table[row, slot] = SOLVER_DECISIONS.index(decision)
+
+        # Growing crops after planting (or not), and the value that becomes ready tomorrow
+        next_states = {}
+        growing_next = np.zeros((len(growing_states), len(CROP_TYPES) + 1), dtype=np.int64)
+        maturing_table = np.zeros((len(growing_states), len(CROP_TYPES) + 1))
+        for state_id in np.unique(growing):
+            for planted in range(-1, len(CROP_TYPES)):
+                pending = dict(growing_states[state_id])
+                if planted >= 0 and day + growth[planted] <= total_days:
+                    pending[day + growth[planted]] = pending.get(day + growth[planted], 0.0) + values[planted]
+                maturing = sum(value for ready_day, value in pending.items() if ready_day <= day + 1)
+                next_state = tuple(sorted((ready_day, value) for ready_day, value in pending.items() if ready_day > day + 1))
+                growing_next[state_id, planted + 1] = next_states.setdefault(next_state, len(next_states))
+                maturing_table[state_id, planted + 1] = maturing
+
+        parents, decisions = [], []
+        for slot in range(slots):
+            decision = decision_table[rule_index, slot]
+            parents.append(np.nonzero(decision >= 0)[0])
+            decisions.append(decision[parents[-1]])
+        parent = np.concatenate(parents)
+        slot_of = np.concatenate([np.full(len(points), slot) for slot, points in enumerate(parents)])
+        decision = np.concatenate(decisions)
+        rows = rule_index[parent]
+        planted = planted_table[rows, slot_of]
+        harvested = harvested_table[rows, slot_of]
+        maturing = maturing_table[growing[parent], planted + 1]
+        next_energy = next_energy_table[rows, slot_of]
+        next_growing = growing_next[growing[parent], planted + 1]
+        next_money = money[parent] + np.where(harvested, ready[parent], delta_table[rows, slot_of])
+        next_ready = np.where(harvested, 0.0, ready[parent]) + maturing
+        transitions += len(parent)
+
+        group = (next_energy * len(next_states) + next_growing) * 2 + (next_ready > 0)
+        keep = pareto_keep(group, next_money, next_money + next_ready)
+        energy, growing, money, ready = next_energy[keep], next_growing[keep], next_money[keep], next_ready[keep]
+        growing_states = [state for state, _ in sorted(next_states.items(), key=lambda item: item[1])]
+        history.append((parent[keep], decision[keep]))
+        states += len(keep)
+
+    # Crops still in the field at the end are worth nothing
+    point = int(np.argmax(money))
+    optimal = float(money[point])
+    plan = []
+    for parent, decision in reversed(history):
+        plan.append(SOLVER_DECISIONS[decision[point]])
+        point = int(parent[point])
+    plan.reverse()
+
+    return {
+        "optimal_money": optimal,
+        "decisions": plan,
+        "states": states,
+        "transitions": transitions,
+        "seconds": time.perf_counter() - start
+    }
+
+def rules_key(total_days: int) -> str:
+    rules = json.dumps({"version": SOLVER_VERSION, "days": total_days, "rules": RULE_SECTIONS}, sort_keys=True)
+    return hashlib.sha256(rules.encode()).hexdigest()
+
+def load_optima(path: str) -> Dict[str, float]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def save_optimum(path: str, key: str, optimal: float):
+    # Written to a temporary file and renamed, so concurrent processes never read half a file
+    optima = load_optima(path)
+    optima[key] = optimal
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(optima, f)
+    os.replace(temporary, path)
+
+@lru_cache(maxsize=None)
+def optimal_money(total_days: int = GAME_RULES["total_days"]) -> float:
+    key = rules_key(total_days)
+    if SOLVER_CACHE_PATH:
+        optimal = load_optima(SOLVER_CACHE_PATH).get(key)
+        if optimal is not None:
+            return optimal
+    optimal = solve(total_days)["optimal_money"]
+    if SOLVER_CACHE_PATH:
+        save_optimum(SOLVER_CACHE_PATH, key, optimal)
+    return optimal
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute the best achievable final money for a single farm")
+    parser.add_argument("--days", type=int, default=GAME_RULES["total_days"])
+    parser.add_argument("--plan", action="store_true", help="Print the optimal decision for every day")
+    args = parser.parse_args(argv)
+
+    result = solve(args.days)
+    print(f"Optimal final money over {args.days} days: {result['optimal_money']:.2f}")
+    print(f"{result['states']} states, {result['transitions']} transitions, {result['seconds']:.2f}s")
+    if args.plan:
+        for day, decision in enumerate(result["decisions"], start=1):
+            print(f"  day {day:>3}: {decision}")
+
+if __name__ == "__main__":
+    main()
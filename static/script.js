@@ -4,8 +4,13 @@ const gpt4Farm = document.getElementById('gpt4-farm');
 const gpt35Farm = document.getElementById('gpt35-farm');
 
 let moneyChart, energyChart, actionChart;
-let gpt4Data = { money: [], energy: [], actions: [] };
-let gpt35Data = { money: [], energy: [], actions: [] };
+
+const GRID_CELLS = 25;
+// Charts keep the last CHART_WINDOW points at full resolution; once a series grows past
+// CHART_MAX_POINTS, every other point older than the window is dropped, so a long game keeps a
+// coarser history at a bounded drawing cost
+const CHART_WINDOW = 200;
+const CHART_MAX_POINTS = 400;
 
 const cropEmojis = {
     'Maintenance': '🛠️',
@@ -106,95 +111,206 @@ function initCharts() {
     actionChart.actionAbbreviations = actionAbbreviations;
 }
 
+function gridCells(farm) {
+    // The overlay and plot cells are built once per farm and patched in place afterwards
+    if (!farm.cells) {
+        const grid = farm.querySelector('.farm-grid');
+        grid.innerHTML = '';
+
+        // Create a maintenance overlay
+        farm.overlay = document.createElement('div');
+        farm.overlay.className = 'maintenance-overlay';
+        farm.overlay.textContent = cropEmojis['Maintenance'];
+        farm.overlay.style.display = 'none';
+        grid.appendChild(farm.overlay);
+
+        farm.cells = [];
+        for (let i = 0; i < GRID_CELLS; i++) {
+            const cell = document.createElement('div');
+            cell.title = 'Empty plot';
+            grid.appendChild(cell);
+            farm.cells.push(cell);
+        }
+    }
+    return farm.cells;
+}
+
+function setText(element, text) {
+    // Writing the same text still costs a DOM mutation and a relayout
+    if (element.textContent !== String(text)) element.textContent = text;
+}
+
 function updateFarmGrid(farm, crops, lastAction) {
-    const grid = farm.querySelector('.farm-grid');
-    grid.innerHTML = '';
-    
-    // Create a maintenance overlay
-    const overlay = document.createElement('div');
-    overlay.className = 'maintenance-overlay';
-    overlay.textContent = cropEmojis['Maintenance'];
-    overlay.style.display = 'none';
-    grid.appendChild(overlay);
-
-    for (let i = 0; i < 25; i++) {
-        const cell = document.createElement('div');
+    const cells = gridCells(farm);
+    for (let i = 0; i < GRID_CELLS; i++) {
+        const cell = cells[i];
         if (i < crops.length) {
             const cropType = crops[i].type;
-            cell.textContent = cropEmojis[cropType] || cropType;
-            cell.title = `${cropType} (planted on day ${crops[i].planted_at})`;
-        } else {
+            setText(cell, cropEmojis[cropType] || cropType);
+            const title = `${cropType} (planted on day ${crops[i].planted_at})`;
+            if (cell.title !== title) cell.title = title;
+        } else if (cell.textContent !== '') {
             cell.textContent = '';
             cell.title = 'Empty plot';
         }
-        grid.appendChild(cell);
     }
 
     // Show overlay if last action was Maintenance
-    if (lastAction === 'Maintenance') {
-        overlay.style.display = 'flex';
-    }
+    const display = lastAction === 'Maintenance' ? 'flex' : 'none';
+    if (farm.overlay.style.display !== display) farm.overlay.style.display = display;
 }
 
 function updateFarmStats(farm, data) {
-    farm.querySelector('.day').textContent = data.day;
-    farm.querySelector('.money').textContent = data.money;
-    farm.querySelector('.energy').textContent = data.energy;
+    setText(farm.querySelector('.day'), data.day);
+    setText(farm.querySelector('.money'), data.money);
+    setText(farm.querySelector('.energy'), data.energy);
 }
 
-function updateCharts(day) {
-    moneyChart.data.labels.push(day);
-    moneyChart.data.datasets[0].data.push(gpt35Data.money[gpt35Data.money.length - 1]);
-    moneyChart.data.datasets[1].data.push(gpt4Data.money[gpt4Data.money.length - 1]);
-    moneyChart.update();
-
-    energyChart.data.labels.push(day);
-    energyChart.data.datasets[0].data.push(gpt35Data.energy[gpt35Data.energy.length - 1]);
-    energyChart.data.datasets[1].data.push(gpt4Data.energy[gpt4Data.energy.length - 1]);
-    energyChart.update();
+function decimate(arrays) {
+    // arrays run in parallel (labels and datasets, or data and point styles) and are thinned together
+    const length = arrays[0].length;
+    if (length <= CHART_MAX_POINTS) return;
+    const older = length - CHART_WINDOW;
+    for (const array of arrays) {
+        const kept = [];
+        for (let i = 0; i < older; i += 2) kept.push(array[i]);
+        array.splice(0, older, ...kept);
+    }
 }
 
-function updateActionChart(day, gpt35Action, gpt4Action) {
-    console.log('Updating action chart:', day, gpt35Action, gpt4Action);
+function updateCharts(points) {
+    for (const point of points) {
+        moneyChart.data.labels.push(point.day);
+        moneyChart.data.datasets[0].data.push(point.gpt35.money);
+        moneyChart.data.datasets[1].data.push(point.gpt4.money);
 
-    const gpt35ActionType = gpt35Action.split(' ')[1];
-    const gpt4ActionType = gpt4Action.split(' ')[1];
+        energyChart.data.labels.push(point.day);
+        energyChart.data.datasets[0].data.push(point.gpt35.energy);
+        energyChart.data.datasets[1].data.push(point.gpt4.energy);
+    }
+    for (const chart of [moneyChart, energyChart]) {
+        decimate([chart.data.labels, ...chart.data.datasets.map(dataset => dataset.data)]);
+        // 'none' skips the animation, which would otherwise restart on every redraw
+        chart.update('none');
+    }
+}
 
+function updateActionChart(points) {
     // Function to get the abbreviation of the action type
     const getActionAbbreviation = (actionType) => actionChart.actionAbbreviations[actionType] || '';
 
-    // Only add data points if the action is not "finished"
-    if (gpt35ActionType !== 'finished') {
-        actionChart.data.datasets[0].data.push({ 
-            x: day, 
-            y: getActionAbbreviation(gpt35ActionType), 
-            action: gpt35Action,
-            id: `gpt35-${day}`
+    for (const point of points) {
+        ['gpt35', 'gpt4'].forEach((name, index) => {
+            const action = point[name].decision;
+            const actionType = action.split(' ')[1];
+            // Only add data points if the action is not "finished"
+            if (actionType === 'finished') return;
+            const dataset = actionChart.data.datasets[index];
+            dataset.data.push({
+                x: point.day,
+                y: getActionAbbreviation(actionType),
+                action: action,
+                id: `${name}-${point.day}`
+            });
+            dataset.pointStyle.push(cropEmojis[actionType] || '❓');
         });
-        actionChart.data.datasets[0].pointStyle.push(cropEmojis[gpt35ActionType] || '❓');
     }
+    for (const dataset of actionChart.data.datasets) {
+        decimate([dataset.data, dataset.pointStyle]);
+    }
+    actionChart.update('none');
+}
 
-    if (gpt4ActionType !== 'finished') {
-        actionChart.data.datasets[1].data.push({ 
-            x: day, 
-            y: getActionAbbreviation(gpt4ActionType), 
-            action: gpt4Action,
-            id: `gpt4-${day}`
-        });
-        actionChart.data.datasets[1].pointStyle.push(cropEmojis[gpt4ActionType] || '❓');
+let eventSource; // Declare this at the top of your script
+let sessionId;
+
+function newSessionId() {
+    return Date.now().toString(36) + Math.random().toString(36).slice(2, 10);
+}
+
+// Farm state rebuilt from snapshot and delta frames; crops are counts keyed by "type|planted_at"
+let farms = {};
+
+function applyFrame(frame) {
+    if (frame.type === 'snapshot') {
+        farms = {};
+        for (const [name, data] of Object.entries(frame.farms)) {
+            const { crops, ...fields } = data;
+            const counts = new Map();
+            for (const crop of crops) {
+                const key = `${crop.type}|${crop.planted_at}`;
+                counts.set(key, (counts.get(key) || 0) + 1);
+            }
+            farms[name] = { ...fields, crops: counts };
+        }
+        return;
     }
+    for (const [name, delta] of Object.entries(frame.farms)) {
+        const farm = farms[name] || (farms[name] = { crops: new Map() });
+        const { crops_added = [], crops_removed = [], ...fields } = delta;
+        Object.assign(farm, fields);
+        for (const [type, plantedAt, count] of crops_added) {
+            const key = `${type}|${plantedAt}`;
+            farm.crops.set(key, (farm.crops.get(key) || 0) + count);
+        }
+        for (const [type, plantedAt, count] of crops_removed) {
+            const key = `${type}|${plantedAt}`;
+            const left = (farm.crops.get(key) || 0) - count;
+            if (left > 0) farm.crops.set(key, left); else farm.crops.delete(key);
+        }
+    }
+}
+
+function farmView(name, limit = GRID_CELLS) {
+    // The oldest crops, as many as the grid shows; expanding every crop would cost O(crops) per render
+    const { crops, ...fields } = farms[name];
+    const groups = [];
+    for (const [key, count] of crops) {
+        const [type, plantedAt] = key.split('|');
+        groups.push({ type, planted_at: Number(plantedAt), count });
+    }
+    groups.sort((a, b) => a.planted_at - b.planted_at);
+    const list = [];
+    for (const group of groups) {
+        for (let i = 0; i < group.count && list.length < limit; i++) list.push({ type: group.type, planted_at: group.planted_at });
+        if (list.length >= limit) break;
+    }
+    return { ...fields, crops: list };
+}
 
-    console.log('Chart data:', actionChart.data);
+// Frames are applied as they arrive, but the page is redrawn at most once per animation frame
+// with every day that arrived since, so a fast stream costs one render per frame, not per day
+let pendingPoints = [];
+let renderScheduled = false;
 
-    actionChart.update();
+function scheduleRender() {
+    if (!renderScheduled) {
+        renderScheduled = true;
+        requestAnimationFrame(render);
+    }
 }
 
-// Add this function at the top level of the script
-function delay(ms) {
-    return new Promise(resolve => setTimeout(resolve, ms));
+function render() {
+    renderScheduled = false;
+    if (!farms.gpt35 || !farms.gpt4) return;
+    const data = { gpt35: farmView('gpt35'), gpt4: farmView('gpt4') };
+
+    updateFarmGrid(gpt35Farm, data.gpt35.crops, data.gpt35.decision.split(' ')[1]);
+    updateFarmGrid(gpt4Farm, data.gpt4.crops, data.gpt4.decision.split(' ')[1]);
+
+    updateFarmStats(gpt35Farm, data.gpt35);
+    updateFarmStats(gpt4Farm, data.gpt4);
+
+    const points = pendingPoints;
+    pendingPoints = [];
+    updateCharts(points);
+    updateActionChart(points);
 }
 
-let eventSource; // Declare this at the top of your script
+function resetButtons() {
+    startBtn.disabled = false;
+    stopBtn.disabled = true;
+}
 
 startBtn.addEventListener('click', async () => {
     startBtn.disabled = true;
@@ -203,38 +319,35 @@ startBtn.addEventListener('click', async () => {
     // Start the competition on the server
     // await fetch('/start-competition', { method: 'POST' });
 
-    eventSource = new EventSource('/stream-competition');
-
-    eventSource.onmessage = async (event) => {
-        const data = JSON.parse(event.data);
-        
-        await delay(1000); // Add a 1-second delay between updates
-
-        updateFarmGrid(gpt35Farm, data.gpt35.crops, data.gpt35.decision.split(' ')[1]);
-        updateFarmGrid(gpt4Farm, data.gpt4.crops, data.gpt4.decision.split(' ')[1]);
-
-        updateFarmStats(gpt35Farm, data.gpt35);
-        updateFarmStats(gpt4Farm, data.gpt4);
-
-        gpt35Data.money.push(data.gpt35.money);
-        gpt35Data.energy.push(data.gpt35.energy);
-        gpt4Data.money.push(data.gpt4.money);
-        gpt4Data.energy.push(data.gpt4.energy);
-
-        updateCharts(data.gpt4.day);
-        updateActionChart(data.gpt4.day, data.gpt35.decision, data.gpt4.decision);
+    sessionId = newSessionId();
+    farms = {};
+    eventSource = new EventSource(`/stream-competition?session_id=${encodeURIComponent(sessionId)}`);
+
+    eventSource.onmessage = (event) => {
+        applyFrame(JSON.parse(event.data));
+        if (!farms.gpt35 || !farms.gpt4) return;
+        // Only what the charts need from this day; the grid and stats render from the latest state
+        const point = (name) => ({ money: farms[name].money, energy: farms[name].energy, decision: farms[name].decision });
+        pendingPoints.push({ day: farms.gpt4.day, gpt35: point('gpt35'), gpt4: point('gpt4') });
+        scheduleRender();
     };
 
-    eventSource.onerror = () => {
+    eventSource.addEventListener('end', () => {
         eventSource.close();
-        startBtn.disabled = false;
-        stopBtn.disabled = true;
+        resetButtons();
+    });
+
+    // EventSource reconnects on its own and resumes from the last frame id via Last-Event-ID
+    eventSource.onerror = () => {
+        if (eventSource.readyState === EventSource.CLOSED) {
+            resetButtons();
+        }
     };
 });
 
 stopBtn.addEventListener('click', async () => {
     try {
-        const response = await fetch('/stop-competition', { method: 'POST' });
+        const response = await fetch(`/stop-competition?session_id=${encodeURIComponent(sessionId)}`, { method: 'POST' });
         if (response.ok) {
             startBtn.disabled = false;
             stopBtn.disabled = true;
@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Tuple, Union
+from policies import make_policy
+from rules import DEFAULT_RULES
+from tournament import play_game
+
+# Rule-parameter sweeps: every variant is a set of overrides of constants.py (see rules.py),
+# compiled into its own RuleTable and played for a number of games between two offline policies.
+# Variants are spread over a process pool in small batches, and each variant's aggregate
+# statistics are printed as a JSON line as soon as its batch finishes, with progress and the best
+# variant so far on stderr. Every variant plays the same game seeds, so differences between
+# variants come from the rules rather than from luck.
+#
+#   python sweep.py --axis game.crops.Corn.cost=5,10,15 --axis sabotage.sabotage_success_rate=0.3:0.9:4
+#   python sweep.py --sample 2000 --axis game.energy_regen_per_day=10:40 --axis trading.trade_fee_percentage=0:0.3 --games 20
+
+Axis = Tuple[str, Union[List[float], Tuple[float, float]]]
+
+def rule_type(path: str) -> type:
+    # int or float, from the rule's value in constants.py
+    node = DEFAULT_RULES.config
+    for part in path.split("."):
+        if not hasattr(node, "get") or part not in node:
+            raise ValueError(f"Unknown rule: {path}")
+        node = node[part]
+    if not isinstance(node, (int, float)):
+        raise ValueError(f"Not a numeric rule: {path}")
+    return type(node)
+
+def parse_number(text: str, kind: type) -> Union[int, float]:
+    # Typed by the rule rather than the literal, so "0:1" for a rate is a float range
+    return round(float(text)) if kind is int else float(text)
+
+def parse_axis(spec: str) -> Axis:
+    # "path=1,2,3" lists values; "path=lo:hi:n" is n evenly spaced values; "path=lo:hi" is a range
+    # that only --sample can draw from
+    path, _, values = spec.partition("=")
+    if not values:
+        raise ValueError(f"Axis needs values: {spec}")
+    kind = rule_type(path)
+    if ":" not in values:
+        return path, [parse_number(value, kind) for value in values.split(",")]
+    parts = values.split(":")
+    low, high = parse_number(parts[0], kind), parse_number(parts[1], kind)
+    if len(parts) == 2:
+        return path, (low, high)
+    steps = int(parts[2])
+    points = [low + (high - low) * i / max(steps - 1, 1) for i in range(steps)]
+    return path, [round(point) if kind is int else round(point, 10) for point in points]
+
+def grid_variants(axes: List[Axis]) -> List[Dict]:
+    if any(isinstance(values, tuple) for _, values in axes):
+        raise ValueError("A lo:hi range needs --sample, or a step count (lo:hi:n) for a grid")
+    paths = [path for path, _ in axes]
+    return [dict(zip(paths, values)) for values in itertools.product(*(values for _, values in axes))]
+
+def sample_variants(axes: List[Axis], count: int, rng: random.Random) -> List[Dict]:
+    variants = []
+    for _ in range(count):
+        variant = {}
+        for path, values in axes:
+            if isinstance(values, list):
+                variant[path] = rng.choice(values)
+            elif isinstance(values[0], int):
+                variant[path] = rng.randint(*values)
+            else:
+                variant[path] = rng.uniform(*values)
+        variants.append(variant)
+    return variants
+
+def run_variants(batch: List[Tuple[int, Dict]], spec_a: str, spec_b: str, games: int, seed: int) -> List[Dict]:
+    # Runs in a worker: every game of every variant in the batch, one event loop for all of them
+    async def play_all():
+        results = []
+        for variant_id, overrides in batch:
+            rules = DEFAULT_RULES.with_overrides(overrides)
+            money = {"a": [], "b": []}
+            wins = Counter()
+            actions = {"a": Counter(), "b": Counter()}
+            for game in range(games):
+                # Alternate seats so neither policy always moves first
+                swapped = game % 2 == 1
+                seats = {"a": "b", "b": "a"} if swapped else {"a": "a", "b": "b"}
+                on_day = lambda seat, day, decision, action, state: actions[seats[seat]].update((action,))
+                # Already in a worker process, so rollouts run inline
+                policy_a, policy_b = make_policy(spec_a, seed + game, rollout_workers=0), make_policy(spec_b, seed + game + 1, rollout_workers=0)
+                policies = (policy_b, policy_a) if swapped else (policy_a, policy_b)
+                first, second, _ = await play_game(*policies, random.Random(seed + game), on_day=on_day, rules=rules)
+                state_a, state_b = (second, first) if swapped else (first, second)
+                money["a"].append(state_a.money)
+                money["b"].append(state_b.money)
+                wins["a" if state_a.money > state_b.money else "b" if state_b.money > state_a.money else "draw"] += 1
+            result = {"variant": variant_id, "rules": overrides, "games": games}
+            for seat in ("a", "b"):
+                result[f"win_rate_{seat}"] = wins[seat] / games
+                result[f"money_{seat}_mean"] = statistics.fmean(money[seat])
+                result[f"money_{seat}_sd"] = statistics.pstdev(money[seat])
+                total = sum(actions[seat].values())
+                result[f"actions_{seat}"] = {action: round(count / total, 4) for action, count in actions[seat].most_common()}
+            result["draw_rate"] = wins["draw"] / games
+            results.append(result)
+        return results
+    return asyncio.run(play_all())
+
+def sweep(variants: List[Dict], spec_a: str, spec_b: str, games: int, seed: int = 0, workers: int = None, batch_size: int = None) -> Iterator[Dict]:
+    # Yields each variant's statistics as soon as its batch finishes, in completion order
+    workers = workers or os.cpu_count()
+    # Small batches keep results streaming while amortizing task overhead
+    batch_size = batch_size or max(1, min(16, len(variants) // (workers * 8)))
+    indexed = list(enumerate(variants))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_variants, indexed[i:i + batch_size], spec_a, spec_b, games, seed) for i in range(0, len(indexed), batch_size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play rule variants against each other's baselines and stream outcome statistics")
+    parser.add_argument("--axis", action="append", required=True, help="Rule override values, e.g. game.crops.Corn.cost=5,10,15 or sabotage.sabotage_success_rate=0.3:0.9:4")
+    parser.add_argument("--sample", type=int, default=None, help="Draw this many random variants instead of the full grid")
+    parser.add_argument("--policies", nargs=2, default=["scripted", "random"], metavar=("A", "B"))
+    parser.add_argument("--games", type=int, default=20, help="Games per variant")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=None, help="Variants per worker task")
+    parser.add_argument("--rank-by", default="money_a_mean", help="Statistic the best variants are chosen by")
+    parser.add_argument("--ascending", action="store_true", help="Lower --rank-by values are better")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    try:
+        axes = [parse_axis(spec) for spec in args.axis]
+        variants = sample_variants(axes, args.sample, random.Random(args.seed)) if args.sample else grid_variants(axes)
+    except ValueError as e:
+        parser.error(str(e))
+
+    sign = -1 if args.ascending else 1
+    start = time.perf_counter()
+    results = []
+    best = None
+    reported = 0.0
+    for result in sweep(variants, *args.policies, args.games, args.seed, args.workers, args.batch_size):
+        print(json.dumps(result), flush=True)
+        results.append(result)
+        if best is None or sign * result[args.rank_by] > sign * best[args.rank_by]:
+            best = result
+        elapsed = time.perf_counter() - start
+        # Progress at most twice a second
+        if elapsed - reported < 0.5 and len(results) < len(variants):
+            continue
+        reported = elapsed
+        print(f"\r{len(results)}/{len(variants)} variants, {len(results) * args.games / elapsed:.0f} games/s, best {args.rank_by} {best[args.rank_by]:.2f} (variant {best['variant']})", end="", file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    print(f"Top {args.top} variants by {args.rank_by}:", file=sys.stderr)
+    for result in sorted(results, key=lambda result: sign * result[args.rank_by], reverse=True)[:args.top]:
+        print(f"  {result[args.rank_by]:>10.2f}  {json.dumps(result['rules'])}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import random
+import numpy as np
+import pytest
+from batch_engine import BatchGames, CROP_TYPES, encode_decisions
+from constants import GAME_RULES, TRADING_RULES
+from engine import GameState, clear_order_book, update_state
+from order_book import OrderBook
+
+# BatchGames.step must play every game exactly as update_state plays the same decisions
+
+def random_decision(rng: random.Random) -> str:
+    action = rng.choice(["Plant", "Harvest", "Maintenance", "Sell", "Buy", "Sabotage"])
+    if action == "Plant":
+        return f"1 Plant {rng.choice(CROP_TYPES)}"
+    if action == "Sell":
+        # Out-of-range amounts too, so failed trades are compared as well
+        return f"4 Sell {rng.choice(CROP_TYPES)} {rng.randint(0, TRADING_RULES['max_trade_amount'] + 1)}"
+    if action == "Buy":
+        # Mostly small amounts, so some buys fit the money left after earlier reservations
+        return f"5 Buy {rng.choice(CROP_TYPES)} {rng.choice([0, 1, 2, 3, TRADING_RULES['max_trade_amount'] + 1])}"
+    return {"Harvest": "2 Harvest", "Maintenance": "3 Maintenance", "Sabotage": "6 Sabotage"}[action]
+
+def assert_same(batch: BatchGames, states, day: int):
+    for game, state in enumerate(states):
+        where = f"game {game}, day {day}"
+        assert batch.money[game] == pytest.approx(state.money), where
+        assert batch.reserved[game] == pytest.approx(state.reserved_money), where
+        assert batch.energy[game] == state.energy, where
+        counts = state.crops.counts_by_type()
+        assert {crop_type: int(batch.crops[game, i].sum()) for i, crop_type in enumerate(CROP_TYPES)} == {crop_type: counts[crop_type] for crop_type in CROP_TYPES}, where
+        assert {crop_type: int(batch.harvested[game, i]) for i, crop_type in enumerate(CROP_TYPES)} == {crop_type: state.harvested_crops.get(crop_type, 0) for crop_type in CROP_TYPES}, where
+
+@pytest.mark.parametrize("seed", range(5))
+def test_step_matches_update_state(seed):
+    n_games, total_days = 60, 50
+    rng = random.Random(seed)
+    batch = BatchGames(n_games, total_days)
+    states = [GameState(money=GAME_RULES["starting_money"], energy=GAME_RULES["max_energy"], day=1) for _ in range(n_games)]
+    markets = [OrderBook() for _ in range(n_games)]
+    engine_rng = random.Random(seed)
+
+    for day in range(1, total_days + 1):
+        decisions = [random_decision(rng) for _ in range(n_games)]
+        batch.step(*encode_decisions(decisions))
+        for state, market, decision in zip(states, markets, decisions):
+            update_state(state, {"farm": state}, decision, [], market, engine_rng)
+        assert_same(batch, states, day)
+
+    batch.finish()
+    for state, market in zip(states, markets):
+        clear_order_book(state, market)
+    assert_same(batch, states, total_days)
+
+def test_step_rejects_unsupported_actions():
+    with pytest.raises(ValueError):
+        BatchGames(2).step(np.array([1, 7]))
+
+@pytest.mark.parametrize("decisions", [
+    # A buy reserves money that a second buy cannot use, then releases it when it expires
+    ["5 Buy Wheat 3", "5 Buy Corn 1", "5 Buy Tomato 2", "3 Maintenance", "5 Buy Wheat 4"],
+    # Sabotage has no target in a single-farm game and costs nothing
+    ["1 Plant Corn", "6 Sabotage", "6 Sabotage", "5 Buy Corn 51", "6 Sabotage"],
+])
+def test_buy_and_sabotage_match_update_state(decisions):
+    batch = BatchGames(1, len(decisions))
+    state, market = GameState(), OrderBook()
+    for day, decision in enumerate(decisions, start=1):
+        batch.step(*encode_decisions([decision]))
+        update_state(state, {"farm": state}, decision, [], market, random.Random(0))
+        assert_same(batch, [state], day)
+    batch.finish()
+    clear_order_book(state, market)
+    assert_same(batch, [state], len(decisions))
+    assert batch.reserved[0] == 0
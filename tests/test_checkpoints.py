@@ -0,0 +1,33 @@
+import pytest
+from checkpoints import RecordedDays, days_path, load_checkpoint, remove_checkpoint, save_checkpoint
+from sessions import SessionRegistry
+
+def test_resumed_days_drop_what_was_played_after_the_checkpoint(tmp_path):
+    days = RecordedDays(days_path(str(tmp_path), "game"))
+    for day in range(3):
+        days.append([f"{day} Plant", "3 Maintenance"])
+    save_checkpoint(str(tmp_path), "game", {"recorded_days": days})
+    days.append(["played after the checkpoint", "3 Maintenance"])
+    days.close()
+
+    resumed = load_checkpoint(str(tmp_path), "game")["recorded_days"]
+    assert len(resumed) == 3
+    resumed.append(["2 Harvest", "3 Maintenance"])
+    assert resumed.read() == [["0 Plant", "3 Maintenance"], ["1 Plant", "3 Maintenance"], ["2 Plant", "3 Maintenance"], ["2 Harvest", "3 Maintenance"]]
+    resumed.close()
+
+    remove_checkpoint(str(tmp_path), "game")
+    assert list(tmp_path.iterdir()) == []
+
+def test_days_without_a_path_stay_in_memory():
+    days = RecordedDays()
+    days.append(["2 Harvest", "3 Maintenance"])
+    assert len(days) == 1
+    assert days.read() == [["2 Harvest", "3 Maintenance"]]
+
+def test_session_ids_are_plain_file_names():
+    registry = SessionRegistry()
+    assert registry.create("game_1-a").session_id == "game_1-a"
+    for session_id in ("../../x", "a/b", "x" * 65):
+        with pytest.raises(ValueError):
+            registry.create(session_id)
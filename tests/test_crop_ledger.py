@@ -0,0 +1,115 @@
+import random
+from collections import Counter
+import pytest
+from crop_ledger import CropLedger
+from rules import DEFAULT_RULES
+
+# CropLedger must behave exactly like the list of crop dicts it replaced
+
+CROP_TYPES = sorted(DEFAULT_RULES.crops)
+
+class CropList:
+    def __init__(self):
+        self.crops = []
+
+    def add(self, crop_type, ready_day, count=1, damaged=False):
+        planted_at = ready_day - DEFAULT_RULES.crops[crop_type].growth_time
+        self.crops.extend({"type": crop_type, "planted_at": planted_at, "damaged": damaged} for _ in range(count))
+
+    def ready_day(self, crop):
+        return crop["planted_at"] + DEFAULT_RULES.crops[crop["type"]].growth_time
+
+    def ready_count(self, day, crop_type=None):
+        return sum(1 for crop in self.crops if self.ready_day(crop) <= day and crop_type in (None, crop["type"]))
+
+    def take_ready(self, day, crop_type, amount):
+        ready = sorted((crop for crop in self.crops if crop["type"] == crop_type and self.ready_day(crop) <= day), key=lambda crop: (self.ready_day(crop), crop["damaged"]))
+        taken = ready[:amount]
+        for crop in taken:
+            self.crops.remove(crop)
+        return len(taken)
+
+    def harvest(self, day):
+        harvested = [crop for crop in self.crops if self.ready_day(crop) <= day]
+        self.crops = [crop for crop in self.crops if self.ready_day(crop) > day]
+        return Counter((crop["type"], crop["damaged"]) for crop in harvested)
+
+    def damage(self, rng, k):
+        # Planting order, crop types and undamaged crops first within a day, as the ledger lists them
+        self.crops.sort(key=lambda crop: (crop["planted_at"], crop["type"], crop["damaged"]))
+        newly_damaged = 0
+        for i in rng.sample(range(len(self.crops)), min(k, len(self.crops))):
+            if not self.crops[i]["damaged"]:
+                self.crops[i]["damaged"] = True
+                newly_damaged += 1
+        return newly_damaged
+
+    def buckets(self):
+        return Counter((crop["type"], self.ready_day(crop), crop["damaged"]) for crop in self.crops)
+
+def assert_same(ledger: CropLedger, reference: CropList, day: int):
+    assert ledger.buckets == reference.buckets()
+    assert len(ledger) == len(reference.crops)
+    assert ledger.counts_by_type() == Counter(crop["type"] for crop in reference.crops)
+    assert ledger.ready_count(day) == reference.ready_count(day)
+    for crop_type in CROP_TYPES:
+        assert ledger.ready_count(day, crop_type) == reference.ready_count(day, crop_type)
+
+def test_planting_and_ready_counts():
+    ledger, reference = CropLedger(), CropList()
+    for crop_type, ready_day in (("Corn", 6), ("Tomato", 4), ("Corn", 6), ("Wheat", 8)):
+        ledger.add(crop_type, ready_day)
+        reference.add(crop_type, ready_day)
+    assert ledger.buckets == {("Corn", 6, False): 2, ("Tomato", 4, False): 1, ("Wheat", 8, False): 1}
+    for day in range(1, 10):
+        assert_same(ledger, reference, day)
+    assert [(crop_type, planted_at, count) for crop_type, planted_at, _, count in ledger.planted()] == [("Corn", 1, 2), ("Tomato", 1, 1), ("Wheat", 1, 1)]
+
+def test_damage_merges_into_the_damaged_bucket():
+    ledger = CropLedger()
+    ledger.add("Corn", 6, 3)
+    ledger.add("Corn", 6, 2, damaged=True)
+    # Damaging every crop moves the three undamaged ones in with the two already damaged
+    assert ledger.damage(random.Random(0), 5) == 3
+    assert ledger.buckets == {("Corn", 6, True): 5}
+    assert ledger.damage(random.Random(0), 5) == 0
+
+def test_going_back_a_day_recounts():
+    ledger, reference = CropLedger(), CropList()
+    for ready_day in (3, 5, 7):
+        ledger.add("Tomato", ready_day)
+        reference.add("Tomato", ready_day)
+    assert_same(ledger, reference, 7)
+    assert_same(ledger, reference, 4)
+    ledger.add("Tomato", 2)
+    reference.add("Tomato", 2)
+    assert_same(ledger, reference, 4)
+    assert_same(ledger, reference, 9)
+
+@pytest.mark.parametrize("seed", range(10))
+def test_random_actions_match_the_crop_list(seed):
+    rng = random.Random(seed)
+    ledger, reference = CropLedger(), CropList()
+    for day in range(1, 80):
+        for _ in range(rng.randint(0, 3)):
+            crop_type = rng.choice(CROP_TYPES)
+            # Mostly crops planted today, sometimes bought crops or crops already ready
+            ready_day = day + rng.choice([DEFAULT_RULES.crops[crop_type].growth_time, rng.randint(-3, 10)])
+            count, damaged = rng.randint(1, 3), rng.random() < 0.2
+            ledger.add(crop_type, ready_day, count, damaged)
+            reference.add(crop_type, ready_day, count, damaged)
+        action = rng.random()
+        if action < 0.2:
+            harvested = Counter()
+            for crop_type, damaged, count in ledger.harvest(day):
+                harvested[(crop_type, damaged)] += count
+            assert harvested == reference.harvest(day)
+        elif action < 0.5:
+            crop_type, amount = rng.choice(CROP_TYPES), rng.randint(1, 6)
+            assert ledger.take_ready(day, crop_type, amount) == reference.take_ready(day, crop_type, amount)
+        elif action < 0.65:
+            draw = rng.randrange(2**31)
+            assert ledger.damage(random.Random(draw), 3) == reference.damage(random.Random(draw), 3)
+        assert_same(ledger, reference, day)
+        if rng.random() < 0.1:
+            assert_same(ledger, reference, max(1, day - rng.randint(1, 5)))
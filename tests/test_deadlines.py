@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+import main
+import solver
+from action_log import ActionLogBuffer
+from llm_limiter import LLMLimiter
+from mock_llm import MockLLM
+from sessions import CompetitionSession
+
+class Assistant:
+    name = "FarmerNPC_Test"
+    system_message = "rules"
+    llm_config = {"config_list": [{"model": "test"}]}
+
+@pytest.fixture
+def offline_game(monkeypatch):
+    # A game with one model-played farm answered by MockLLM, writing nothing to disk
+    monkeypatch.setattr(main, "checkpoint_dir", None)
+    monkeypatch.setattr(main, "DEFAULT_RECORDINGS_PATH", "")
+    monkeypatch.setattr(main, "results_store", None)
+    monkeypatch.setattr(main, "decision_cache", None)
+    monkeypatch.setattr(main, "LLM_STREAMING", False)
+    monkeypatch.setattr(main, "HEDGE_AFTER_SECONDS", 0)
+    monkeypatch.setattr(main, "_assistants", {"gpt35": Assistant()})
+    monkeypatch.setattr(main, "_optimal_money", None)
+    monkeypatch.setattr(solver, "optimal_money", lambda: 330.0)
+    logs = []
+
+    class RecordingLog(ActionLogBuffer):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            logs.append(self)
+    monkeypatch.setattr(main, "ActionLogBuffer", RecordingLog)
+
+    async def play_one_day():
+        session = CompetitionSession("deadline-test", 1, [("gpt35", "gpt35"), ("scripted", "scripted")])
+        session.user_proxies["gpt35"] = None
+        frames = []
+        async for frame in main.run_competition(session):
+            frames.append(frame)
+            session.stop()
+        return frames[0], [entry.action for entry in logs[0]]
+    return play_one_day
+
+def test_a_slow_model_is_replaced_by_the_fallback_policy(offline_game, monkeypatch):
+    monkeypatch.setattr(main, "llm_backend", MockLLM(latency="fixed:5"))
+    monkeypatch.setattr(main, "DECISION_DEADLINE_SECONDS", 0.05)
+    timeouts = main.DECISION_TIMEOUTS.values.get((), 0)
+    frame, actions = asyncio.run(offline_game())
+    assert actions[0] == "Decision Timeout"
+    assert frame["gpt35"]["decision"] == "1 Plant Wheat"
+    assert main.DECISION_TIMEOUTS.values[()] == timeouts + 1
+
+def test_the_deadline_starts_after_the_limiter(offline_game, monkeypatch):
+    monkeypatch.setattr(main, "llm_backend", MockLLM(latency="fixed:0.01"))
+    monkeypatch.setattr(main, "DECISION_DEADLINE_SECONDS", 0.1)
+    limiter = LLMLimiter(max_concurrency=1)
+    monkeypatch.setattr(main, "llm_limiter", limiter)
+
+    async def play_behind_a_busy_limiter():
+        async def hold():
+            async with limiter:
+                await asyncio.sleep(0.3)
+        holding = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        result = await offline_game()
+        await holding
+        return result
+    _, actions = asyncio.run(play_behind_a_busy_limiter())
+    assert "Decision Timeout" not in actions
+
+def test_the_hedged_request_answers_and_the_slow_one_is_cancelled(monkeypatch):
+    monkeypatch.setattr(main, "HEDGE_AFTER_SECONDS", 0.01)
+    cancelled = []
+
+    async def call_model(assistant, message, proxy):
+        try:
+            await asyncio.sleep(5 if proxy == "first" else 0.01)
+        except asyncio.CancelledError:
+            cancelled.append(proxy)
+            raise
+        return f"Final Decision: 3 Maintenance ({proxy})"
+    monkeypatch.setattr(main, "call_model", call_model)
+
+    events = []
+    response = asyncio.run(main.call_model_hedged(Assistant(), "prompt", "first", "hedge", events))
+    assert response.endswith("(hedge)")
+    assert cancelled == ["first"]
+    assert [action for action, _ in events] == ["Hedged Request", "Hedge Result"]
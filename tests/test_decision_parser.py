@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+import main
+from main import DecisionStreamParser, match_decision, request_decision
+
+def stream(chunks):
+    # Feeds chunks until the parser is done, as stream_model does; returns the decision it reads
+    parser = DecisionStreamParser()
+    for chunk in chunks:
+        if parser.feed(chunk):
+            break
+    return parser, match_decision(parser.text)
+
+@pytest.mark.parametrize("response, decision", [
+    ("Final Decision: 4 Sell Wheat 2", "4 Sell Wheat 2"),
+    ("Reasoning: 1 Plant Corn first.\nFinal Decision:\n2 Harvest", "2 Harvest None None"),
+    ("Final Decision: 1 Plant Corn\nCorn is cheap and grows quickly.", "1 Plant Corn None"),
+    ("**Final Decision:** **5 Buy Corn 3**", "5 Buy Corn 3"),
+    ("## Final Decision\n`4 Sell Corn 2`", "4 Sell Corn 2"),
+    ("_Final Decision:_ 1. Plant Wheat", "1 Plant Wheat None"),
+    ("Reasoning\r\nFinal Decision: 5 Buy Corn 3\r\n", "5 Buy Corn 3"),
+    ("Nothing is ready, so 3 Maintenance", "3 Maintenance None None"),
+])
+def test_match_decision(response, decision):
+    assert match_decision(response) == decision
+
+@pytest.mark.parametrize("response", [
+    "", "   \n", "I am not sure what to do.", "Final Decision: plant some corn", "Final Decision: 1 Plant Corn because it is cheap",
+    # A trade without its amount, or a plant without its crop
+    "Final Decision: 4 Sell Corn", "Final Decision: 5 Buy Corn", "Final Decision: 1 Plant",
+])
+def test_unparsed_output_falls_back_to_maintenance(response, monkeypatch):
+    async def call_model(assistant, message, proxy):
+        return response
+    monkeypatch.setattr(main, "call_model", call_model)
+    fallbacks = main.MAINTENANCE_FALLBACKS.values.get(("unparsed",), 0)
+    assert match_decision(response) is None
+    assert asyncio.run(request_decision(None, "prompt", None)) == ("3 Maintenance", False)
+    assert main.MAINTENANCE_FALLBACKS.values[("unparsed",)] == fallbacks + 1
+
+def test_answered_decisions_are_marked_as_answered(monkeypatch):
+    async def call_model(assistant, message, proxy):
+        return "Final Decision: 4 Sell Wheat 2"
+    monkeypatch.setattr(main, "call_model", call_model)
+    assert asyncio.run(request_decision(None, "prompt", None)) == ("4 Sell Wheat 2", True)
+
+@pytest.mark.parametrize("chunks", [
+    ["Final Deci", "sion: 5 Buy Co", "rn", " 3\nmore text\n"],
+    # Split before the amount: "5 Buy Corn" alone is not the decision yet
+    ["Final Decision: 5 Buy Corn", " 3\n", "ignored\n"],
+    ["Final Decision: 5 Buy Corn", " ", "3", "\r\n"],
+])
+def test_stream_waits_for_the_whole_decision_line(chunks):
+    parser, decision = stream(chunks)
+    assert parser.done
+    assert decision == "5 Buy Corn 3"
+
+def test_stream_stops_at_the_decision_line():
+    parser, decision = stream(["Reasoning: 1 Plant Corn\n", "Final Decision: 2 Harvest\r\n", "Trailing text\n"])
+    assert parser.done
+    assert parser.text.endswith("2 Harvest")
+    assert decision == "2 Harvest None None"
+
+def test_stream_ignores_decisions_before_the_marker():
+    parser, _ = stream(["1 Plant Corn\n", "2 Harvest\n"])
+    assert not parser.done
+
+def test_stream_without_final_newline_is_parsed_whole():
+    parser, decision = stream(["Final Decision: 5 Buy Corn 3"])
+    assert not parser.done
+    assert decision == "5 Buy Corn 3"
+
+def test_stream_cut_off_before_the_amount_is_not_a_decision():
+    parser, decision = stream(["Final Decision: 5 Buy Corn"])
+    assert not parser.done
+    assert decision is None
+
+def test_stream_without_marker_is_read_like_the_full_response():
+    parser, decision = stream(["I will wait and see.\n", "Maybe tomorrow."])
+    assert not parser.done
+    assert decision is None
+    assert parser.text == "I will wait and see.\nMaybe tomorrow."
@@ -0,0 +1,27 @@
+import asyncio
+import random
+import tracemalloc
+import pytest
+from engine import GameState, update_state
+from order_book import OrderBook
+from policies import RandomPolicy
+from tournament import play_game
+
+@pytest.mark.parametrize("decision", ["4 Sell Corn", "4 Sell Corn None", "5 Buy Corn", "5 Buy Corn lots", "5 Buy", "1 Plant"])
+def test_malformed_decisions_fail_instead_of_raising(decision):
+    state = GameState()
+    log = []
+    update_state(state, {"farm": state}, decision, log, OrderBook(), random.Random(0))
+    assert state.day == 2
+    assert state.money == state.rules.starting_money
+    assert log and log[0].action.startswith("Failed")
+
+def test_long_games_keep_the_same_peak_memory():
+    # As in benchmarks.py long_game: what a game keeps per day must not grow with its length
+    peaks = []
+    for days in (1000, 10000):
+        tracemalloc.start()
+        asyncio.run(play_game(RandomPolicy(1), RandomPolicy(0), random.Random(0), total_days=days))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] <= 2 * peaks[0]
@@ -0,0 +1,31 @@
+import asyncio
+import random
+from collections import Counter
+from frames import DeltaEncoder
+from main import farm_payload
+from engine import GameState, update_state
+from order_book import OrderBook
+from policies import RandomPolicy, scripted_decision
+
+def test_deltas_rebuild_the_snapshot():
+    # The dashboard's view: crop counts by (type, planted_at) from crops_added / crops_removed
+    states = {"a": GameState(), "b": GameState()}
+    policy = RandomPolicy(1)
+    market = OrderBook()
+    rng = random.Random(0)
+    encoder = DeltaEncoder()
+    seen = {name: Counter() for name in states}
+    for day in range(1, 51):
+        update_state(states["a"], states, scripted_decision(states["a"], 51 - day), [], market, rng)
+        update_state(states["b"], states, asyncio.run(policy.decide(states["b"], market, 51 - day)), [], market, rng)
+        frame = encoder.encode({name: farm_payload(state, day, "3 Maintenance") for name, state in states.items()})
+        for name, delta in frame["farms"].items():
+            for crop_type, planted_at, count in delta.get("crops_added", []):
+                seen[name][(crop_type, planted_at)] += count
+            for crop_type, planted_at, count in delta.get("crops_removed", []):
+                seen[name][(crop_type, planted_at)] -= count
+        snapshot = encoder.snapshot()["farms"]
+        for name, state in states.items():
+            expected = [{"type": crop_type, "planted_at": planted_at} for crop_type, planted_at, _, count in state.crops.planted() for _ in range(count)]
+            assert sorted(snapshot[name]["crops"], key=lambda crop: (crop["planted_at"], crop["type"])) == sorted(expected, key=lambda crop: (crop["planted_at"], crop["type"]))
+            assert +seen[name] == Counter((crop["type"], crop["planted_at"]) for crop in expected)
@@ -0,0 +1,17 @@
+import metrics
+from metrics import PHASE_SECONDS, span, span_labels
+
+def test_phases_are_timed_per_farm_with_a_bounded_number_of_farms(monkeypatch):
+    monkeypatch.setattr(metrics, "MAX_FARM_LABELS", 2)
+    monkeypatch.setattr(metrics, "_farm_labels", set())
+    monkeypatch.setattr(PHASE_SECONDS, "values", {})
+    for farm in ["first", "second", "third", "fourth", "first"]:
+        labels = span_labels.set({"farm": farm, "day": 1})
+        with span("update_state"):
+            pass
+        span_labels.reset(labels)
+    with span("serialize"):
+        pass
+    counts = {key: sum(series[0]) for key, series in PHASE_SECONDS.values.items()}
+    assert counts == {("update_state", "first"): 2, ("update_state", "second"): 1, ("update_state", "other"): 2, ("serialize", "game"): 1}
+    assert 'farm_phase_seconds_count{phase="update_state",farm="other"} 2' in PHASE_SECONDS.samples()
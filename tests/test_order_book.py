@@ -0,0 +1,132 @@
+import pickle
+import random
+from engine import GameState, buy_crops, clear_order_book, sell_crops, update_state
+from order_book import OrderBook
+
+class Farm:
+    pass
+
+def test_an_order_fills_across_several_resting_orders():
+    market = OrderBook()
+    first, second, buyer = Farm(), Farm(), Farm()
+    market.place(first, "sell", "Corn", 3, 20, 1, 2)
+    market.place(second, "sell", "Corn", 4, 20, 1, 2)
+    order, fills = market.place(buyer, "buy", "Corn", 5, 20, 1, 2)
+    assert [(fill.seller, fill.amount) for fill in fills] == [(first, 3), (second, 2)]
+    assert order.amount == 0
+    assert len(market) == 1
+    assert market.depth("sell") == {("Corn", 20): 2}
+
+def test_best_price_fills_first_then_oldest_order():
+    market = OrderBook()
+    early, late, cheap, buyer = Farm(), Farm(), Farm(), Farm()
+    market.place(early, "sell", "Corn", 1, 20, 1, 2)
+    market.place(late, "sell", "Corn", 1, 20, 1, 2)
+    market.place(cheap, "sell", "Corn", 1, 15, 1, 2)
+    _, fills = market.place(buyer, "buy", "Corn", 3, 20, 1, 2)
+    assert [fill.seller for fill in fills] == [cheap, early, late]
+    # Fills settle at the resting order's price
+    assert [fill.price for fill in fills] == [15, 20, 20]
+
+def test_an_order_above_the_bid_does_not_cross():
+    market = OrderBook()
+    market.place(Farm(), "buy", "Corn", 1, 10, 1, 2)
+    _, fills = market.place(Farm(), "sell", "Corn", 1, 20, 1, 2)
+    assert fills == []
+    assert len(market) == 2
+
+def test_a_farm_never_fills_its_own_order():
+    market = OrderBook()
+    farm, other = Farm(), Farm()
+    market.place(farm, "sell", "Corn", 2, 20, 1, 2)
+    market.place(other, "sell", "Corn", 1, 20, 1, 2)
+    _, fills = market.place(farm, "buy", "Corn", 3, 20, 1, 2)
+    assert [(fill.seller, fill.amount) for fill in fills] == [(other, 1)]
+    # The farm's own ask was set aside while matching and is back in the book for others
+    _, fills = market.place(other, "buy", "Corn", 2, 20, 1, 2)
+    assert [(fill.seller, fill.amount) for fill in fills] == [(farm, 2)]
+
+def test_expired_orders_release_reserved_money_and_escrowed_crops():
+    market = OrderBook()
+    seller = GameState(harvested_crops={"Corn": 2})
+    buyer = GameState()
+    farms = {"seller": seller, "buyer": buyer}
+    rng = random.Random(0)
+    log = []
+    update_state(seller, farms, "4 Sell Corn 2", log, market, rng)
+    update_state(buyer, farms, "5 Buy Wheat 1", log, market, rng)
+    assert seller.harvested_crops == {}
+    assert buyer.reserved_money == 30
+    assert len(market) == 2
+
+    update_state(seller, farms, "3 Maintenance", log, market, rng)
+    update_state(buyer, farms, "3 Maintenance", log, market, rng)
+    assert seller.harvested_crops == {"Corn": 2}
+    assert buyer.reserved_money == 0
+    assert buyer.money == buyer.rules.starting_money
+    assert len(market) == 0
+    assert {entry.action for entry in log} >= {"Sell Order Expired", "Buy Order Expired"}
+
+def test_clear_order_book_returns_everything_a_farm_has_open():
+    market = OrderBook()
+    state = GameState(harvested_crops={"Corn": 3})
+    sell_crops(state, market, "Corn", 3, [])
+    buy_crops(state, market, "Wheat", 2, [])
+    market.place(Farm(), "buy", "Tomato", 1, 10, 1, 5)
+    assert state.harvested_crops == {}
+    assert state.reserved_money == 60
+
+    clear_order_book(state, market)
+    assert state.harvested_crops == {"Corn": 3}
+    assert state.reserved_money == 0
+    assert len(market) == 1
+    assert market.expire(state, 100) == []
+
+def test_owner_indexes_survive_a_pickle_round_trip():
+    market = OrderBook()
+    state = GameState()
+    market.place(state, "buy", "Wheat", 1, 30, 1, 2)
+    market.place(state, "sell", "Corn", 2, 20, 1, 3)
+
+    # Pickled together, as in a checkpoint, so orders still point at the farm
+    state, market = pickle.loads(pickle.dumps((state, market)))
+    assert market.depth("buy", exclude_owner=state) == {}
+    assert [order.side for order in market.expire(state, 2)] == ["buy"]
+    assert [order.side for order in market.cancel_all(state)] == ["sell"]
+    assert len(market) == 0
+
+def test_price_heaps_stay_bounded_by_the_open_orders():
+    market = OrderBook()
+    state = GameState(harvested_crops={"Corn": 1})
+    other = GameState()
+    farms = {"farm": state, "other": other}
+    rng = random.Random(0)
+    for day in range(1, 2001):
+        # A sell that expires unfilled every other day, and a bid that is cancelled now and then
+        update_state(state, farms, "4 Sell Corn 1" if day % 2 else "3 Maintenance", [], market, rng)
+        update_state(other, farms, "5 Buy Wheat 1", [], market, rng)
+        if day % 7 == 0:
+            clear_order_book(other, market)
+        heap_entries = sum(len(heap) for book in (market._bids, market._asks) for heap in book.values())
+        assert heap_entries <= 2 * len(market)
+    assert state.harvested_crops == {"Corn": 1}
+
+def test_a_pickled_book_holds_only_open_orders():
+    market = OrderBook()
+    farm, other = Farm(), Farm()
+    for day in range(1, 200):
+        market.place(farm, "sell", "Corn", 1, 20, day, day + 1)
+        market.expire(farm, day)
+    market.place(other, "buy", "Wheat", 1, 30, 1, 5)
+    size = len(pickle.dumps(market))
+
+    fresh = OrderBook()
+    fresh.place(farm, "sell", "Corn", 1, 20, 1, 2)
+    fresh.place(other, "buy", "Wheat", 1, 30, 1, 5)
+    assert size <= len(pickle.dumps(fresh)) + 16
+
+    restored = pickle.loads(pickle.dumps(market))
+    assert len(restored) == 2
+    assert restored.depth("sell") == {("Corn", 20): 1}
+    _, fills = restored.place(Farm(), "buy", "Corn", 1, 20, 200, 201)
+    assert [fill.amount for fill in fills] == [1]
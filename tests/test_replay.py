@@ -0,0 +1,42 @@
+import asyncio
+import random
+from policies import Policy, RandomPolicy
+from replay import make_record, replay_game
+from tournament import play_game
+
+class SequencePolicy(Policy):
+    # Plays the given decisions in turn, so the game is sure to contain fills and sabotage
+    def __init__(self, decisions):
+        self.decisions = decisions
+        self.day = 0
+
+    async def decide(self, state, market, days_left: int) -> str:
+        decision = self.decisions[self.day % len(self.decisions)]
+        self.day += 1
+        return decision
+
+# The seller's corn is ready on day 6 and offered on day 7, when the buyer (moving second) bids for it
+SELLER = ["1 Plant Corn", "1 Plant Tomato", "3 Maintenance", "3 Maintenance", "2 Harvest", "3 Maintenance", "4 Sell Corn 1", "6 Sabotage"]
+BUYER = ["1 Plant Corn", "6 Sabotage", "3 Maintenance", "3 Maintenance", "3 Maintenance", "3 Maintenance", "5 Buy Corn 1", "2 Harvest"]
+
+def play_and_record(policy_a, policy_b, seed: int, days: int):
+    state_a, state_b, decisions = asyncio.run(play_game(policy_a, policy_b, random.Random(seed), total_days=days, record=True))
+    return state_a, state_b, make_record("game", seed, ["a", "b"], decisions, {"a": state_a.money, "b": state_b.money})
+
+def test_a_recorded_game_replays_exactly():
+    state_a, state_b, record = play_and_record(SequencePolicy(SELLER), SequencePolicy(BUYER), 7, 40)
+    states, logs = replay_game(record)
+    actions = {entry.action for log in logs.values() for entry in log}
+    assert {"Complete Trade", "Sabotage"} <= actions
+    for farm, state in (("a", state_a), ("b", state_b)):
+        assert states[farm].money == state.money
+        assert states[farm].day == state.day
+        assert states[farm].energy == state.energy
+        assert states[farm].harvested_crops == state.harvested_crops
+
+def test_random_games_replay_exactly():
+    for seed in range(5):
+        state_a, state_b, record = play_and_record(RandomPolicy(seed), RandomPolicy(seed + 100), seed, 50)
+        states, _ = replay_game(record)
+        assert (states["a"].money, states["b"].money) == (state_a.money, state_b.money)
+        assert states["a"].day == state_a.day == 51
@@ -0,0 +1,48 @@
+from engine import GameState
+from results_store import ResultsStore, day_row
+
+def add_game_days(store, game_id, farms, days, money=100):
+    for day in days:
+        store.add_days([day_row(game_id, farm, model, day, "3 Maintenance", "Maintenance", GameState(money=money + day)) for farm, model in farms.items()])
+
+def test_the_leaderboard_counts_distinct_games_and_farms_separately(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    # Two farms of the same model in one game, and a game against another model
+    store.add_game("a", 0, 30, {"first": 120, "second": 80}, {"first": "scripted", "second": "scripted"})
+    store.add_game("b", 1, 30, {"first": 90, "second": 110}, {"first": "scripted", "second": "random"})
+    board = {row["model"]: row for row in store.leaderboard()}
+    assert (board["scripted"]["games"], board["scripted"]["farms"]) == (2, 3)
+    assert (board["random"]["games"], board["random"]["farms"]) == (1, 1)
+    # Each farm keeps its own money and rank
+    assert board["scripted"]["win_rate"] == 1 / 3
+    assert (board["scripted"]["min_money"], board["scripted"]["max_money"]) == (80, 120)
+    assert board["random"]["win_rate"] == 1
+    store.close()
+
+def test_farms_of_one_model_are_reported_separately_by_day(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.sqlite"))
+    add_game_days(store, "a", {"first": "scripted", "second": "scripted"}, range(1, 4))
+    rows = store.money_by_day("scripted")
+    assert [(row["day"], row["farms"]) for row in rows] == [(1, 2), (2, 2), (3, 2)]
+    assert sum(row["count"] for row in store.action_mix("scripted")) == 6
+    store.close()
+
+def test_a_resumed_game_drops_its_days_from_the_checkpoint_on(tmp_path):
+    # A small batch, so some of the dropped days are already in the database and some still buffered
+    store = ResultsStore(str(tmp_path / "results.sqlite"), batch_size=6)
+    farms = {"first": "scripted"}
+    for day in range(1, 9):
+        add_game_days(store, "a", farms, [day])
+        add_game_days(store, "b", farms, [day])
+    assert [row[3] for row in store._days if row[0] == "a"] == [7, 8]
+
+    store.drop_days("a", 4)
+    rows = store.money_by_day("scripted")
+    assert [(row["day"], row["farms"]) for row in rows] == [(day, 2 if day < 4 else 1) for day in range(1, 9)]
+
+    # Playing the days again leaves one row per farm per day
+    add_game_days(store, "a", farms, range(4, 9), money=200)
+    rows = store.money_by_day("scripted")
+    assert [(row["day"], row["farms"]) for row in rows] == [(day, 2) for day in range(1, 9)]
+    assert rows[-1]["avg_money"] == (108 + 208) / 2
+    store.close()
@@ -0,0 +1,29 @@
+import asyncio
+import random
+from policies import RandomPolicy, make_policy
+from rollout import ROLLOUT_DECISIONS, RolloutPolicy
+from tournament import play_game
+
+class Checked(RolloutPolicy):
+    # Records every decision it returns
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.decisions = []
+
+    async def decide(self, state, market, days_left: int) -> str:
+        decision = await super().decide(state, market, days_left)
+        self.decisions.append(decision)
+        return decision
+
+def test_rollouts_play_valid_decisions_and_beat_random():
+    # Inline (workers=0), as in tournament workers, with a budget no rollout comes close to, so
+    # every rollout runs and the game is the same on every machine
+    for seed in range(2):
+        rollout = Checked(seed, budget=60, rollouts=8, workers=0)
+        state_rollout, state_random, _ = asyncio.run(play_game(rollout, RandomPolicy(seed), random.Random(seed)))
+        assert len(rollout.decisions) == state_rollout.rules.total_days
+        assert set(rollout.decisions) <= set(ROLLOUT_DECISIONS)
+        assert state_rollout.money > state_random.money
+
+def test_tournament_workers_run_rollouts_inline():
+    assert make_policy("rollout:50", 0, rollout_workers=0).workers == 0
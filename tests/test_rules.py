@@ -0,0 +1,41 @@
+import random
+import pytest
+from engine import GameState, update_state
+from order_book import OrderBook
+from rules import DEFAULT_RULES
+from sweep import parse_axis
+
+@pytest.mark.parametrize("path", ["game.crops.Rice.cost", "trading.no_such_rule", "game.crops", "game.crops.Corn.cost.extra"])
+def test_unknown_override_paths_raise(path):
+    with pytest.raises(ValueError):
+        DEFAULT_RULES.with_overrides({path: 1})
+    with pytest.raises(ValueError):
+        parse_axis(f"{path}=1,2")
+
+def test_axis_values_take_the_rule_type():
+    path, values = parse_axis("game.crops.Corn.cost=5,7.6,10")
+    assert values == [5, 8, 10]
+    assert all(type(value) is int for value in values)
+    _, values = parse_axis("game.energy_regen_per_day=10:40:4")
+    assert values == [10, 20, 30, 40] and all(type(value) is int for value in values)
+    # A rate is a float even when written as whole numbers
+    _, values = parse_axis("trading.trade_fee_percentage=0:1:3")
+    assert values == [0.0, 0.5, 1.0] and all(type(value) is float for value in values)
+    assert parse_axis("game.crops.Corn.cost=5:15") == ("game.crops.Corn.cost", (5, 15))
+
+def test_overridden_rules_change_the_game():
+    # A sale between two farms, once under the default 10% fee and once under a 50% fee
+    def seller_money(rules):
+        seller = GameState(harvested_crops={"Corn": 2}, rules=rules)
+        buyer = GameState(rules=rules)
+        farms = {"seller": seller, "buyer": buyer}
+        market = OrderBook()
+        update_state(seller, farms, "4 Sell Corn 2", [], market, random.Random(0))
+        update_state(buyer, farms, "5 Buy Corn 2", [], market, random.Random(0))
+        return seller.money
+
+    variant = DEFAULT_RULES.with_overrides({"trading.trade_fee_percentage": 0.5})
+    assert variant.trade_fee_percentage == 0.5
+    assert DEFAULT_RULES.trade_fee_percentage == 0.1
+    assert seller_money(DEFAULT_RULES) == 100 + 40 * 0.9
+    assert seller_money(variant) == 100 + 40 * 0.5
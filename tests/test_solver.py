@@ -0,0 +1,66 @@
+import asyncio
+import random
+import solver
+from engine import GameState, update_state
+from order_book import OrderBook
+from rules import DEFAULT_RULES
+from sessions import CompetitionSession
+
+def brute_force(total_days: int) -> float:
+    # Every decision on every reachable state, day by day. States with the same energy and crops
+    # keep only the richest: more money never takes an option away from a single farm
+    layer = {None: GameState()}
+    for _ in range(total_days):
+        next_layer = {}
+        for state in layer.values():
+            for decision in solver.SOLVER_DECISIONS:
+                # Rebuilt rather than state.copy(): a deep copy per branch would dominate the search
+                after = GameState(day=state.day, money=state.money, energy=state.energy)
+                for (crop_type, ready_day, damaged), count in state.crops.buckets.items():
+                    after.crops.add(crop_type, ready_day, count, damaged)
+                update_state(after, {"solver": after}, decision, [], OrderBook(), random.Random(0))
+                key = (after.energy, tuple(sorted(after.crops.buckets.items())))
+                if key not in next_layer or next_layer[key].money < after.money:
+                    next_layer[key] = after
+        layer = next_layer
+    return max(state.money for state in layer.values())
+
+def test_optimum_matches_brute_force():
+    result = solver.solve(8)
+    assert result["optimal_money"] == brute_force(8) == 118.0
+
+def test_the_plan_reaches_the_optimum():
+    result = solver.solve(12)
+    state = GameState()
+    for decision in result["decisions"]:
+        update_state(state, {"solver": state}, decision, [], OrderBook(), random.Random(0))
+    assert state.money == result["optimal_money"]
+
+def test_optimum_is_cached_on_disk(tmp_path, monkeypatch):
+    path = str(tmp_path / "optimal_money.json")
+    monkeypatch.setattr(solver, "SOLVER_CACHE_PATH", path)
+    assert solver.optimal_money.__wrapped__(8) == 118.0
+    assert solver.load_optima(path) == {solver.rules_key(8): 118.0}
+
+    def fail(total_days):
+        raise AssertionError("solved again")
+    monkeypatch.setattr(solver, "solve", fail)
+    assert solver.optimal_money.__wrapped__(8) == 118.0
+    # Other game lengths are other rules
+    assert solver.rules_key(9) != solver.rules_key(8)
+
+def test_final_frame_scores_each_farm_against_the_optimum(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "checkpoint_dir", None)
+    monkeypatch.setattr(main, "DEFAULT_RECORDINGS_PATH", "")
+    monkeypatch.setattr(main, "results_store", None)
+    monkeypatch.setattr(main, "_optimal_money", None)
+    monkeypatch.setattr(solver, "optimal_money", lambda: 200.0)
+
+    async def play():
+        session = CompetitionSession("solver-test", 1, [("scripted", "scripted"), ("random", "random")])
+        return [frame async for frame in main.run_competition(session)]
+    frames = asyncio.run(play())
+    assert len(frames) == DEFAULT_RULES.total_days + 1
+    for farm in frames[-1].values():
+        assert farm["fraction_of_optimal"] == farm["money"] / 200.0
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+from constants import GAME_RULES
+from engine import GameState, update_state, clear_order_book
+from rules import DEFAULT_RULES, RuleTable
+from action_log import ActionLogBuffer
+from order_book import OrderBook
+from decision_cache import get_cache
+from policies import make_policy
+from replay import append_records, make_record
+from results_store import day_row, get_store
+
+CACHE_COUNTERS = ("memory_hits", "disk_hits", "misses")
+
+async def play_game(policy_a, policy_b, rng: random.Random, total_days: Optional[int] = None, on_day: Optional[Callable] = None, rules: RuleTable = DEFAULT_RULES, record: bool = False):
+    # on_day(farm, day, decision, action, state) is called after each farm's move, with the
+    # outcome update_state logged first for it. total_days defaults to the rules' game length.
+    # The decisions of every day are only kept with record, so a game otherwise takes the same
+    # memory however long it runs; without it the days returned are None.
+    state_a = GameState(rules=rules)
+    state_b = GameState(rules=rules)
+    total_days = total_days or rules.total_days
+    log_a = ActionLogBuffer()
+    log_b = ActionLogBuffer()
+    market = OrderBook()
+    farms = {"a": state_a, "b": state_b}
+    days = [] if record else None
+
+    for current_day in range(1, total_days + 1):
+        days_left = total_days - current_day + 1
+        decision_a, decision_b = await asyncio.gather(
+            policy_a.decide(state_a, market, days_left),
+            policy_b.decide(state_b, market, days_left)
+        )
+        for farm, state, decision, log in (("a", state_a, decision_a, log_a), ("b", state_b, decision_b, log_b)):
+            logged = log.total
+            update_state(state, farms, decision, log, market, rng)
+            if on_day is not None:
+                entries = log.since(logged)
+                on_day(farm, current_day, decision, entries[0].action if entries else None, state)
+        if record:
+            days.append([decision_a, decision_b])
+
+    clear_order_book(state_a, market)
+    clear_order_book(state_b, market)
+    return state_a, state_b, days
+
+def run_game(game_id: int, spec_a: str, spec_b: str, seed: int, cache: Optional[str] = None, results_id: Optional[str] = None, record: bool = False) -> Dict:
+    # Alternate seats so neither policy always gets to act first each day
+    swapped = game_id % 2 == 1
+    decision_cache = get_cache(cache)
+    cache_before = {field: getattr(decision_cache, field) for field in CACHE_COUNTERS} if decision_cache else None
+    policy_a = make_policy(spec_a, seed, cache, rollout_workers=0)
+    policy_b = make_policy(spec_b, seed + 1, cache, rollout_workers=0)
+    # With results_id, per-day rows for the results store are sent back with the result
+    day_rows = [] if results_id else None
+    on_day = None
+    if results_id:
+        seats = {"a": "b", "b": "a"} if swapped else {"a": "a", "b": "b"}
+        specs = {"a": spec_a, "b": spec_b}
+        on_day = lambda seat, day, decision, action, state: day_rows.append(day_row(results_id, seats[seat], specs[seats[seat]], day, decision, action, state))
+    if swapped:
+        state_b, state_a, days = asyncio.run(play_game(policy_b, policy_a, random.Random(seed), on_day=on_day, record=record))
+        farms = ["b", "a"]
+    else:
+        state_a, state_b, days = asyncio.run(play_game(policy_a, policy_b, random.Random(seed), on_day=on_day, record=record))
+        farms = ["a", "b"]
+
+    if state_a.money > state_b.money:
+        winner = "a"
+    elif state_b.money > state_a.money:
+        winner = "b"
+    else:
+        winner = "draw"
+
+    return {
+        "game_id": game_id,
+        "seed": seed,
+        "swapped": swapped,
+        "money_a": state_a.money,
+        "money_b": state_b.money,
+        "winner": winner,
+        "record": make_record(str(game_id), seed, farms, days, {"a": state_a.money, "b": state_b.money}) if record else None,
+        "days": day_rows,
+        "cache": {field: getattr(decision_cache, field) - cache_before[field] for field in CACHE_COUNTERS} if decision_cache else None
+    }
+
+def run_tournament(spec_a: str, spec_b: str, games: int, seed: int = 0, workers: int = None, cache: Optional[str] = None, record: Optional[str] = None, results_path: Optional[str] = None) -> List[Dict]:
+    seeds = random.Random(seed).sample(range(2**31), games)
+    store = get_store(results_path)
+    # Game ids in the results store must not collide with earlier tournaments
+    tournament_id = uuid.uuid4().hex[:12]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(run_game, game_id, spec_a, spec_b, game_seed, cache, f"{tournament_id}-{game_id}" if store else None, bool(record))
+            for game_id, game_seed in enumerate(seeds)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            if store is not None:
+                # Buffered; the store writes a batch whenever enough rows have accumulated
+                store.add_days(result.pop("days"))
+                store.add_game(f"{tournament_id}-{result['game_id']}", result["seed"], GAME_RULES["total_days"], {"a": result["money_a"], "b": result["money_b"]}, {"a": spec_a, "b": spec_b})
+            results.append(result)
+    if store is not None:
+        store.flush()
+    results.sort(key=lambda result: result["game_id"])
+    if record:
+        append_records(record, (result["record"] for result in results))
+    return results
+
+def money_distribution(values: List[float]) -> Dict:
+    quartiles = statistics.quantiles(values, n=4) if len(values) > 1 else [values[0]] * 3
+    return {
+        "mean": statistics.fmean(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "min": min(values),
+        "p25": quartiles[0],
+        "median": quartiles[1],
+        "p75": quartiles[2],
+        "max": max(values)
+    }
+
+def summarize(results: List[Dict], spec_a: str, spec_b: str) -> Dict:
+    games = len(results)
+    wins = {outcome: sum(1 for result in results if result["winner"] == outcome) for outcome in ("a", "b", "draw")}
+    summary = {
+        "games": games,
+        "a": {"policy": spec_a, "win_rate": wins["a"] / games, "money": money_distribution([result["money_a"] for result in results])},
+        "b": {"policy": spec_b, "win_rate": wins["b"] / games, "money": money_distribution([result["money_b"] for result in results])},
+        "draw_rate": wins["draw"] / games
+    }
+    # Imported here so tournament workers do not load NumPy
+    from solver import optimal_money
+    optimal = optimal_money()
+    summary["optimal_money"] = optimal
+    for seat in ("a", "b"):
+        summary[seat]["fraction_of_optimal"] = summary[seat]["money"]["mean"] / optimal
+    if results and results[0]["cache"] is not None:
+        summary["cache"] = {field: sum(result["cache"][field] for result in results) for field in CACHE_COUNTERS}
+    return summary
+
+def print_summary(summary: Dict):
+    print(f"Games played: {summary['games']}  (draws: {summary['draw_rate']:.1%}, optimal single-farm money {summary['optimal_money']:.2f})")
+    for seat in ("a", "b"):
+        player = summary[seat]
+        money = player["money"]
+        print(
+            f"  {seat} {player['policy']:<20} win rate {player['win_rate']:6.1%}  "
+            f"money mean {money['mean']:8.2f} sd {money['stdev']:7.2f}  "
+            f"min {money['min']:8.2f} p25 {money['p25']:8.2f} median {money['median']:8.2f} "
+            f"p75 {money['p75']:8.2f} max {money['max']:8.2f}  "
+            f"{player['fraction_of_optimal']:6.1%} of optimal"
+        )
+    if "cache" in summary:
+        cache = summary["cache"]
+        print(f"Decision cache: {cache['memory_hits']} memory hits, {cache['disk_hits']} disk hits, {cache['misses']} misses")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a headless tournament between two policies")
+    parser.add_argument("policy_a", help='"random", "scripted", "rollout[:<budget ms>]" or "llm:<model>"')
+    parser.add_argument("policy_b", help='"random", "scripted", "rollout[:<budget ms>]" or "llm:<model>"')
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--record", default=None, help="Append game records for replay.py to this JSONL file")
+    parser.add_argument("--cache", default=None, help='Cache LLM decisions: "memory" or a path to an SQLite file')
+    parser.add_argument("--results", default=None, help="Store per-day results in this SQLite file for results_store.py")
+    args = parser.parse_args(argv)
+
+    results = run_tournament(args.policy_a, args.policy_b, args.games, args.seed, args.workers, args.cache, args.record, args.results)
+    print_summary(summarize(results, args.policy_a, args.policy_b))
+
+if __name__ == "__main__":
+    main()